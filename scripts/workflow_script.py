@@ -1,6 +1,4 @@
 from ePIC_benchmarks.workflow.config import WorkflowConfig
-from ePIC_benchmarks.workflow.bash import bash_app
-from ePIC_benchmarks.workflow.python import python_app
 from ePIC_benchmarks.workflow.bash.methods.container import pull_containers
 from ePIC_benchmarks.workflow.bash.methods.epic import (
     clone_epic, checkout_epic_branch, compile_epic,
@@ -16,18 +14,20 @@ eicshell_container = ShifterConfig(
     entry_point="/opt/local/bin/eic-shell",
     image="eicweb/jug_xl:25.02.0-stable",
 )
-clone_epic_app = bash_app(clone_epic)
-pull_containers_app = bash_app(pull_containers)
-checkout_app = bash_app(checkout_epic_branch)
-compile_epic_app = bash_app(compile_epic)
-run_npsim_app = bash_app(run_npsim)
-run_eicrecon_app = bash_app(run_eicrecon)
-generate_material_map_app = bash_app(generate_material_map)
-apply_detector_configuration_app = python_app(apply_detector_configs)
-performance_analysis_app = python_app(generate_performance_plots)
 
 def run(config : WorkflowConfig):
 
+    #Route each app to the executors of its workflow stage (see WorkflowConfig.stages)
+    pull_containers_app = config.executor.stage_app('container', pull_containers)
+    clone_epic_app = config.executor.stage_app('epic', clone_epic)
+    checkout_app = config.executor.stage_app('epic', checkout_epic_branch)
+    apply_detector_configuration_app = config.executor.stage_app('detector', apply_detector_configs)
+    compile_epic_app = config.executor.stage_app('build', compile_epic)
+    generate_material_map_app = config.executor.stage_app('material_map', generate_material_map)
+    run_npsim_app = config.executor.stage_app('simulation', run_npsim)
+    run_eicrecon_app = config.executor.stage_app('reconstruction', run_eicrecon)
+    performance_analysis_app = config.executor.stage_app('analysis', generate_performance_plots)
+
     final_futures = []
 
     pull_containers_future = pull_containers_app(eicshell_container)
@@ -40,7 +40,7 @@ def run(config : WorkflowConfig):
 
             update_detectors_future = apply_detector_configuration_app(config, benchmark_name, dependency=checkout_branch_future)
 
-            compile_epic_future = compile_epic_app(config, benchmark_name, num_threads=1, container=eicshell_container, dependency=update_detectors_future, stdout=AUTO_LOGNAME, stderr=AUTO_LOGNAME)
+            compile_epic_future = compile_epic_app(config, benchmark_name, container=eicshell_container, dependency=update_detectors_future, stdout=AUTO_LOGNAME, stderr=AUTO_LOGNAME)
 
             generate_material_map_future = generate_material_map_app(config, benchmark_name, nevents=20000, container=eicshell_container, dependency=compile_epic_future)
 
@@ -1,5 +1,6 @@
 import argparse
 import os
+import sys
 from .workflow.config import WorkflowConfig
 from .workflow.run import convert_to_abs_path, execute_workflow
 
@@ -10,8 +11,13 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser("ePIC Workflow entry point")
     parser.add_argument("workflow_config_path", default=os.path.join(CWD, "workflow_config.yml"))
     # parser.add_argument("--workflow_config_script", default='')
-    parser.add_argument("--script", "-s", default=os.path.join(CWD, "workflow_script.py"))
+    #If no workflow script is provided, the built-in workflow DAG is run
+    parser.add_argument("--script", "-s", default=None)
     parser.add_argument("--funcName", "-f", default="run")
+    #Prints the estimated cost of the workflow instead of running it
+    parser.add_argument("--plan", action="store_true")
+    parser.add_argument("--costModel", default=None)
+    parser.add_argument("--planOutput", default=None)
 
     args = parser.parse_args()
     config_path = convert_to_abs_path(args.workflow_config_path, CWD)
@@ -22,7 +28,7 @@ if __name__ == "__main__":
     #     config_script_path = convert_to_abs_path(args.workflow_config_script, CWD)
     # else:
     #     config_script_path = None
-    script_path = convert_to_abs_path(args.script, CWD)
+    script_path = convert_to_abs_path(args.script, CWD) if args.script is not None else None
     func_name = args.funcName
     
     # if config_script_path is not None:
@@ -32,7 +38,7 @@ if __name__ == "__main__":
         err = f"Workflow config file at '{config_path}' does not exist"
         raise ValueError(err)
     
-    if not os.path.exists(script_path):
+    if script_path is not None and not os.path.exists(script_path):
         err = f"Workflow script file at '{script_path}' does not exist"
         raise ValueError(err)
     
@@ -41,4 +47,12 @@ if __name__ == "__main__":
         raise ValueError(err)
 
     workflow_config = WorkflowConfig.load_from_file(config_path)
+    if args.plan:
+        from .workflow.plan import load_cost_model
+        cost_model_path = convert_to_abs_path(args.costModel, CWD) if args.costModel is not None else None
+        workflow_plan = workflow_config.planner.plan(load_cost_model(cost_model_path))
+        print(workflow_plan.summary())
+        if args.planOutput is not None:
+            workflow_plan.write(convert_to_abs_path(args.planOutput, CWD))
+        sys.exit(0)
     execute_workflow(workflow_config, script_path=script_path, script_func_name=func_name)
\ No newline at end of file
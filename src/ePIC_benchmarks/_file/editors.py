@@ -1,7 +1,11 @@
 
+import copy
+import os
 import yaml
 from lxml import etree
 
+from ePIC_benchmarks._file.xml_index import XmlElementIndex, compile_xpath, parse_tag_steps
+
 class YamlEditor:
     
     def __init__(self, file_path):
@@ -111,6 +115,45 @@ def attribute_dict_to_xpath(attribute_dict={}):
     return "[{all}]".format(all=attribute_str)
 
 
+#Returns the sum of an attribute value and a value. Numbers are added directly, and any other value, such as
+#an expression with units, is combined into an expression that DD4hep evaluates, e.g. '(2*mm)+(0.5*mm)'
+def add_attribute_values(attribute_value : str, value) -> str:
+    value = str(value)
+    for number_type in (int, float):
+        try:
+            return str(number_type(attribute_value) + number_type(value))
+        except ValueError:
+            continue
+    return f"({attribute_value})+({value})"
+
+
+#Parses an xml template of one or more elements, ex: '<layer id="3"/><layer id="4"/>', into its top level elements
+def parse_element_template(template : str) -> list:
+    try:
+        template_root = etree.fromstring(f"<template>{template}</template>")
+    except etree.XMLSyntaxError as e:
+        raise ValueError(f"Invalid xml element template '{template}': {e}") from e
+    elements = [element for element in template_root if isinstance(element.tag, str)]
+    if len(elements) == 0:
+        raise ValueError(f"Xml element template '{template}' contains no elements")
+    for element in elements:
+        element.tail = None
+    return elements
+
+
+#Writes an xml tree to a temporary file that then replaces the file at filepath, so that a partially written file
+#is never left behind and files hard linked to the original file are left unchanged
+def write_xml_atomic(tree, filepath):
+    temp_path = f"{filepath}.tmp"
+    try:
+        tree.write(temp_path, xml_declaration=False)
+        os.replace(temp_path, filepath)
+    except:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
 #Decorator for XmlEditor methods that autosaves updates
 def autosave(func):
     def wrapper(self, *args, **kw):
@@ -125,7 +168,9 @@ def autosave(func):
 #Class used to search for an Xml file's elements and make updates to them
 class XmlEditor:
 
-    def __init__(self, filepath, autosave=False):
+    #With index_attributes, queries made of '//tag[@attribute='value' and ...]' steps are answered by an element index
+    #instead of scanning the whole tree. The index is built by the first query, and rebuilt after structural edits
+    def __init__(self, filepath, autosave=False, index_attributes=False):
 
         try:
             self.tree = etree.parse(filepath)
@@ -134,24 +179,47 @@ class XmlEditor:
             self.autosave = autosave
         except:
             raise Exception("No XML File found at: " + str(filepath))
+        self.index_attributes = index_attributes
+        self._element_index = None
         
+    #Returns an editor of an element that is already parsed, such as a subtree of a streamed file. The editor has no file to save to
+    @classmethod
+    def from_root(cls, root, index_attributes=False):
+        editor = cls.__new__(cls)
+        editor.tree = root.getroottree()
+        editor.root = root
+        editor.filepath = None
+        editor.autosave = False
+        editor.index_attributes = index_attributes
+        editor._element_index = None
+        return editor
+
     def get_root(self):
         return self.root
+
+    #Returns the element index of the document, building it if it doesn't exist or was invalidated
+    @property
+    def element_index(self):
+        if self._element_index is None:
+            self._element_index = XmlElementIndex(self.root)
+        return self._element_index
+
+    def invalidate_index(self):
+        self._element_index = None
         
+    #Saves the file atomically with write_xml_atomic
     def save(self, filepath=""):
         if (len(filepath) == 0):
             to_save = self.filepath
         else:
             to_save = filepath          
         try:
-            self.tree.write(to_save, xml_declaration=False)
+            write_xml_atomic(self.tree, to_save)
         except:
-            print("Could not save file at: " + to_save)    
+            print("Could not save file at: " + str(to_save))    
 
-    def get_elements(self, ancestor_tag_="", ancestor_attributes_={}, element_tag_="//*", element_attributes_={}):
-
-        
-        #Format attributes for xml.eTree findall function call.
+    #Returns the list of elements found by a tag and attribute search, raising an exception if none are found
+    def _find_elements(self, ancestor_tag_="", ancestor_attributes_={}, element_tag_="//*", element_attributes_={}):
 
         full_xpath = ""
         full_xpath += (tag_to_xpath(ancestor_tag_))
@@ -159,52 +227,137 @@ class XmlEditor:
         full_xpath += (tag_to_xpath(element_tag_))
         full_xpath += (attribute_dict_to_xpath(element_attributes_))
 
-        print(full_xpath)
-        found_keys = self.root.xpath(full_xpath)
-        
+        found_keys = compile_xpath(full_xpath)(self.root)
         if len(found_keys) == 0:
             raise Exception(f"Could not find path: {full_xpath}")
-        elif len(found_keys) == 1:
+        return found_keys
+
+    def get_elements(self, ancestor_tag_="", ancestor_attributes_={}, element_tag_="//*", element_attributes_={}):
+
+        found_keys = self._find_elements(ancestor_tag_, ancestor_attributes_, element_tag_, element_attributes_)
+        if len(found_keys) == 1:
             return found_keys[0]
-        else:
-            elements = []
-            for element in found_keys:
-                elements.append(element)
-            return elements
+        return found_keys
 
     def get_val(self, ancestor_tag="", ancestor_attributes={}, element_tag="//*", element_attributes={}):
 
         elems = []
-        for element in self.get_elements(ancestor_tag_=ancestor_tag, ancestor_attributes_=ancestor_attributes, element_tag_=element_tag, element_attributes_=element_attributes):
+        for element in self._find_elements(ancestor_tag_=ancestor_tag, ancestor_attributes_=ancestor_attributes, element_tag_=element_tag, element_attributes_=element_attributes):
             elems.append(element.text)
         return elems
 
     @autosave
     def set_text(self, text, ancestor_tag="", ancestor_attributes={}, element_tag="//*", element_attributes={}):
 
-        for element in self.get_elements(ancestor_tag_=ancestor_tag, ancestor_attributes_=ancestor_attributes, element_tag_=element_tag, element_attributes_=element_attributes):
+        for element in self._find_elements(ancestor_tag_=ancestor_tag, ancestor_attributes_=ancestor_attributes, element_tag_=element_tag, element_attributes_=element_attributes):
             element.text = text
 
     @autosave
     def set_attribute(self, attr, val, ancestor_tag="", ancestor_attributes={}, element_tag="//*", element_attributes={}):
 
-        for element in self.get_elements(ancestor_tag_=ancestor_tag, ancestor_attributes_=ancestor_attributes, element_tag_=element_tag, element_attributes_=element_attributes):
-            element.set(attr, val)
+        elements = self._find_elements(ancestor_tag_=ancestor_tag, ancestor_attributes_=ancestor_attributes, element_tag_=element_tag, element_attributes_=element_attributes)
+        self.set_attribute_elements(elements, attr, val)
 
+    #Appends a new element to every matching parent element. Each parent receives its own copy of the new element
     @autosave
     def add_element(self, new_tag, new_text, new_attributes={}, parent_tag="//*", parent_attributes={}, ancestor_tag="", ancestor_attributes={}):
         new_element = etree.Element(new_tag)
         new_element.text = new_text
         for attr in new_attributes.keys():
             new_element.set(attr, new_attributes[attr])
-        for element in self.get_elements(ancestor_tag_=ancestor_tag, ancestor_attributes_=ancestor_attributes, element_tag_=parent_tag, element_attributes_=parent_attributes):
-            element.append(new_element)
+        parents = self._find_elements(ancestor_tag_=ancestor_tag, ancestor_attributes_=ancestor_attributes, element_tag_=parent_tag, element_attributes_=parent_attributes)
+        self._append_copies(parents, [new_element])
+
+    #Appends a copy of every new element to every parent, and returns the number of parents
+    def _append_copies(self, parents, new_elements) -> int:
+        num_changed = 0
+        for parent in parents:
+            for new_element in new_elements:
+                parent.append(copy.deepcopy(new_element))
+            num_changed += 1
+        if num_changed > 0:
+            self.invalidate_index()
+        return num_changed
+
+    #Returns the elements found by an xpath query
+    def find_xpath(self, xpath_query : str):
+        if self.index_attributes:
+            steps = parse_tag_steps(xpath_query)
+            if steps is not None:
+                return self.element_index.find_steps(steps)
+        return compile_xpath(xpath_query)(self.tree)
+
+    #Updates the element index after an attribute of an element changed
+    def _update_index(self, elem, attribute : str, old_value):
+        if self._element_index is not None and not self._element_index.update(elem, attribute, old_value):
+            self.invalidate_index()
+
+    #Sets an attribute of every element, and returns the number of elements whose attribute value changed
+    def set_attribute_elements(self, elements, attribute : str, value) -> int:
+        num_changed = 0
+        for elem in elements:
+            old_value = elem.get(attribute)
+            elem.set(attribute, value)
+            if elem.get(attribute) != old_value:
+                num_changed += 1
+            self._update_index(elem, attribute, old_value)
+        return num_changed
+
+    #Adds a value to an attribute of every element with add_attribute_values, and returns the number of elements that changed.
+    #Elements without the attribute have it set to the value
+    def add_attribute_elements(self, elements, attribute : str, value) -> int:
+        num_changed = 0
+        for elem in elements:
+            old_value = elem.get(attribute)
+            if old_value is None:
+                elem.set(attribute, str(value))
+            else:
+                elem.set(attribute, add_attribute_values(old_value, value))
+            if elem.get(attribute) != old_value:
+                num_changed += 1
+            self._update_index(elem, attribute, old_value)
+        return num_changed
+
+    #Deletes an attribute from every element, and returns the number of elements that had the attribute
+    def delete_attribute_elements(self, elements, attribute : str) -> int:
+        num_changed = 0
+        for elem in elements:
+            old_value = elem.get(attribute)
+            if old_value is None:
+                continue
+            del elem.attrib[attribute]
+            num_changed += 1
+            self._update_index(elem, attribute, old_value)
+        return num_changed
+
+    #Appends a copy of the elements of an xml template to every parent element, and returns the number of parents.
+    #The template is either an xml string parsed with parse_element_template, or a list of elements
+    def add_element_elements(self, parents, template) -> int:
+        new_elements = parse_element_template(template) if isinstance(template, str) else list(template)
+        return self._append_copies(parents, new_elements)
+
+    #Removes every element from the document, and returns the number of elements removed.
+    #The root element can't be removed, and elements inside an element that was already removed aren't counted.
+    #The whitespace after the last child of a parent is kept, so that the parent's end tag stays indented
+    def delete_element_elements(self, elements) -> int:
+        num_changed = 0
+        for elem in elements:
+            parent = elem.getparent()
+            if parent is None or elem.getroottree().getroot() is not self.root:
+                continue
+            previous = elem.getprevious()
+            if previous is not None and elem.getnext() is None:
+                previous.tail = elem.tail
+            parent.remove(elem)
+            num_changed += 1
+        if num_changed > 0:
+            self.invalidate_index()
+        return num_changed
 
     @autosave
     def set_attribute_xpath(self, xpath_query : str, attribute : str, value):
         try:
-            found_elems = self.tree.xpath(xpath_query)
+            found_elems = self.find_xpath(xpath_query)
         except:
             raise ValueError("Could not find element for query {query}".format(query=xpath_query))
-        for elem in found_elems:
-            elem.set(attribute, value)
\ No newline at end of file
+        return self.set_attribute_elements(found_elems, attribute, value)
\ No newline at end of file
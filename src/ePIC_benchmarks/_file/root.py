@@ -0,0 +1,94 @@
+import hashlib
+import os
+import struct
+from pathlib import Path
+from typing import Optional
+
+import uproot as up
+
+from ePIC_benchmarks._file.types import PathType
+
+ROOT_FILE_MAGIC = b"root"
+#ROOT files with a version above this value store their seek pointers as 64 bit integers
+ROOT_LARGE_FILE_VERSION = 1000000
+#Name of the podio event tree written by npsim and eicrecon
+EVENTS_TREE_NAME = "events"
+#Suffix of the stamp files written next to the outputs of successful npsim and eicrecon executions
+OUTPUT_STAMP_SUFFIX = ".stamp"
+
+#Checks whether a ROOT file was closed properly.
+#A ROOT file only records its end of file pointer and streamer info location when it is closed,
+#so an interrupted write leaves a header that doesn't match the file's size
+def root_file_footer_valid(file_path : PathType) -> bool:
+
+    try:
+        file_size = os.path.getsize(file_path)
+        with open(file_path, "rb") as f:
+            header = f.read(64)
+    except OSError:
+        return False
+
+    if len(header) < 45 or header[:4] != ROOT_FILE_MAGIC:
+        return False
+
+    version, = struct.unpack(">i", header[4:8])
+    if version >= ROOT_LARGE_FILE_VERSION:
+        if len(header) < 53:
+            return False
+        end, = struct.unpack(">q", header[12:20])
+        seek_info, = struct.unpack(">q", header[45:53])
+    else:
+        end, = struct.unpack(">i", header[12:16])
+        seek_info, = struct.unpack(">i", header[37:41])
+    return end == file_size and 0 < seek_info < file_size
+
+#Returns the number of entries of a tree in a ROOT file, or None if the tree can't be read
+def root_file_num_entries(file_path : PathType, tree_name : str = EVENTS_TREE_NAME) -> Optional[int]:
+
+    try:
+        with up.open(file_path) as root_file:
+            return root_file[tree_name].num_entries
+    except Exception:
+        return None
+
+#Returns the path of the stamp file of an output file
+def output_stamp_path(file_path : PathType) -> Path:
+
+    file_path = Path(file_path)
+    return file_path.with_name(f"{file_path.name}{OUTPUT_STAMP_SUFFIX}")
+
+#Returns the stamp of an output file, from the exact command that wrote it and the hash of the geometry it was written with
+def output_stamp(command : str, geometry_hash : str) -> str:
+
+    return hashlib.sha256(f"{command}\0{geometry_hash}".encode()).hexdigest()
+
+#Checks whether the stamp file of an output file exists and holds the expected stamp
+def output_stamp_matches(file_path : PathType, stamp : str) -> bool:
+
+    try:
+        return output_stamp_path(file_path).read_text().strip() == stamp
+    except OSError:
+        return False
+
+#Checks whether a ROOT output file exists, is complete, holds the expected number of events,
+#and was modified after every one of its existing input files.
+#If a stamp is given, the output's stamp file must also hold it, so that outputs written by a different command
+#or geometry are not considered complete
+def root_output_complete(
+        file_path : PathType, num_events : Optional[int] = None,
+        *input_paths : Optional[PathType], tree_name : str = EVENTS_TREE_NAME,
+        stamp : Optional[str] = None) -> bool:
+
+    if not os.path.isfile(file_path) or not root_file_footer_valid(file_path):
+        return False
+    if stamp is not None and not output_stamp_matches(file_path, stamp):
+        return False
+
+    output_mtime = os.path.getmtime(file_path)
+    for input_path in input_paths:
+        if input_path is not None and os.path.exists(input_path) and os.path.getmtime(input_path) > output_mtime:
+            return False
+
+    if num_events is not None and root_file_num_entries(file_path, tree_name) != num_events:
+        return False
+    return True
@@ -0,0 +1,152 @@
+import copy
+import os
+from typing import Any, Callable, List, Optional
+
+from lxml import etree
+
+from ePIC_benchmarks._file.types import PathType
+
+#Callback that edits an element when its start tag is parsed. It receives the element and the state returned for its parent,
+#or None for the root element, and returns the state passed to the element's children
+ElementEditor = Callable[[etree._Element, Any], Any]
+
+#Streams an xml file into a new file one element at a time, without holding the whole document in memory.
+#edit_element is called with every element once its start tag is parsed, before the element is written, so it can only
+#depend on the element's attributes and on the states of its ancestors. Elements are written as soon as they are parsed and
+#released once their tail is written, so memory is bounded by the depth of the document rather than its size.
+#The output is written to a temporary file that replaces dst_path once it is complete, like write_xml_atomic,
+#and is identical to the output of write_xml_atomic for the same edits, except that empty elements with a namespaced tag or attribute
+#are written with a start and an end tag
+def stream_xml_file(src_path : PathType, dst_path : PathType, edit_element : ElementEditor) -> None:
+
+    temp_path = f"{dst_path}.tmp"
+    try:
+        with open(temp_path, "wb") as temp_file:
+            with etree.xmlfile(temp_file) as xml_file:
+                trailing_nodes = _XmlStreamWriter(xml_file, edit_element).stream(src_path)
+            #xmlfile doesn't accept any node once the root element is closed, so comments after it are written directly
+            for node in trailing_nodes:
+                temp_file.write(etree.tostring(node, with_tail=False))
+        os.replace(temp_path, dst_path)
+    except:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+#Returns a copy of a comment or processing instruction without its tail, which may not be completely parsed yet
+def _copy_without_tail(node : etree._Element) -> etree._Element:
+
+    if node.tag is etree.Comment:
+        return etree.Comment(node.text)
+    return etree.ProcessingInstruction(node.target, node.text)
+
+#Returns whether an element has no namespaced tag or attributes, so that it can be serialized on its own
+def _is_namespace_free(element : etree._Element) -> bool:
+
+    return not element.tag.startswith("{") and not any(attribute.startswith("{") for attribute in element.keys())
+
+#Open element of a streamed document. Its start tag is only written once its first child or text is parsed,
+#so that elements without content are written as empty element tags, like the in memory serializer does
+class _OpenElement:
+
+    def __init__(self, element : etree._Element, nsmap : dict, declared_nsmap : dict, state : Any):
+
+        self.element = element
+        #Namespaces in scope of the element, and the namespaces it declares itself
+        self.nsmap = nsmap
+        self.declared_nsmap = declared_nsmap
+        self.state = state
+        self.writer = None
+
+#Writes the nodes reported by iterparse to an xmlfile writer as soon as they are complete
+class _XmlStreamWriter:
+
+    def __init__(self, xml_file, edit_element : ElementEditor):
+
+        self.xml_file = xml_file
+        self.edit_element = edit_element
+        self.open_elements : List[_OpenElement] = []
+        #Node whose text, or tail, is complete once the parser reports the next node
+        self.pending_node : Optional[etree._Element] = None
+        self.pending_is_text = False
+
+    #Writes the start tag of the innermost open element if it wasn't written yet
+    def _write_start_tag(self) -> None:
+
+        if len(self.open_elements) == 0:
+            return
+        open_element = self.open_elements[-1]
+        if open_element.writer is None:
+            element = open_element.element
+            open_element.writer = self.xml_file.element(element.tag, dict(element.attrib), nsmap=open_element.declared_nsmap)
+            open_element.writer.__enter__()
+
+    #Writes the pending text of an open element, or the pending tail of a closed node and releases the node
+    def _flush_pending(self) -> None:
+
+        self._write_start_tag()
+        node = self.pending_node
+        if node is None:
+            return
+        text = node.text if self.pending_is_text else node.tail
+        if text:
+            self.xml_file.write(text)
+        if not self.pending_is_text:
+            node.getparent().remove(node)
+        self.pending_node = None
+
+    def _start(self, element : etree._Element) -> None:
+
+        self._flush_pending()
+        nsmap = element.nsmap
+        if len(self.open_elements) == 0:
+            parent_state, declared_nsmap = None, nsmap
+        else:
+            parent = self.open_elements[-1]
+            parent_state = parent.state
+            #Only the namespaces declared by the element itself are written with it
+            declared_nsmap = {prefix : uri for prefix, uri in nsmap.items() if parent.nsmap.get(prefix) != uri}
+        state = self.edit_element(element, parent_state)
+        self.open_elements.append(_OpenElement(element, nsmap, declared_nsmap, state))
+        self.pending_node, self.pending_is_text = element, True
+
+    def _end(self) -> None:
+
+        open_element = self.open_elements[-1]
+        element = open_element.element
+        #An element without children is written with its complete text but without its tail. Elements with a namespaced tag or
+        #attribute are written with start and end tags instead, since they can't be serialized on their own without declaring the namespace again
+        if open_element.writer is None and (len(open_element.nsmap) == 0 or _is_namespace_free(element)):
+            content = copy.copy(element)
+            content.tail = None
+            self.xml_file.write(content)
+            self.pending_node = None
+        else:
+            self._flush_pending()
+            open_element.writer.__exit__(None, None, None)
+        self.open_elements.pop()
+        #The root element has no tail
+        if len(self.open_elements) > 0:
+            self.pending_node, self.pending_is_text = element, False
+
+    #Streams the nodes of an xml file, and returns the comments and processing instructions after the root element
+    def stream(self, src_path : PathType) -> List[etree._Element]:
+
+        root_closed = False
+        trailing_nodes = []
+        for event, node in etree.iterparse(str(src_path), events=("start", "end", "comment", "pi")):
+            match event:
+                case "start":
+                    self._start(node)
+                case "end":
+                    self._end()
+                    root_closed = len(self.open_elements) == 0
+                case _ if root_closed:
+                    trailing_nodes.append(node)
+                case _ if len(self.open_elements) == 0:
+                    self.xml_file.write(_copy_without_tail(node))
+                case _:
+                    self._flush_pending()
+                    self.xml_file.write(_copy_without_tail(node))
+                    self.pending_node, self.pending_is_text = node, False
+        return trailing_nodes
@@ -0,0 +1,66 @@
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import List, Optional
+
+from ePIC_benchmarks._file.types import PathType
+
+#Deletes directories in the background after atomically moving them into a trash directory.
+#Directories are renamed into the trash, so their original paths can be reused immediately
+class DirectoryTrash:
+
+    trash_dir_path : Path
+    max_workers : Optional[int]
+
+    def __init__(self, trash_dir_path : PathType, max_workers : Optional[int] = None):
+
+        self.trash_dir_path = Path(trash_dir_path)
+        self.max_workers = max_workers
+        self._pool : Optional[ThreadPoolExecutor] = None
+        self._futures : List[Future] = []
+        self._lock = threading.Lock()
+
+    def _delete_in_background(self, path : Path) -> Future:
+
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="DirectoryTrash")
+            future = self._pool.submit(shutil.rmtree, path, ignore_errors=True)
+            self._futures.append(future)
+        return future
+
+    #Moves a directory into the trash and deletes it in the background.
+    #A directory that can't be renamed into the trash, such as one on another filesystem, is deleted immediately
+    def discard(self, path : PathType) -> Optional[Future]:
+
+        path = Path(path)
+        if not path.exists():
+            return None
+
+        self.trash_dir_path.mkdir(parents=True, exist_ok=True)
+        trash_path = self.trash_dir_path.joinpath(f"{path.name}-{uuid.uuid4().hex}")
+        try:
+            os.rename(path, trash_path)
+        except OSError:
+            shutil.rmtree(path, ignore_errors=True)
+            return None
+        return self._delete_in_background(trash_path)
+
+    #Deletes everything left in the trash, such as directories whose deletion was interrupted by a previous run
+    def empty(self) -> None:
+
+        if not self.trash_dir_path.is_dir():
+            return
+        for trash_path in self.trash_dir_path.iterdir():
+            self._delete_in_background(trash_path)
+
+    #Blocks until every pending deletion is complete
+    def wait(self) -> None:
+
+        with self._lock:
+            futures = list(self._futures)
+            self._futures.clear()
+        wait(futures)
@@ -1,7 +1,9 @@
-from typing import Union
+from typing import Union, Literal
 from pathlib import Path
 
 PathType = Union[str, Path]
+#How files are copied between directory trees
+TreeCopyMode = Literal['copy', 'reflink', 'hardlink']
 
 #Casts a PathType to string
 def serialize_path_type(path : PathType) -> str:
@@ -1,11 +1,69 @@
 import os
+import shutil
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Callable, Dict
 
 from pydantic import BaseModel
 
 from ePIC_benchmarks._file.supported import SUPPORTED_FILE_EXTENSIONS, FILE_EXTENSION_DUMP_MAP, FILE_EXTENSION_LOAD_MAP
-from ePIC_benchmarks._file.types import PathType
+from ePIC_benchmarks._file.types import PathType, TreeCopyMode
+
+#ioctl request that clones a file's data extents on copy-on-write filesystems (Linux FICLONE)
+FICLONE = 0x40049409
+#Directories of a copied tree that are rewritten in place, and can't share data with the source tree
+IN_PLACE_DIRECTORY_NAMES = ('build', 'install')
+
+#Copies a file as a copy-on-write clone if the filesystem supports it, otherwise copies its data
+def reflink_file(src : PathType, dst : PathType) -> PathType:
+
+    try:
+        import fcntl
+        with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+        shutil.copystat(src, dst)
+        return dst
+    except (ImportError, OSError):
+        return shutil.copy2(src, dst)
+
+#Hard links a file to its source, and copies it instead if both are on different filesystems
+def hardlink_file(src : PathType, dst : PathType) -> PathType:
+
+    try:
+        if os.path.lexists(dst):
+            os.unlink(dst)
+        os.link(src, dst)
+        return dst
+    except OSError:
+        return shutil.copy2(src, dst)
+
+TREE_COPY_FUNCTIONS : Dict[TreeCopyMode, Callable[[PathType, PathType], PathType]] = {
+    'copy': shutil.copy2,
+    'reflink': reflink_file,
+    'hardlink': hardlink_file,
+}
+
+#Copies a directory tree, sharing file data with the source tree where the copy mode allows it.
+#NOTE: Hard linked files must be replaced rather than rewritten in place, so directories that are rewritten in place are never hard linked
+def copy_tree(src : PathType, dst : PathType, mode : TreeCopyMode = 'copy') -> Path:
+
+    copy_function = TREE_COPY_FUNCTIONS[mode]
+    ignore = None
+    if mode == 'hardlink':
+        ignore = lambda directory, names : [
+            name for name in names
+            if name in IN_PLACE_DIRECTORY_NAMES and Path(directory) == Path(src)
+        ]
+    shutil.copytree(src, dst, symlinks=True, copy_function=copy_function, ignore=ignore, dirs_exist_ok=True)
+
+    if mode == 'hardlink':
+        for directory_name in IN_PLACE_DIRECTORY_NAMES:
+            src_directory = Path(src).joinpath(directory_name)
+            if src_directory.is_dir():
+                shutil.copytree(
+                    src_directory, Path(dst).joinpath(directory_name),
+                    symlinks=True, copy_function=reflink_file, dirs_exist_ok=True
+                )
+    return Path(dst)
 
 #Returns the absolute path given a parent directories absolute path, and a relative path
 def absolute_path(relative : PathType, parent : Optional[PathType]=None) -> Path:
@@ -0,0 +1,208 @@
+import bisect
+import gc
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from lxml import etree
+
+UPPERCASE_LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+LOWERCASE_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+#Lowercases attribute values the same way as xpath's translate(@attribute, 'A..Z', 'a..z'), which only folds ASCII letters
+ASCII_LOWERCASE_TABLE = str.maketrans(UPPERCASE_LETTERS, LOWERCASE_LETTERS)
+
+_ATTRIBUTE_NAME = r"[A-Za-z_][\w.\-:]*"
+_TAG_STEP_PATTERN = re.compile(r"//(?P<tag>" + _ATTRIBUTE_NAME + r")\[(?P<predicates>[^\[\]]*)\]")
+_PREDICATE_PATTERN = re.compile(
+    r"(?:translate\(@(?P<folded>" + _ATTRIBUTE_NAME + rf"), '{UPPERCASE_LETTERS}', '{LOWERCASE_LETTERS}'\)"
+    r"|@(?P<exact>" + _ATTRIBUTE_NAME + r"))='(?P<value>[^']*)'"
+)
+
+#Attribute comparison of an xpath tag step, as (attribute name, value, case sensitive)
+AttributePredicate = Tuple[str, str, bool]
+
+#Single '//tag[...]' step of an xpath query whose predicates only compare attributes to values
+class XpathTagStep(NamedTuple):
+
+    tag : str
+    predicates : Tuple[AttributePredicate, ...]
+
+def normalize_attribute_value(value : str) -> str:
+
+    #str.lower folds the same letters as the translation table for ASCII strings, and is faster
+    if value.isascii():
+        return value.lower()
+    return value.translate(ASCII_LOWERCASE_TABLE)
+
+#Splits an xpath query made of '//tag[@attribute='value' and ...]' steps, with optionally case folded attributes, into its steps.
+#Returns None for any other query, which must then be evaluated as xpath
+@lru_cache(maxsize=4096)
+def parse_tag_steps(query : str) -> Optional[Tuple[XpathTagStep, ...]]:
+
+    steps = []
+    position = 0
+    while position < len(query):
+        step_match = _TAG_STEP_PATTERN.match(query, position)
+        if step_match is None:
+            return None
+        predicate_strings = step_match.group("predicates").split(" and ")
+        predicates = []
+        for predicate_string in predicate_strings:
+            predicate_match = _PREDICATE_PATTERN.fullmatch(predicate_string)
+            if predicate_match is None:
+                return None
+            if predicate_match.group("folded") is not None:
+                predicates.append((predicate_match.group("folded"), predicate_match.group("value"), False))
+            else:
+                predicates.append((predicate_match.group("exact"), predicate_match.group("value"), True))
+        steps.append(XpathTagStep(step_match.group("tag"), tuple(predicates)))
+        position = step_match.end()
+    if len(steps) == 0:
+        return None
+    return tuple(steps)
+
+#Returns whether an element has the tag of a step and attributes matching all of its predicates
+def element_matches_step(element : etree._Element, step : XpathTagStep) -> bool:
+
+    if element.tag != step.tag:
+        return False
+    return all(
+        element.get(attribute) == value if case_sensitive
+        else normalize_attribute_value(element.get(attribute, "")) == normalize_attribute_value(value)
+        for attribute, value, case_sensitive in step.predicates
+    )
+
+_compiled_xpaths = threading.local()
+
+#Returns the compiled xpath of a query. Compiled queries are cached per thread, since lxml's XPath objects aren't shared across threads
+def compile_xpath(query : str) -> etree.XPath:
+
+    cache : Optional[Dict[str, etree.XPath]] = getattr(_compiled_xpaths, "cache", None)
+    if cache is None:
+        cache = _compiled_xpaths.cache = {}
+    compiled_xpath = cache.get(query)
+    if compiled_xpath is None:
+        compiled_xpath = cache[query] = etree.XPath(query)
+    return compiled_xpath
+
+#Index of the elements of an xml document by (tag, attribute name, lowercased attribute value), built with a single pass over the document.
+#Each indexed element has a span (position, end) in document order, such that its descendants are exactly the elements whose
+#position is in (position, end]. Nested '//a[...]//b[...]' queries are resolved by only looking up the entries of each step
+#that lie inside the spans of the previous step's matches
+class XmlElementIndex:
+
+    def __init__(self, root : etree._Element):
+
+        #Positions and elements of each (tag, attribute name, lowercased attribute value), sorted by position
+        self._entries : Dict[Tuple[str, str, str], Tuple[List[int], List[etree._Element]]] = {}
+        #Span of every indexed element, by the id of its proxy object
+        self._spans : Dict[int, Tuple[int, int]] = {}
+        #Every element with a span. lxml proxies only live while they are referenced, so the index keeps them alive,
+        #even once an update removes them from every entry. lxml then keeps returning the same proxy for each element,
+        #and the ids of the spans can't be reused by other elements
+        self._span_elements : List[etree._Element] = []
+
+        #The index allocates a few containers per attribute, which would otherwise trigger the cyclic garbage collector
+        #many times over while it is built
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._build(root)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _build(self, root : etree._Element) -> None:
+
+        #Elements are appended to their entries in document order, so entries are sorted without insertions
+        position = 0
+        open_elements : List[Tuple[etree._Element, int]] = []
+        for event, element in etree.iterwalk(root, events=("start", "end")):
+            if event == "start":
+                open_elements.append((element, position))
+                if isinstance(element.tag, str):
+                    for attribute, value in element.items():
+                        key = (element.tag, attribute, normalize_attribute_value(value))
+                        entry = self._entries.get(key)
+                        if entry is None:
+                            entry = self._entries[key] = ([], [])
+                        entry[0].append(position)
+                        entry[1].append(element)
+                position += 1
+                continue
+            element, element_position = open_elements.pop()
+            if isinstance(element.tag, str) and len(element.attrib) > 0:
+                self._spans[id(element)] = (element_position, position - 1)
+                self._span_elements.append(element)
+
+    def _insert(self, key : Tuple[str, str, str], position : int, element : etree._Element) -> None:
+
+        positions, elements = self._entries.setdefault(key, ([], []))
+        index = bisect.bisect_left(positions, position)
+        positions.insert(index, position)
+        elements.insert(index, element)
+
+    def _remove(self, key : Tuple[str, str, str], position : int) -> None:
+
+        positions, elements = self._entries.get(key, ([], []))
+        index = bisect.bisect_left(positions, position)
+        if index < len(positions) and positions[index] == position:
+            del positions[index]
+            del elements[index]
+
+    #Returns the elements of a step whose positions are inside any of the given sorted, disjoint spans, in document order.
+    #Only the entries of the step's most selective predicate are looked up, and the other predicates are checked per element
+    def _find_step(self, step : XpathTagStep, spans : Optional[Sequence[Tuple[int, int]]] = None) -> List[etree._Element]:
+
+        entries = [
+            self._entries.get((step.tag, attribute, normalize_attribute_value(value)), ([], []))
+            for attribute, value, _ in step.predicates
+        ]
+        positions, elements = min(entries, key=lambda entry : len(entry[0]))
+        if spans is None:
+            candidates = elements
+        else:
+            candidates = []
+            for start, end in spans:
+                candidates.extend(elements[bisect.bisect_right(positions, start):bisect.bisect_right(positions, end)])
+
+        return [element for element in candidates if element_matches_step(element, step)]
+
+    #Returns the elements of a tag whose attributes match every predicate, in document order
+    def find(self, tag : str, predicates : Sequence[AttributePredicate]) -> List[etree._Element]:
+
+        return self._find_step(XpathTagStep(tag, tuple(predicates)))
+
+    #Returns the elements matched by the last of a sequence of '//tag[...]' steps, in document order.
+    #Each step only matches the descendants of the previous step's matches
+    def find_steps(self, steps : Sequence[XpathTagStep]) -> List[etree._Element]:
+
+        matches : List[etree._Element] = []
+        spans : Optional[List[Tuple[int, int]]] = None
+        for step in steps:
+            matches = self._find_step(step, spans)
+            if len(matches) == 0:
+                break
+            #Matches nested inside an earlier match add no descendants, so only the outermost spans are kept
+            spans = []
+            for element in matches:
+                start, end = self._spans[id(element)]
+                if len(spans) > 0 and start <= spans[-1][1]:
+                    continue
+                spans.append((start, end))
+        return matches
+
+    #Moves an element to the entry of its new attribute value after the attribute was updated.
+    #Returns False if the element wasn't indexed, in which case the index must be rebuilt
+    def update(self, element : etree._Element, attribute : str, old_value : Optional[str]) -> bool:
+
+        span = self._spans.get(id(element))
+        if span is None:
+            return False
+        if old_value is not None:
+            self._remove((element.tag, attribute, normalize_attribute_value(old_value)), span[0])
+        new_value = element.get(attribute)
+        if new_value is not None:
+            self._insert((element.tag, attribute, normalize_attribute_value(new_value)), span[0], element)
+        return True
@@ -18,6 +18,7 @@ import uproot as ur
 
 import numpy as np
 from matplotlib import pyplot as plt
+from matplotlib.figure import Figure
 import matplotlib.pylab as plt
 
 from typing import Optional
@@ -159,6 +160,19 @@ def pre_proc(fname,dir_path):
     # now pion and params should be one-to-one
     return pion_o,pion, params #, traj
 
+## read and concatenate the events of several files
+def pre_proc_files(fnames, dir_path):
+    pion_o_list, pion_list, params_list = [], [], []
+    for fname in fnames:
+        p1, p2, p3 = pre_proc(fname, dir_path)
+        pion_o_list.append(p1)
+        pion_list.append(p2)
+        params_list.append(p3)
+    pion_o = pd.concat(pion_o_list, ignore_index=True)
+    pion   = pd.concat(pion_list, ignore_index=True)
+    params = pd.concat(params_list, ignore_index=True)
+    return pion_o, pion, params
+
 def plot_z_scores(ax, mean : float, std : float, ampl : float, max_z_mag : int):
 
     ax.axvline(x=mean)
@@ -263,29 +277,46 @@ def hist_gaus(dataset, ax, bins=100, klog=0, header=None, plot_zcores=False, max
     return float(result.params['center']), float(result.params['sigma']), float(result.params['sigma'].stderr)
 
 
-def plot_eff(pion_o, pion,eta_bins=np.linspace(-4, 4, 21)):
-
-    # logging.info(f"Generating efficiency plots")
-    # logging.info(f"Efficiency eta bins: {eta_bins}")
-
+## tracking efficiency and its uncertainty in eta bins
+def track_efficiency(pion_o, pion, eta_bins=np.linspace(-4, 4, 21)):
 
-    fig, ax = plt.subplots(1,1,figsize=[6,6])
-    plt.title("")
-    ## eff
     # original eta of all particle
     sim_eta, _ = np.histogram(pion_o['eta'].values, bins=eta_bins)
     # original eta of particles get reconstruted
     rec_eta, _ = np.histogram(pion['eta'], bins=eta_bins)
-    track_eff_total = np.sum(rec_eta) / np.sum(sim_eta)
 
     eta_centers = (eta_bins[1:] + eta_bins[:-1]) / 2.
-    eta_binsize = np.mean(np.diff(eta_centers))
     track_eff = np.nan_to_num(np.array(rec_eta) / np.array(sim_eta))
-    
+
     # binary distribution, pq*sqrt(N)
     # TODO check the errors
     # eff = np.mean(track_eff)
     track_err = np.nan_to_num(track_eff * (1. - track_eff) * np.reciprocal(np.sqrt(sim_eta)))
+    return track_eff, track_err, eta_centers, sim_eta, rec_eta
+
+## half width of the Wilson score interval of the tracking efficiency in eta bins, at z standard deviations.
+## Unlike the binomial error, it stays above zero in bins with an efficiency of 0 or 1, and is 0.5 in empty bins
+def efficiency_wilson_err(rec_eta, sim_eta, z=1.):
+
+    sim_eta = np.asarray(sim_eta, dtype=float)
+    rec_eta = np.asarray(rec_eta, dtype=float)
+    n = np.maximum(sim_eta, 1.)
+    eff = np.clip(rec_eta / n, 0., 1.)
+    err = z / (1. + z**2 / n) * np.sqrt(eff * (1. - eff) / n + z**2 / (4. * n**2))
+    return np.where(sim_eta > 0, err, 0.5)
+
+def plot_eff(pion_o, pion,eta_bins=np.linspace(-4, 4, 21)):
+
+    # logging.info(f"Generating efficiency plots")
+    # logging.info(f"Efficiency eta bins: {eta_bins}")
+
+
+    fig, ax = plt.subplots(1,1,figsize=[6,6])
+    plt.title("")
+    ## eff
+    track_eff, track_err, eta_centers, sim_eta, rec_eta = track_efficiency(pion_o, pion, eta_bins)
+    track_eff_total = np.sum(rec_eta) / np.sum(sim_eta)
+    eta_binsize = np.mean(np.diff(eta_centers))
     # rec_err = eff*(1. - eff)*np.sqrt(rec_eta)
     # track_eff_lower = track_eff - np.maximum(np.zeros(shape=rec_eta.shape), (rec_eta - rec_err)/sim_eta)
     # track_eff_upper = np.minimum(np.ones(shape=rec_eta.shape), (rec_eta + rec_err)/sim_eta) - track_eff
@@ -643,8 +674,12 @@ def performance_plot(
         momentum_min = simulation_config.momentum_min.magnitude
         momentum_max = simulation_config.momentum_max.magnitude
 
-    ## read events tree
-    pion_o, pion, params = pre_proc(file_path, dir_path)
+    ## read events tree, merging the files of every shard if a list of files is given
+    if isinstance(file_path, (list, tuple)):
+        pion_o, pion, params = pre_proc_files(file_path, dir_path)
+        file_path = os.path.commonprefix([str(path) for path in file_path])
+    else:
+        pion_o, pion, params = pre_proc(file_path, dir_path)
     
     ## chain files (for now use s3 format)
     ii = 1
@@ -756,4 +791,29 @@ def performance_plot(
             raise RuntimeError(err)
 
 
-
+## estimate the uncertainties of the momentum resolution and tracking efficiency of reconstructed files,
+## used by adaptive simulations to decide whether more events are required
+def simulation_precision(file_paths, dir_path=None, eff_eta_bins=np.arange(-4, 4.1, 0.5), min_bin_events=100):
+
+    pion_o, pion, params = pre_proc_files(file_paths, dir_path)
+    precision = {"num_events": int(len(pion_o)), "momentum_resolution_err": None, "efficiency_err": None}
+
+    ## largest efficiency uncertainty of the eta bins with at least min_bin_events particles, from the Wilson score interval
+    ## so that bins with an efficiency of 0 or 1 don't reach any target after a few events
+    _, _, _, sim_eta, rec_eta = track_efficiency(pion_o, pion, eff_eta_bins)
+    populated = sim_eta >= min_bin_events
+    if np.any(populated):
+        track_err = efficiency_wilson_err(rec_eta, sim_eta)
+        precision["efficiency_err"] = float(np.max(track_err[populated]))
+
+    ## relative uncertainty of the fitted momentum resolution, without saving its plot
+    if len(pion) > 0:
+        fig = Figure()
+        ax = fig.add_subplot()
+        rec_p = 1./np.array(params['qOverP'])
+        sim_p = np.array(pion['mom'])
+        dp_p = 100 * (rec_p - sim_p) / sim_p
+        _, sig_mom, err_mom = hist_gaus(dp_p, ax, np.linspace(-40, 40, 201))
+        if sig_mom > 0 and err_mom > 0:
+            precision["momentum_resolution_err"] = float(err_mom / sig_mom)
+    return precision
@@ -1,3 +1,4 @@
 from .config import BenchmarkConfig
+from .sweep import BenchmarkSweep
 
-__all__ = ['BenchmarkConfig']
\ No newline at end of file
+__all__ = ['BenchmarkConfig', 'BenchmarkSweep']
\ No newline at end of file
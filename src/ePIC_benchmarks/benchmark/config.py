@@ -1,14 +1,19 @@
 
+import json
 import uuid
 from pathlib import Path
-from typing import Optional, List, Any, Self
+from typing import Optional, List, Any, Self, Tuple, Dict, FrozenSet
 
-from pydantic import BaseModel, Field, field_validator, model_serializer, model_validator, ConfigDict
+from pydantic import BaseModel, Field, PrivateAttr, ModelWrapValidatorHandler, field_validator, model_serializer, model_validator, ConfigDict
 from pydantic_core.core_schema import ValidationInfo
 
 from ePIC_benchmarks.detector.config import DetectorConfig
+from ePIC_benchmarks.detector.edits import FileEditStatistics, apply_detector_edits
+from ePIC_benchmarks.detector.geometry import geometry_hash
 from ePIC_benchmarks.simulation.config import SimulationConfig
+from ePIC_benchmarks.simulation.sweep import SimulationSweep
 from ePIC_benchmarks.utils.equality import any_identical_objects
+from ePIC_benchmarks.utils.lookup import build_name_index, indexed_lookup
 from ePIC_benchmarks._file.types import PathType
 
 class BenchmarkConfig(BaseModel):
@@ -39,6 +44,13 @@ class BenchmarkConfig(BaseModel):
             " simulation / reconstruction related tasks"
         )
     )
+    simulation_sweeps : List[SimulationSweep] = Field(
+        default_factory=list,
+        description=(
+            "List of SimulationSweep objects"
+            " which are expanded into simulation configs"
+        )
+    )
     generate_material_map : bool = Field(
         default=False,
         description="Generates a material map if set to to True"
@@ -88,6 +100,51 @@ class BenchmarkConfig(BaseModel):
         default="reconstructions_temp",
         init=False
     )
+    #Index of simulation configs by name
+    _simulation_index : Dict[str, SimulationConfig] = PrivateAttr(default_factory=dict)
+    #Shards of adaptive simulations by name, which are created while a workflow runs and are never serialized
+    _shard_index : Dict[str, SimulationConfig] = PrivateAttr(default_factory=dict)
+    #Names of the simulation configs that were generated by sweeps, which are serialized as their sweeps
+    _swept_simulation_names : FrozenSet[str] = PrivateAttr(default_factory=frozenset)
+
+    #Expands simulation sweeps into simulation configs.
+    #Simulation configs that are listed explicitly take precedence over sweep simulations of the same name
+    @model_validator(mode='wrap')
+    @classmethod
+    def expand_simulation_sweeps(cls, data : Any, handler : ModelWrapValidatorHandler[Self]) -> Self:
+
+        #Revalidated instances keep the simulations that their sweeps generated
+        if isinstance(data, cls):
+            benchmark_config = handler(data)
+            benchmark_config._swept_simulation_names = data._swept_simulation_names
+            return benchmark_config
+        if not isinstance(data, dict) or not data.get("simulation_sweeps"):
+            return handler(data)
+
+        simulation_sweeps = [
+            SimulationSweep.model_validate(simulation_sweep) for simulation_sweep in data["simulation_sweeps"]
+        ]
+        simulation_configs = list(data.get("simulation_configs", []))
+        simulation_names = set()
+        for simulation_config in simulation_configs:
+            if isinstance(simulation_config, SimulationConfig):
+                simulation_names.add(simulation_config.name)
+            elif isinstance(simulation_config, dict):
+                simulation_names.add(simulation_config.get("name"))
+
+        swept_names = set()
+        for simulation_sweep in simulation_sweeps:
+            for point in simulation_sweep.points():
+                if simulation_sweep.point_name(point) in simulation_names:
+                    continue
+                simulation_config = simulation_sweep.simulation_config(point)
+                simulation_names.add(simulation_config.name)
+                swept_names.add(simulation_config.name)
+                simulation_configs.append(simulation_config)
+
+        benchmark_config = handler({**data, "simulation_configs": simulation_configs, "simulation_sweeps": simulation_sweeps})
+        benchmark_config._swept_simulation_names = frozenset(swept_names)
+        return benchmark_config
 
     #Provides unique name to benchmark if its not provided during instance initialization
     @field_validator('name', mode='after')
@@ -155,6 +212,12 @@ class BenchmarkConfig(BaseModel):
         return self
 
 
+    @model_validator(mode='after')
+    def index_simulation_configs(self) -> Self:
+
+        self._simulation_index = build_name_index(self.simulation_configs)
+        return self
+
     @model_validator(mode='after')
     def validate_unique_directories(self) -> Self:
 
@@ -189,26 +252,50 @@ class BenchmarkConfig(BaseModel):
         serialized_dict["detector_configs"] = [
             detector_config.model_dump() for detector_config in self.detector_configs
         ]
+        #Simulations generated by sweeps are serialized as their sweeps, and listed simulations that override a sweep point are kept
         serialized_dict["simulation_configs"] = [
             sim_config.model_dump() for sim_config in self.simulation_configs
+            if sim_config.name not in self._swept_simulation_names
         ]
+        if self.simulation_sweeps:
+            serialized_dict["simulation_sweeps"] = [
+                simulation_sweep.model_dump(exclude_defaults=True) for simulation_sweep in self.simulation_sweeps
+            ]
         
         return serialized_dict
 
     def add_simulation_config(self, simulation_config: SimulationConfig) -> None:
         self.simulation_configs.append(simulation_config)
+        self._simulation_index.setdefault(simulation_config.name, simulation_config)
 
     def add_detector_config(self, detector_config: DetectorConfig) -> None:
         self.detector_configs.append(detector_config)
 
     def get_simulation_config(self, simulation_name : str) -> SimulationConfig:
 
-        for simulation in self.simulation_configs:
-            if simulation.name == simulation_name:
-                return simulation
+        simulation = indexed_lookup(self._simulation_index, self.simulation_configs, simulation_name)
+        if simulation is not None:
+            return simulation
+        if simulation_name in self._shard_index:
+            return self._shard_index[simulation_name]
         err = f"Simulation config with name '{simulation_name}' not found"
         raise ValueError(err)
 
+    #Returns a shard of an adaptive simulation, registering it so that it can be looked up by name
+    def simulation_shard(self, simulation_name : str, shard_index : int) -> SimulationConfig:
+
+        shard_config = self.get_simulation_config(simulation_name).shard(shard_index)
+        return self._shard_index.setdefault(shard_config.name, shard_config)
+
+    #Returns a hashable key that is identical for benchmarks that produce identical ePIC builds
+    def build_key(self) -> Tuple[str, ...]:
+
+        detector_config_keys = tuple(
+            json.dumps(detector_config.model_dump(), sort_keys=True, default=str)
+            for detector_config in self.detector_configs
+        )
+        return (self.epic_branch, str(self.existing_epic_directory_path)) + detector_config_keys
+
     def npsim_command_str(self, simulation_name : str) -> str:
 
         raise NotImplementedError()
@@ -217,12 +304,18 @@ class BenchmarkConfig(BaseModel):
 
         raise NotImplementedError()
 
-    def apply_detector_configs(self, working_dir : PathType):
+    #Applies the changes of every DetectorConfig to the ePIC repository, and returns the edit statistics of each edited file
+    def apply_detector_configs(self, working_dir : PathType, max_workers : Optional[int] = None) -> Dict[Path, FileEditStatistics]:
 
-        for detector_config in self.detector_configs:
-            epic_dir = self.epic_repo_path(working_dir)
-            epic_compact_dir = epic_dir.joinpath('compact')
-            detector_config.apply_changes(directory_path=epic_compact_dir)
+        epic_compact_dir = self.epic_repo_path(working_dir).joinpath('compact')
+        return apply_detector_edits(self.detector_configs, directory_path=epic_compact_dir, max_workers=max_workers)
+
+    #Returns the hash of the geometry of the ePIC repository's compact directory, once the DetectorConfigs are applied.
+    #Benchmarks with identical geometry hashes build identical geometries, even if their DetectorConfigs differ
+    def geometry_hash(self, working_dir : PathType) -> str:
+
+        epic_compact_dir = self.epic_repo_path(working_dir).joinpath('compact')
+        return geometry_hash(epic_compact_dir)
 
     def simulation_names(self):
         names = []
@@ -284,13 +377,13 @@ class BenchmarkConfig(BaseModel):
 
     def detector_build_path(self, simulation_name : str, working_dir : PathType) -> Path:
         simulation_config = self.get_simulation_config(simulation_name)
-        detector_relative_path = simulation_config.detector_relative_path
         epic_path = self.epic_repo_path(working_dir)
-        return epic_path.joinpath(detector_relative_path)
+        return simulation_config._abs_detector_path(epic_path)
 
-    def npsim_cmd(self, simulation_name : str, working_dir : PathType) -> str:
+    def npsim_cmd(self, simulation_name : str, working_dir : PathType, epic_path : Optional[PathType] = None) -> str:
         simulation_config = self.get_simulation_config(simulation_name)
-        epic_path = self.epic_repo_path(working_dir)
+        if epic_path is None:
+            epic_path = self.epic_repo_path(working_dir)
         simulation_out_dir = self.simulation_out_dir_path(working_dir)
         npsim_cmd_str = simulation_config.npsim_cmd(
             epic_repo_path=epic_path,
@@ -298,9 +391,10 @@ class BenchmarkConfig(BaseModel):
         )
         return npsim_cmd_str
 
-    def eicrecon_cmd(self, simulation_name : str, working_dir : PathType) -> str:
+    def eicrecon_cmd(self, simulation_name : str, working_dir : PathType, epic_path : Optional[PathType] = None) -> str:
         simulation_config = self.get_simulation_config(simulation_name)
-        epic_path = self.epic_repo_path(working_dir)
+        if epic_path is None:
+            epic_path = self.epic_repo_path(working_dir)
         simulation_out_dir = self.simulation_out_dir_path(working_dir)
         reconstruction_out_dir = self.reconstruction_out_dir_path(working_dir)
         eicrecon_cmd_str = simulation_config.eicrecon_cmd(
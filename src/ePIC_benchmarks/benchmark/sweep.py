@@ -0,0 +1,27 @@
+from typing import Any, Dict, Iterator
+
+from pydantic import Field
+
+from ePIC_benchmarks.benchmark.config import BenchmarkConfig
+from ePIC_benchmarks.utils.sweep import SweepConfig, substitute_template
+
+#Sweep that lazily expands a benchmark template into one BenchmarkConfig per point.
+#Parameters are used as '${parameter}' in the template, ex: for the values of detector config edits
+class BenchmarkSweep(SweepConfig):
+
+    name_prefix : str = Field(default="benchmark", description="Prefix of the generated benchmark names")
+    benchmark : Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Fields shared by every benchmark of the sweep"
+    )
+
+    def benchmark_config(self, point : Dict[str, Any]) -> BenchmarkConfig:
+
+        benchmark_kwargs = substitute_template(self.benchmark, point)
+        benchmark_kwargs["name"] = self.point_name(point)
+        return BenchmarkConfig.model_validate(benchmark_kwargs)
+
+    def __iter__(self) -> Iterator[BenchmarkConfig]:
+
+        for point in self.points():
+            yield self.benchmark_config(point)
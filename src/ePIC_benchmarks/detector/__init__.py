@@ -1,3 +1,9 @@
 from .config import DetectorConfig
+from .constants import ConstantEvaluator, validate_detector_edits
+from .edits import apply_detector_edits
+from .geometry import GeometryDiff, GeometryHasher, geometry_hash, geometry_file_hashes, diff_geometries
+from .variants import DetectorVariant, create_detector_variants
 
-__all__ = ['DetectorConfig']
\ No newline at end of file
+__all__ = ['DetectorConfig', 'ConstantEvaluator', 'validate_detector_edits', 'apply_detector_edits',
+           'GeometryDiff', 'GeometryHasher', 'geometry_hash', 'geometry_file_hashes', 'diff_geometries',
+           'DetectorVariant', 'create_detector_variants']
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Any, Dict, Union, Optional, Self, Literal, Sequence, Annotated
+from typing import Any, Dict, List, Union, Optional, Self, Literal, Sequence, Annotated
 
 from pydantic import (
     BaseModel, ConfigDict, field_validator, model_serializer,
@@ -8,6 +8,7 @@ from pydantic import (
 
 from ePIC_benchmarks._file.editors import XmlEditor
 from ePIC_benchmarks.detector.xpath import DetectorConfigXpath
+from ePIC_benchmarks.detector.edits import apply_detector_edits
 from ePIC_benchmarks.detector.xml_elements._base import XmlElement, XmlElementList
 from ePIC_benchmarks.detector.xml_elements.detector import *
 from ePIC_benchmarks.detector.xml_elements.constant import *
@@ -30,7 +31,14 @@ XmlElementDiscriminator = Annotated[XmlElementUnion, Field(discriminator='elemen
 class XmlElementDiscriminatedList(RootModel):
     
     model_config = ConfigDict(strict=True)
-    root : SerializeAsAny[Sequence[XmlElementDiscriminator]]
+    #Lists are validated by pydantic-core directly, unlike generic sequences which are validated in python
+    root : SerializeAsAny[List[XmlElementDiscriminator]]
+
+    @field_validator('root', mode='before')
+    def validate_root(cls, v : Any) -> Any:
+        if isinstance(v, tuple):
+            return list(v)
+        return v
 
     def __iter__(self):
         return iter(self.root)
@@ -49,57 +57,14 @@ class DetectorConfig(BaseModel):
         )
     )
 
-    edit_element_trees : Union[XmlElementDiscriminator, XmlElementDiscriminatedList]
+    #Serialized as its own type, instead of trying each type of the union
+    edit_element_trees : SerializeAsAny[Union[XmlElementDiscriminator, XmlElementDiscriminatedList]]
 
+    #Applies every update to the detector description file, which is parsed and written once
     def apply_changes(self, directory_path : Optional[PathType]=None):
 
-        xml_path = Path(self.file)
-        if directory_path:
-            if isinstance(directory_path, str):
-                directory_path = Path(directory_path)
-            elif isinstance(directory_path, Path):
-                directory_path = directory_path
-            else:
-                raise ValueError("Directory path must be a valid path")
-            xml_path = directory_path.joinpath(xml_path)
-        if not xml_path.exists():
-            err = f"Path '{xml_path}' does not exist"
-            raise ValueError(err)
-
-        try:
-            xml_editor = XmlEditor(xml_path, autosave=False)
-        except:
-            err = f"Could not load file '{xml_path}'"
-            raise ValueError(err)
-
-        queries = self._all_queries()
-
-        for q in queries:
-
-            xml_query, update_attribute, update_type, update_value = q
-            match update_type:
-                case "SET":
-                    try:
-                        xml_editor.set_attribute_xpath(xml_query, update_attribute, update_value)
-                    except:
-                        err = (
-                            f"could not make update with:\n[\n"
-                            f"    Query: {xml_query}\n"
-                            f"    Update Attribute: {update_attribute}\n"
-                            f"    Update Value: {update_value}\n]"
-                        )
-                        raise ValueError(err)
-                case "ADD":
-                    raise NotImplementedError()
-                case "DELETE":
-                    raise NotImplementedError()
-                
-            try:
-                xml_editor.save()
-            except:
-                err = f"Could not save updated xml file '{xml_path}'"
-                raise ValueError(err)
-        
+        apply_detector_edits([self], directory_path=directory_path)
+
     def _all_queries(self):
 
         queries = []
@@ -111,6 +76,15 @@ class DetectorConfig(BaseModel):
                 for query in element_tree.create_queries():
                     queries.append(query) 
         return queries
+
+    #Returns the queries that update an attribute which DD4hep evaluates as an expression
+    def _expression_queries(self):
+
+        element_trees = self.edit_element_trees if hasattr(self.edit_element_trees, '__iter__') else [self.edit_element_trees]
+        queries = []
+        for element_tree in element_trees:
+            queries.extend(element_tree.create_expression_queries())
+        return queries
     
     #Validates whether the detector description file is valid
     @field_validator('file', mode='after')
@@ -0,0 +1,472 @@
+import ast
+import math
+import warnings
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple, TYPE_CHECKING
+
+from lxml import etree
+
+from ePIC_benchmarks._file.editors import add_attribute_values
+from ePIC_benchmarks._file.types import PathType
+from ePIC_benchmarks._file.xml_index import element_matches_step, parse_tag_steps
+
+if TYPE_CHECKING:
+    from ePIC_benchmarks.detector.config import DetectorConfig
+
+#Units of the CLHEP system of units that DD4hep's expression evaluator defines, where millimeter, nanosecond,
+#MeV, the positron charge, kelvin, mole, candela and radian are 1
+_ELECTRON_CHARGE_SI = 1.602176634e-19
+_MILLIMETER = 1.0
+_METER = 1000.0 * _MILLIMETER
+_NANOSECOND = 1.0
+_SECOND = 1.0e9 * _NANOSECOND
+_MEGAELECTRONVOLT = 1.0
+_ELECTRONVOLT = 1.0e-6 * _MEGAELECTRONVOLT
+_JOULE = _ELECTRONVOLT / _ELECTRON_CHARGE_SI
+_KILOGRAM = _JOULE * _SECOND * _SECOND / (_METER * _METER)
+_COULOMB = 1.0 / _ELECTRON_CHARGE_SI
+_VOLT = 1.0e-6 * _MEGAELECTRONVOLT
+_TESLA = _VOLT * _SECOND / (_METER * _METER)
+
+UNITS : Dict[str, float] = {
+    #Length
+    "nm" : 1.0e-6, "nanometer" : 1.0e-6,
+    "um" : 1.0e-3, "micrometer" : 1.0e-3, "micron" : 1.0e-3,
+    "mm" : _MILLIMETER, "millimeter" : _MILLIMETER,
+    "cm" : 10.0, "centimeter" : 10.0,
+    "m" : _METER, "meter" : _METER,
+    "km" : 1.0e3 * _METER, "kilometer" : 1.0e3 * _METER,
+    "fermi" : 1.0e-12, "fm" : 1.0e-12, "angstrom" : 1.0e-7,
+    "mm2" : 1.0, "cm2" : 1.0e2, "m2" : 1.0e6, "mm3" : 1.0, "cm3" : 1.0e3, "m3" : 1.0e9,
+    #Angle
+    "rad" : 1.0, "radian" : 1.0, "mrad" : 1.0e-3, "milliradian" : 1.0e-3,
+    "deg" : math.pi / 180.0, "degree" : math.pi / 180.0, "sr" : 1.0, "steradian" : 1.0,
+    #Time
+    "ps" : 1.0e-3, "picosecond" : 1.0e-3, "ns" : _NANOSECOND, "nanosecond" : _NANOSECOND,
+    "us" : 1.0e3, "microsecond" : 1.0e3, "ms" : 1.0e6, "millisecond" : 1.0e6, "s" : _SECOND, "second" : _SECOND,
+    "hertz" : 1.0 / _SECOND, "kilohertz" : 1.0e3 / _SECOND, "megahertz" : 1.0e6 / _SECOND,
+    #Energy
+    "eV" : _ELECTRONVOLT, "electronvolt" : _ELECTRONVOLT, "keV" : 1.0e-3, "kiloelectronvolt" : 1.0e-3,
+    "MeV" : _MEGAELECTRONVOLT, "megaelectronvolt" : _MEGAELECTRONVOLT, "GeV" : 1.0e3, "gigaelectronvolt" : 1.0e3,
+    "TeV" : 1.0e6, "teraelectronvolt" : 1.0e6, "PeV" : 1.0e9, "petaelectronvolt" : 1.0e9, "joule" : _JOULE,
+    #Mass
+    "kg" : _KILOGRAM, "kilogram" : _KILOGRAM, "g" : 1.0e-3 * _KILOGRAM, "gram" : 1.0e-3 * _KILOGRAM,
+    "mg" : 1.0e-6 * _KILOGRAM, "milligram" : 1.0e-6 * _KILOGRAM,
+    #Charge, current, potential and magnetic field
+    "eplus" : 1.0, "coulomb" : _COULOMB, "ampere" : _COULOMB / _SECOND,
+    "volt" : _VOLT, "kilovolt" : 1.0e-3, "megavolt" : 1.0,
+    "tesla" : _TESLA, "T" : _TESLA, "gauss" : 1.0e-4 * _TESLA, "kilogauss" : 0.1 * _TESLA,
+    #Temperature, amount of substance and luminous intensity
+    "kelvin" : 1.0, "K" : 1.0, "mole" : 1.0, "mol" : 1.0, "candela" : 1.0, "cd" : 1.0,
+    #Dimensionless
+    "perCent" : 0.01, "perThousand" : 0.001, "perMillion" : 1.0e-6,
+    #Mathematical constants
+    "pi" : math.pi, "e" : math.e, "gamma" : 0.577215664901532861,
+}
+
+FUNCTIONS = {
+    "abs" : abs, "min" : min, "max" : max, "sqrt" : math.sqrt, "pow" : math.pow,
+    "sin" : math.sin, "cos" : math.cos, "tan" : math.tan,
+    "asin" : math.asin, "acos" : math.acos, "atan" : math.atan, "atan2" : math.atan2,
+    "sinh" : math.sinh, "cosh" : math.cosh, "tanh" : math.tanh,
+    "exp" : math.exp, "log" : math.log, "log10" : math.log10,
+}
+
+_OPERATOR_NODES = (
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.UAdd, ast.USub,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+
+#Raised when an expression references a constant that isn't defined, ex: because it is defined outside of the compact directory
+class UndefinedConstantError(ValueError):
+
+    def __init__(self, message : str, name : str):
+
+        super().__init__(message)
+        self.name = name
+
+#Converts the integer literals of an expression to floats, so that it is evaluated in double precision like DD4hep does,
+#and an integer power such as 9^9^9 overflows instead of being computed exactly
+class _FloatLiterals(ast.NodeTransformer):
+
+    def visit_Constant(self, node : ast.Constant) -> ast.Constant:
+
+        if isinstance(node.value, int):
+            return ast.copy_location(ast.Constant(float(node.value)), node)
+        return node
+
+#Expression parsed into a compiled python expression, with the constants and units it references
+class ParsedExpression(NamedTuple):
+
+    code : object
+    names : FrozenSet[str]
+
+#Parses a DD4hep expression, in which '^' is the power operator, into an expression that only contains numbers, names,
+#arithmetic and comparison operators, and calls of FUNCTIONS. Raises a ValueError for any other expression
+@lru_cache(maxsize=16384)
+def parse_expression(expression : str) -> ParsedExpression:
+
+    try:
+        tree = ast.parse(expression.strip().replace("^", "**"), mode="eval")
+    except SyntaxError:
+        err = f"Invalid expression '{expression}'"
+        raise ValueError(err)
+
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if node.id not in FUNCTIONS:
+                names.add(node.id)
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or len(node.keywords) > 0:
+                err = f"Unsupported function call '{ast.unparse(node)}' in expression '{expression}'"
+                raise ValueError(err)
+        elif isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float)) or isinstance(node.value, bool):
+                err = f"Unsupported value '{ast.unparse(node)}' in expression '{expression}'"
+                raise ValueError(err)
+        elif not isinstance(node, (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Load) + _OPERATOR_NODES):
+            #Operator nodes have no source of their own, so they are reported by name
+            if isinstance(node, (ast.operator, ast.unaryop, ast.cmpop, ast.boolop)):
+                err = f"Unsupported operator '{type(node).__name__}' in expression '{expression}'"
+            else:
+                err = f"Unsupported syntax '{ast.unparse(node)}' in expression '{expression}'"
+            raise ValueError(err)
+    tree = ast.fix_missing_locations(_FloatLiterals().visit(tree))
+    return ParsedExpression(compile(tree, "<expression>", "eval"), frozenset(names))
+
+#Yields the named, non string <constant> elements of the <define> sections of a file. The file is streamed, and every element
+#is released once it was yielded, so large files aren't held in memory
+def iter_constant_definitions(xml_path : PathType) -> Iterator[etree._Element]:
+
+    for _, element in etree.iterparse(str(xml_path), events=("end",)):
+        parent = element.getparent()
+        if element.tag == "constant" and parent is not None and parent.tag == "define":
+            if element.get("name") is not None and element.get("type") != "string":
+                yield element
+        element.clear(keep_tail=True)
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
+
+#Evaluates the <constant> definitions of a compact directory, and expressions that reference them.
+#Constants are evaluated on demand in topological order of their references and memoized, so every constant is evaluated once
+#until it or a constant it references is redefined
+class ConstantEvaluator:
+
+    def __init__(self, expressions : Optional[Dict[str, str]] = None):
+
+        self._expressions : Dict[str, str] = dict(expressions or {})
+        self._values : Dict[str, float] = {}
+        #Files that define each constant, if it was read from a compact directory
+        self.sources : Dict[str, Path] = {}
+
+    #Reads the <constant> definitions of every xml file of a compact directory, skipping string constants.
+    #DD4hep only loads the files that a detector configuration includes, so when several files define a constant,
+    #the first definition in path order is used
+    @classmethod
+    def from_compact_dir(cls, compact_dir : PathType) -> "ConstantEvaluator":
+
+        compact_dir_path = Path(compact_dir)
+        evaluator = cls()
+        for xml_path in sorted(compact_dir_path.rglob("*.xml")):
+            try:
+                evaluator._read_constants(xml_path)
+            except (OSError, etree.XMLSyntaxError):
+                continue
+        return evaluator
+
+    def _read_constants(self, xml_path : Path) -> None:
+
+        for constant in iter_constant_definitions(xml_path):
+            name, value = constant.get("name"), constant.get("value")
+            if value is not None and name not in self._expressions:
+                self._expressions[name] = value
+                self.sources[name] = xml_path
+
+    #Returns an evaluator with the same constants and memoized values, whose constants can be edited independently
+    def copy(self) -> "ConstantEvaluator":
+
+        evaluator = ConstantEvaluator(self._expressions)
+        evaluator._values = dict(self._values)
+        evaluator.sources = dict(self.sources)
+        return evaluator
+
+    def __contains__(self, name : str) -> bool:
+
+        return name in self._expressions
+
+    def expression(self, name : str) -> str:
+
+        return self._expressions[name]
+
+    def constant_names(self) -> List[str]:
+
+        return list(self._expressions.keys())
+
+    #Returns the value of a constant, evaluating the constants it references first
+    def value(self, name : str) -> float:
+
+        value = self._values.get(name)
+        if value is not None:
+            return value
+        if name not in self._expressions:
+            if name in UNITS:
+                return UNITS[name]
+            err = f"Undefined constant '{name}'"
+            raise UndefinedConstantError(err, name)
+
+        #Depth first search over the unevaluated constants that the constant references, evaluating each constant
+        #after all of its references. Constants that are being expanded form the current reference path
+        expanding : List[str] = []
+        expanding_set : Set[str] = set()
+        stack = [(name, False)]
+        while len(stack) > 0:
+            current, expanded = stack.pop()
+            if current in self._values:
+                continue
+            if expanded:
+                self._values[current] = self._evaluate(self._expressions[current], current)
+                expanding.pop()
+                expanding_set.discard(current)
+                continue
+            expanding.append(current)
+            expanding_set.add(current)
+            stack.append((current, True))
+            for reference in self._references(current):
+                if reference in expanding_set:
+                    #The cycle starts at its first name in sorted order, so that it is reported the same from any of its constants
+                    cycle = expanding[expanding.index(reference):]
+                    start = cycle.index(min(cycle))
+                    cycle = cycle[start:] + cycle[:start] + [cycle[start]]
+                    err = f"Constants reference each other in a cycle: {' -> '.join(cycle)}"
+                    raise ValueError(err)
+                if reference not in self._values:
+                    stack.append((reference, False))
+        return self._values[name]
+
+    #Returns the constants that a constant references, raising a ValueError for undefined names
+    def _references(self, name : str) -> List[str]:
+
+        references = []
+        for reference in sorted(self._parse(self._expressions[name], name).names):
+            if reference in self._expressions:
+                references.append(reference)
+            elif reference not in UNITS:
+                err = f"Constant '{name}' references undefined constant '{reference}'"
+                raise UndefinedConstantError(err, reference)
+        return references
+
+    def _parse(self, expression : str, name : Optional[str] = None) -> ParsedExpression:
+
+        try:
+            return parse_expression(expression)
+        except ValueError as e:
+            if name is None:
+                raise
+            err = f"Constant '{name}': {e}"
+            raise ValueError(err)
+
+    def _evaluate(self, expression : str, name : Optional[str] = None) -> float:
+
+        parsed_expression = self._parse(expression, name)
+        namespace = dict(FUNCTIONS)
+        for reference in parsed_expression.names:
+            namespace[reference] = self._values[reference] if reference in self._expressions else UNITS[reference]
+        try:
+            return float(eval(parsed_expression.code, {"__builtins__" : {}}, namespace))
+        except (ArithmeticError, ValueError, TypeError) as e:
+            subject = f"constant '{name}'" if name is not None else f"expression '{expression}'"
+            err = f"Could not evaluate {subject}: {e}"
+            raise ValueError(err)
+
+    #Evaluates an expression that may reference constants and units
+    def evaluate(self, expression : str) -> float:
+
+        parsed_expression = self._parse(str(expression))
+        for reference in parsed_expression.names:
+            if reference in self._expressions:
+                self.value(reference)
+            elif reference not in UNITS:
+                err = f"Expression '{expression}' references undefined constant '{reference}'"
+                raise UndefinedConstantError(err, reference)
+        return self._evaluate(str(expression))
+
+    #Returns the constants that reference any of the given constants, directly or through other constants
+    def dependents(self, names : Iterable[str]) -> Set[str]:
+
+        referenced_by : Dict[str, List[str]] = {}
+        for name, expression in self._expressions.items():
+            try:
+                references = parse_expression(expression).names
+            except ValueError:
+                continue
+            for reference in references:
+                referenced_by.setdefault(reference, []).append(name)
+
+        dependents = set()
+        stack = list(names)
+        while len(stack) > 0:
+            for dependent in referenced_by.get(stack.pop(), ()):
+                if dependent not in dependents:
+                    dependents.add(dependent)
+                    stack.append(dependent)
+        return dependents
+
+    #Defines or redefines a constant, and forgets the values of the constants that depend on it
+    def set_constant(self, name : str, expression : str) -> None:
+
+        self._forget([name])
+        self._expressions[name] = str(expression)
+
+    def delete_constant(self, name : str) -> None:
+
+        self._forget([name])
+        self._expressions.pop(name, None)
+        self.sources.pop(name, None)
+
+    def _forget(self, names : Sequence[str]) -> None:
+
+        if not any(name in self._values for name in names):
+            return
+        for name in list(names) + list(self.dependents(names)):
+            self._values.pop(name, None)
+
+#Returns whether a query edits the name or value of <constant> elements, or deletes them
+def _is_constant_query(query) -> bool:
+
+    xml_query, update_attribute, update_type, _ = query
+    steps = parse_tag_steps(xml_query)
+    if steps is None or steps[-1].tag != "constant":
+        return False
+    return update_attribute in ("name", "value") or (update_attribute is None and update_type == "DELETE")
+
+#Returns the (name, value) of the <constant> definitions of a file that match the last step of each query, in one pass over the file
+def _find_constants(xml_path : Path, queries : Sequence) -> List[List[Tuple[str, Optional[str]]]]:
+
+    last_steps = [parse_tag_steps(xml_query)[-1] for xml_query, _, _, _ in queries]
+    found_constants = [[] for _ in queries]
+    for constant in iter_constant_definitions(xml_path):
+        for step, constants in zip(last_steps, found_constants):
+            if element_matches_step(constant, step):
+                constants.append((constant.get("name"), constant.get("value")))
+    return found_constants
+
+#Applies the edits of a query to the definitions of the constants it matched, and returns the names of the constants it changed
+def _apply_constant_query(evaluator : ConstantEvaluator, query, constants : Sequence[Tuple[str, Optional[str]]]) -> List[str]:
+
+    _, update_attribute, update_type, update_value = query
+    changed = []
+    for name, value in constants:
+        old_expression = evaluator.expression(name) if name in evaluator else value
+        if update_attribute is None:
+            evaluator.delete_constant(name)
+            changed.append(name)
+        elif update_attribute == "value":
+            if update_type == "DELETE":
+                evaluator.delete_constant(name)
+            elif update_type == "ADD" and old_expression is not None:
+                evaluator.set_constant(name, add_attribute_values(old_expression, update_value))
+            else:
+                evaluator.set_constant(name, str(update_value))
+            changed.append(name)
+        elif update_attribute == "name":
+            evaluator.delete_constant(name)
+            changed.append(name)
+            if update_type != "DELETE" and old_expression is not None:
+                new_name = str(update_value) if update_type == "SET" else add_attribute_values(name, update_value)
+                evaluator.set_constant(new_name, old_expression)
+                changed.append(new_name)
+    return changed
+
+#Returns whether a value references a name that isn't a unit, and so can only be evaluated with the constants of a compact directory
+def _references_constants(value) -> bool:
+
+    try:
+        return not parse_expression(str(value)).names <= UNITS.keys()
+    except ValueError:
+        return False
+
+#Returns whether validating the edits of the DetectorConfigs requires the constants of the compact directory they edit.
+#Numbers and expressions of units are validated without them, so the compact directory is only read if some edited value
+#references a constant, or if an edit renames, deletes or adds to a constant, which changes the constants that reference it
+def detector_edits_require_constants(detector_configs : Sequence["DetectorConfig"]) -> bool:
+
+    for detector_config in detector_configs:
+        for query in detector_config._all_queries():
+            if _is_constant_query(query):
+                _, update_attribute, update_type, update_value = query
+                if update_attribute == "name" or update_type != "SET" or _references_constants(update_value):
+                    return True
+        for _, _, update_type, update_value in detector_config._expression_queries():
+            if update_type != "DELETE" and _references_constants(update_value):
+                return True
+    return False
+
+#Validates the values of the edits of every DetectorConfig against the constants of a compact directory before any file is edited,
+#so that an invalid value fails immediately rather than when DD4hep loads the geometry. Edits of <constant> elements are applied
+#in order to the definitions that the last step of their query matches in the unedited file, and every redefined constant and
+#every constant that depends on a changed constant is evaluated. Every other edit of an attribute that DD4hep evaluates
+#as an expression must evaluate with the edited constants.
+#The constants are only read from the compact directory if an edit requires them, and an evaluator of the unedited directory
+#can be given instead, ex: to validate several variants of a directory after reading it once. The given evaluator isn't edited.
+#Values that reference constants which aren't defined in the compact directory only raise a warning, since DD4hep may define them elsewhere,
+#unless the edits deleted or renamed the constant.
+#Raises a ValueError that lists every invalid value, and returns an evaluator with the edited constants
+def validate_detector_edits(
+        detector_configs : Sequence["DetectorConfig"],
+        directory_path : PathType,
+        evaluator : Optional[ConstantEvaluator] = None) -> ConstantEvaluator:
+
+    if evaluator is not None:
+        evaluator = evaluator.copy()
+    elif detector_edits_require_constants(detector_configs):
+        evaluator = ConstantEvaluator.from_compact_dir(directory_path)
+    else:
+        evaluator = ConstantEvaluator()
+
+    errors = []
+    undefined = []
+    changed_constants : List[str] = []
+    expression_queries = []
+    for detector_config in detector_configs:
+        constant_queries = [query for query in detector_config._all_queries() if _is_constant_query(query)]
+        if len(constant_queries) > 0:
+            xml_path = Path(directory_path).joinpath(detector_config.file)
+            for query, constants in zip(constant_queries, _find_constants(xml_path, constant_queries)):
+                changed_constants.extend(_apply_constant_query(evaluator, query, constants))
+        expression_queries.extend(
+            (detector_config.file, query) for query in detector_config._expression_queries()
+            if query[2] != "DELETE" and not _is_constant_query(query)
+        )
+
+    checked_constants = [name for name in dict.fromkeys(changed_constants) if name in evaluator]
+    checked_constants.extend(sorted(evaluator.dependents(changed_constants) - set(checked_constants)))
+    removed_constants = set(changed_constants) - set(checked_constants)
+    for name in checked_constants:
+        try:
+            evaluator.value(name)
+        except UndefinedConstantError as e:
+            (errors if e.name in removed_constants else undefined).append(str(e))
+        except ValueError as e:
+            errors.append(str(e))
+
+    for file, (xml_query, update_attribute, update_type, update_value) in expression_queries:
+        try:
+            evaluator.evaluate(str(update_value))
+        except UndefinedConstantError as e:
+            message = f"{update_type} '{update_attribute}' of '{xml_query}' in '{file}': {e}"
+            (errors if e.name in removed_constants else undefined).append(message)
+        except ValueError as e:
+            errors.append(f"{update_type} '{update_attribute}' of '{xml_query}' in '{file}': {e}")
+
+    if len(undefined) > 0:
+        warning = "Detector edit values reference constants that aren't defined in the compact directory:\n"
+        warnings.warn(warning + "\n".join(f"    {message}" for message in dict.fromkeys(undefined)), stacklevel=2)
+
+    #Constants that fail are reported once, although every constant that depends on them fails with the same error
+    if len(errors) > 0:
+        err = "Invalid detector edit values:\n" + "\n".join(f"    {error}" for error in dict.fromkeys(errors))
+        raise ValueError(err)
+    return evaluator
@@ -0,0 +1,293 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from lxml import etree
+
+from ePIC_benchmarks._file.editors import XmlEditor, write_xml_atomic
+from ePIC_benchmarks._file.streaming import stream_xml_file
+from ePIC_benchmarks._file.types import PathType
+from ePIC_benchmarks._file.xml_index import XpathTagStep, element_matches_step, normalize_attribute_value, parse_tag_steps
+from ePIC_benchmarks.detector.constants import ConstantEvaluator, validate_detector_edits
+
+if TYPE_CHECKING:
+    from ePIC_benchmarks.detector.config import DetectorConfig
+
+#Number of queries of a file from which the file's elements are indexed by attribute before the queries are applied
+ATTRIBUTE_INDEX_MIN_QUERIES = 16
+#Total size of the edited files from which they are edited by a process pool, unless a number of workers is given
+PARALLEL_EDIT_MIN_BYTES = 8 * 1024 * 1024
+#Size of a file from which it is streamed instead of parsed into memory, if all of its queries can be streamed
+STREAMING_EDIT_MIN_BYTES = 64 * 1024 * 1024
+
+#Edit of a detector description file as (xpath query, update attribute, update type, update value).
+#Queries without an update attribute edit the matched elements themselves: DELETE removes them, and ADD appends the elements
+#of the xml template given as update value to each of them
+DetectorQuery = Tuple[str, Optional[str], str, Any]
+
+#Returns the path of a detector description file, relative to the compact folder of the ePIC repository if one is provided
+def resolve_detector_file_path(file : PathType, directory_path : Optional[PathType] = None) -> Path:
+
+    xml_path = Path(file)
+    if directory_path:
+        if not isinstance(directory_path, (str, Path)):
+            raise ValueError("Directory path must be a valid path")
+        xml_path = Path(directory_path).joinpath(xml_path)
+    if not xml_path.exists():
+        err = f"Path '{xml_path}' does not exist"
+        raise ValueError(err)
+    return xml_path
+
+#Groups the queries of every DetectorConfig by the file they edit, in the order the configs are given.
+#Configs whose file paths differ but point to the same file share a single group
+def group_detector_edits(
+        detector_configs : Sequence["DetectorConfig"],
+        directory_path : Optional[PathType] = None) -> Dict[Path, List[DetectorQuery]]:
+
+    file_edits : Dict[Path, List[DetectorQuery]] = {}
+    for detector_config in detector_configs:
+        xml_path = resolve_detector_file_path(detector_config.file, directory_path).resolve()
+        file_edits.setdefault(xml_path, []).extend(detector_config._all_queries())
+    return file_edits
+
+#Number of matched elements and changed elements of the queries applied to a single detector description file
+@dataclass
+class FileEditStatistics:
+
+    file_path : Path
+    queries : int = 0
+    matches : int = 0
+    elements_changed : int = 0
+    #Time spent parsing, editing and writing the file, in seconds
+    edit_time : float = 0.0
+
+#Applies a single query to a parsed detector description file. Every element matched by the query is updated in one pass.
+#Returns the number of elements the query matched and the number of elements it changed
+def apply_query(xml_editor : XmlEditor, query : DetectorQuery) -> Tuple[int, int]:
+
+    xml_query, _, _, _ = query
+    try:
+        found_elements = xml_editor.find_xpath(xml_query)
+        num_changed = _update_elements(xml_editor, found_elements, query)
+    except Exception as e:
+        raise ValueError(_query_error(query)) from e
+    return len(found_elements), num_changed
+
+#Applies the update of a query to elements, and returns the number of elements that changed
+def _update_elements(xml_editor : XmlEditor, elements, query : DetectorQuery) -> int:
+
+    _, update_attribute, update_type, update_value = query
+    match update_type:
+        case "ADD" if update_attribute is None:
+            return xml_editor.add_element_elements(elements, update_value)
+        case "DELETE" if update_attribute is None:
+            return xml_editor.delete_element_elements(elements)
+        case "SET" if update_attribute is None:
+            raise ValueError("'SET' updates require an update attribute")
+        case "SET":
+            return xml_editor.set_attribute_elements(elements, update_attribute, update_value)
+        case "ADD":
+            return xml_editor.add_attribute_elements(elements, update_attribute, update_value)
+        case "DELETE":
+            return xml_editor.delete_attribute_elements(elements, update_attribute)
+        case _:
+            raise ValueError(f"Unknown update type '{update_type}'")
+
+def _query_error(query : DetectorQuery) -> str:
+
+    xml_query, update_attribute, update_type, update_value = query
+    return (
+        f"could not make update with:\n[\n"
+        f"    Query: {xml_query}\n"
+        f"    Update Type: {update_type}\n"
+        f"    Update Attribute: {update_attribute}\n"
+        f"    Update Value: {update_value}\n]"
+    )
+
+#Returns the tag steps of every query, or None if any query can't be streamed: queries must be made of tag steps,
+#and must update attributes, since elements that are added or removed would change the structure of the streamed document
+def _streamable_steps(queries : Sequence[DetectorQuery]) -> Optional[List[Tuple[XpathTagStep, ...]]]:
+
+    if any(update_attribute is None for _, update_attribute, _, _ in queries):
+        return None
+    query_steps = [parse_tag_steps(xml_query) for xml_query, _, _, _ in queries]
+    if any(steps is None for steps in query_steps):
+        return None
+    return query_steps
+
+#Applies queries to a detector description file while streaming it with stream_xml_file.
+#An element matches a '//a[...]//b[...]' query if its ancestors match a prefix of the query's steps and the element matches
+#the remaining step, so every match is found at the element's start tag by tracking, per query, the numbers of steps that the
+#ancestors of each element can match. Queries are applied to each element in order, so each query sees the same attribute
+#values as when the whole document is edited in memory
+def stream_file_edits(
+        xml_path : PathType, queries : Sequence[DetectorQuery],
+        query_steps : Sequence[Tuple[XpathTagStep, ...]],
+        statistics : FileEditStatistics) -> None:
+
+    #Indices of the queries with a step for each (tag, attribute, lowercased value) of the first predicate of the step.
+    #An element can only match a step if it has an attribute with the key of the step
+    step_queries : Dict[Tuple[str, str, str], List[int]] = {}
+    for query_index, steps in enumerate(query_steps):
+        for step in steps:
+            attribute, value, _ = step.predicates[0]
+            key_queries = step_queries.setdefault((step.tag, attribute, normalize_attribute_value(value)), [])
+            if query_index not in key_queries:
+                key_queries.append(query_index)
+    root_prefixes = tuple(frozenset((0,)) for _ in queries)
+    xml_editor = None
+
+    #Returns the indices of the queries from first_index on that may match an element, in order
+    def candidate_queries(element, first_index):
+
+        candidates = set()
+        for attribute, value in element.items():
+            for query_index in step_queries.get((element.tag, attribute, normalize_attribute_value(value)), ()):
+                if query_index >= first_index:
+                    candidates.add(query_index)
+        return sorted(candidates)
+
+    #Returns the numbers of steps of each query that the element and its ancestors can match, from those of its ancestors
+    def edit_element(element, ancestor_prefixes):
+
+        nonlocal xml_editor
+        if ancestor_prefixes is None:
+            ancestor_prefixes = root_prefixes
+            xml_editor = XmlEditor.from_root(element)
+        element_prefixes = None
+        candidates = candidate_queries(element, 0)
+        while len(candidates) > 0:
+            query_index = candidates.pop(0)
+            steps = query_steps[query_index]
+            matched_prefixes = [
+                prefix for prefix in ancestor_prefixes[query_index]
+                if element_matches_step(element, steps[prefix])
+            ]
+            if len(matched_prefixes) == 0:
+                continue
+            if len(steps) - 1 in matched_prefixes:
+                query = queries[query_index]
+                try:
+                    num_changed = _update_elements(xml_editor, [element], query)
+                except Exception as e:
+                    raise ValueError(_query_error(query)) from e
+                statistics.matches += 1
+                statistics.elements_changed += num_changed
+                #Later queries are matched against the updated attributes
+                if num_changed > 0:
+                    candidates = candidate_queries(element, query_index + 1)
+            extended_prefixes = {prefix + 1 for prefix in matched_prefixes if prefix + 1 < len(steps)}
+            if not extended_prefixes <= ancestor_prefixes[query_index]:
+                if element_prefixes is None:
+                    element_prefixes = list(ancestor_prefixes)
+                element_prefixes[query_index] = ancestor_prefixes[query_index] | extended_prefixes
+        return ancestor_prefixes if element_prefixes is None else tuple(element_prefixes)
+
+    stream_xml_file(xml_path, xml_path, edit_element)
+
+#Parses a detector description file once, applies all of its queries and writes it once.
+#The file is replaced atomically, and left unchanged if any query fails.
+#Files with many queries are indexed by attribute, unless index_attributes is set explicitly.
+#With streaming, the file is streamed through stream_file_edits instead of being parsed into memory. By default, files of at least
+#STREAMING_EDIT_MIN_BYTES are streamed if all of their queries are made of '//tag[@attribute='value']' steps
+def apply_file_edits(
+        xml_path : PathType, queries : Sequence[DetectorQuery],
+        index_attributes : Optional[bool] = None,
+        streaming : Optional[bool] = None) -> FileEditStatistics:
+
+    start_time = time.perf_counter()
+    statistics = FileEditStatistics(file_path=Path(xml_path), queries=len(queries))
+
+    query_steps = _streamable_steps(queries) if streaming is not False else None
+    if streaming and query_steps is None:
+        err = (
+            f"Queries of file '{xml_path}' can't be streamed, since not all of them"
+            " update attributes and are made of '//tag[@attribute='value']' steps"
+        )
+        raise ValueError(err)
+    if streaming is None:
+        streaming = query_steps is not None and Path(xml_path).stat().st_size >= STREAMING_EDIT_MIN_BYTES
+    if streaming:
+        try:
+            stream_file_edits(xml_path, queries, query_steps, statistics)
+        except etree.XMLSyntaxError:
+            err = f"Could not load file '{xml_path}'"
+            raise ValueError(err)
+        except OSError:
+            err = f"Could not save updated xml file '{xml_path}'"
+            raise ValueError(err)
+        statistics.edit_time = time.perf_counter() - start_time
+        return statistics
+
+    if index_attributes is None:
+        index_attributes = len(queries) >= ATTRIBUTE_INDEX_MIN_QUERIES
+    try:
+        xml_editor = XmlEditor(xml_path, autosave=False, index_attributes=index_attributes)
+    except:
+        err = f"Could not load file '{xml_path}'"
+        raise ValueError(err)
+
+    for query in queries:
+        num_matches, num_changed = apply_query(xml_editor, query)
+        statistics.matches += num_matches
+        statistics.elements_changed += num_changed
+
+    try:
+        write_xml_atomic(xml_editor.tree, xml_path)
+    except OSError:
+        err = f"Could not save updated xml file '{xml_path}'"
+        raise ValueError(err)
+    statistics.edit_time = time.perf_counter() - start_time
+    return statistics
+
+#Returns the number of processes that edit files concurrently, or 1 if files are edited in the current process.
+#Without an explicit number of workers, a process pool is only used when the edited files are large enough to outweigh
+#the start up time of its processes
+def _num_edit_processes(file_paths : Sequence[Path], max_workers : Optional[int]) -> int:
+
+    #Daemonic processes, such as the workers of a multiprocessing pool, can't start child processes
+    if len(file_paths) < 2 or multiprocessing.current_process().daemon:
+        return 1
+    if max_workers is None:
+        if sum(file_path.stat().st_size for file_path in file_paths) < PARALLEL_EDIT_MIN_BYTES:
+            return 1
+        #Cores that this process may run on, which can be fewer than the node's cores inside a batch job
+        max_workers = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    return max(1, min(max_workers, len(file_paths)))
+
+#Applies the changes of every DetectorConfig, parsing and writing each edited file once.
+#With validate_values, the edited values are first validated against the constants of the compact directory at directory_path
+#with validate_detector_edits, and no file is edited if any value is invalid. An evaluator of the unedited compact directory
+#can be given, so that its constants aren't read again.
+#Files are edited concurrently by a process pool of up to max_workers processes, since parsing holds the GIL.
+#Returns the edit statistics of each file
+def apply_detector_edits(
+        detector_configs : Sequence["DetectorConfig"],
+        directory_path : Optional[PathType] = None,
+        index_attributes : Optional[bool] = None,
+        max_workers : Optional[int] = None,
+        streaming : Optional[bool] = None,
+        validate_values : bool = True,
+        evaluator : Optional[ConstantEvaluator] = None) -> Dict[Path, FileEditStatistics]:
+
+    file_edits = group_detector_edits(detector_configs, directory_path)
+    if validate_values and directory_path is not None:
+        validate_detector_edits(detector_configs, directory_path, evaluator=evaluator)
+    num_processes = _num_edit_processes(list(file_edits.keys()), max_workers)
+    if num_processes == 1:
+        return {
+            xml_path : apply_file_edits(xml_path, queries, index_attributes=index_attributes, streaming=streaming)
+            for xml_path, queries in file_edits.items()
+        }
+
+    #Processes are spawned rather than forked, since the edits may run in a multithreaded parsl worker
+    with ProcessPoolExecutor(max_workers=num_processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {
+            xml_path : pool.submit(apply_file_edits, xml_path, queries, index_attributes, streaming)
+            for xml_path, queries in file_edits.items()
+        }
+        return {xml_path : future.result() for xml_path, future in futures.items()}
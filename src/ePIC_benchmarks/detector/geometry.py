@@ -0,0 +1,146 @@
+import hashlib
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from lxml import etree
+
+from ePIC_benchmarks._file.types import PathType
+
+#Extension of the geometry description files of a compact directory
+GEOMETRY_FILE_SUFFIX = ".xml"
+
+#Differences between the geometry description files of two compact directories, relative to the compact directories
+@dataclass
+class GeometryDiff:
+
+    added : List[str] = field(default_factory=list)
+    removed : List[str] = field(default_factory=list)
+    changed : List[str] = field(default_factory=list)
+
+    @property
+    def identical(self) -> bool:
+
+        return len(self.added) == 0 and len(self.removed) == 0 and len(self.changed) == 0
+
+#Hashes the canonical form of geometry description files, so that files which only differ by their formatting,
+#comments or the order of their attributes have the same hash. The canonical form is the C14N serialization of the
+#file without blank text, comments and processing instructions.
+#The hash of each file is cached by its resolved path, and is reused until the file's modification time, size or inode change.
+#Hashes are also cached by the sha256 of the file's content, so that identical files of different directories are only canonicalized once
+class GeometryHasher:
+
+    def __init__(self):
+
+        self._file_hashes : Dict[Path, Tuple[Tuple[int, int, int], str]] = {}
+        self._content_hashes : Dict[str, str] = {}
+        #Hashers are shared by the threads of a workflow
+        self._lock = threading.Lock()
+
+    #Returns the sha256 hash of the canonical form of an xml file.
+    #Files that aren't well-formed xml, or can't be canonicalized, are hashed by their content instead
+    def file_hash(self, xml_path : PathType) -> str:
+
+        xml_path = Path(xml_path).resolve()
+        stat_result = xml_path.stat()
+        file_key = (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+        with self._lock:
+            cached = self._file_hashes.get(xml_path)
+        if cached is not None and cached[0] == file_key:
+            return cached[1]
+
+        content = xml_path.read_bytes()
+        content_hash = hashlib.sha256(content).hexdigest()
+        with self._lock:
+            canonical_hash = self._content_hashes.get(content_hash)
+        if canonical_hash is None:
+            canonical_hash = _canonical_hash(content, content_hash)
+            with self._lock:
+                self._content_hashes[content_hash] = canonical_hash
+        with self._lock:
+            self._file_hashes[xml_path] = (file_key, canonical_hash)
+        return canonical_hash
+
+    #Returns the hash of every geometry description file of a compact directory, by path relative to the directory.
+    #Symbolic links are followed, so the overlays of detector variants are hashed like complete copies
+    def file_hashes(self, compact_dir_path : PathType) -> Dict[str, str]:
+
+        compact_dir_path = Path(compact_dir_path)
+        if not compact_dir_path.is_dir():
+            err = f"Compact directory '{compact_dir_path}' does not exist."
+            raise ValueError(err)
+
+        file_hashes = {}
+        for dir_path, dir_names, file_names in os.walk(compact_dir_path, followlinks=True):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                if not file_name.endswith(GEOMETRY_FILE_SUFFIX):
+                    continue
+                xml_path = Path(dir_path, file_name)
+                file_hashes[xml_path.relative_to(compact_dir_path).as_posix()] = self.file_hash(xml_path)
+        return dict(sorted(file_hashes.items()))
+
+    #Returns the sha256 hash of the geometry described by a compact directory, from the paths and hashes of its files.
+    #Only the files that changed since they were last hashed are canonicalized again
+    def geometry_hash(self, compact_dir_path : PathType) -> str:
+
+        hasher = hashlib.sha256()
+        for relative_path, file_hash in self.file_hashes(compact_dir_path).items():
+            hasher.update(relative_path.encode())
+            hasher.update(b"\0")
+            hasher.update(file_hash.encode())
+            hasher.update(b"\0")
+        return hasher.hexdigest()
+
+    #Returns the geometry description files that differ between two compact directories
+    def diff(self, compact_dir_path : PathType, other_compact_dir_path : PathType) -> GeometryDiff:
+
+        file_hashes = self.file_hashes(compact_dir_path)
+        other_file_hashes = self.file_hashes(other_compact_dir_path)
+        return GeometryDiff(
+            added=[path for path in other_file_hashes if path not in file_hashes],
+            removed=[path for path in file_hashes if path not in other_file_hashes],
+            changed=[
+                path for path, file_hash in file_hashes.items()
+                if path in other_file_hashes and other_file_hashes[path] != file_hash
+            ]
+        )
+
+    def clear(self) -> None:
+
+        with self._lock:
+            self._file_hashes.clear()
+            self._content_hashes.clear()
+
+#Returns the sha256 hash of the canonical form of an xml document, or of its content if it isn't well-formed
+#or can't be canonicalized, ex: because it declares a relative namespace URI
+def _canonical_hash(content : bytes, content_hash : str) -> str:
+
+    parser = etree.XMLParser(remove_blank_text=True, remove_comments=True, remove_pis=True, huge_tree=True)
+    try:
+        root = etree.fromstring(content, parser)
+        canonical_content = etree.tostring(root.getroottree(), method="c14n", with_comments=False)
+    except (etree.XMLSyntaxError, etree.C14NError):
+        return content_hash
+    return hashlib.sha256(canonical_content).hexdigest()
+
+#Hasher used by the module level functions, whose cache is shared by every caller of the process
+_default_hasher = GeometryHasher()
+
+#Returns the sha256 hash of the geometry described by a compact directory, ex: after applying detector edits to it.
+#Compact directories with identical hashes describe identical geometries
+def geometry_hash(compact_dir_path : PathType) -> str:
+
+    return _default_hasher.geometry_hash(compact_dir_path)
+
+#Returns the canonical hash of every geometry description file of a compact directory, by path relative to the directory
+def geometry_file_hashes(compact_dir_path : PathType) -> Dict[str, str]:
+
+    return _default_hasher.file_hashes(compact_dir_path)
+
+#Returns the geometry description files that were added, removed or changed from one compact directory to another
+def diff_geometries(compact_dir_path : PathType, other_compact_dir_path : PathType) -> GeometryDiff:
+
+    return _default_hasher.diff(compact_dir_path, other_compact_dir_path)
@@ -0,0 +1,95 @@
+import os
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Set, TYPE_CHECKING
+
+from ePIC_benchmarks._file.types import PathType
+from ePIC_benchmarks.detector.constants import ConstantEvaluator, detector_edits_require_constants
+from ePIC_benchmarks.detector.edits import FileEditStatistics, apply_detector_edits, group_detector_edits
+
+if TYPE_CHECKING:
+    from ePIC_benchmarks.detector.config import DetectorConfig
+
+#Compact directory of a detector geometry variant, and the files that were edited to create it
+@dataclass
+class DetectorVariant:
+
+    name : str
+    compact_dir_path : Path
+    #Edited files, relative to the compact directory
+    edited_files : List[Path] = field(default_factory=list)
+    statistics : Dict[Path, FileEditStatistics] = field(default_factory=dict)
+
+#Returns the directories of a tree that contain an edited file, relative to the tree's root, including the root itself
+def _edited_directories(edited_files : Sequence[Path]) -> Set[Path]:
+
+    directories = {Path(".")}
+    for edited_file in edited_files:
+        directories.update(edited_file.parents)
+    return directories
+
+#Mirrors a base compact directory as an overlay: directories on the path to an edited file are created, edited files are copied,
+#and every other file or directory is a symlink into the base directory
+def _create_overlay(base_dir_path : Path, variant_dir_path : Path, edited_files : Sequence[Path]) -> None:
+
+    edited_directories = _edited_directories(edited_files)
+    edited_file_set = set(edited_files)
+    for directory in sorted(edited_directories, key=lambda directory : len(directory.parts)):
+        variant_dir_path.joinpath(directory).mkdir(parents=True, exist_ok=True)
+        for entry in os.scandir(base_dir_path.joinpath(directory)):
+            relative_path = directory.joinpath(entry.name)
+            if relative_path in edited_directories:
+                continue
+            variant_path = variant_dir_path.joinpath(relative_path)
+            if relative_path in edited_file_set:
+                shutil.copy2(entry.path, variant_path)
+            else:
+                os.symlink(os.path.abspath(entry.path), variant_path)
+
+#Creates a compact directory per variant of a base compact directory, with the changes of the variant's DetectorConfigs applied.
+#Only the files edited by a variant are copied, and every other file links to the base directory, so that many variants
+#of a geometry only cost the size of the files they change. Existing variant directories are replaced.
+#The constants of the base directory are read at most once, by the first variant whose edits need them to be validated
+def create_detector_variants(
+        base_compact_dir : PathType,
+        variants : Mapping[str, Sequence["DetectorConfig"]],
+        output_dir : PathType) -> Dict[str, DetectorVariant]:
+
+    base_dir_path = Path(base_compact_dir).resolve()
+    output_dir_path = Path(output_dir).resolve()
+    if not base_dir_path.is_dir():
+        err = f"Base compact directory '{base_dir_path}' does not exist"
+        raise ValueError(err)
+    if output_dir_path == base_dir_path or base_dir_path in output_dir_path.parents:
+        err = f"Variants can't be created inside the base compact directory '{base_dir_path}'"
+        raise ValueError(err)
+
+    created_variants = {}
+    evaluator : Optional[ConstantEvaluator] = None
+    for name, detector_configs in variants.items():
+
+        file_edits = group_detector_edits(detector_configs, directory_path=base_dir_path)
+        edited_files = []
+        for xml_path in file_edits.keys():
+            try:
+                edited_files.append(xml_path.relative_to(base_dir_path))
+            except ValueError:
+                err = f"Variant '{name}' edits file '{xml_path}', which is outside of the base compact directory"
+                raise ValueError(err)
+
+        variant_dir_path = output_dir_path.joinpath(name)
+        if os.path.lexists(variant_dir_path):
+            if variant_dir_path.is_symlink() or not variant_dir_path.is_dir():
+                variant_dir_path.unlink()
+            else:
+                shutil.rmtree(variant_dir_path)
+        _create_overlay(base_dir_path, variant_dir_path, edited_files)
+
+        if evaluator is None and detector_edits_require_constants(detector_configs):
+            evaluator = ConstantEvaluator.from_compact_dir(base_dir_path)
+        statistics = apply_detector_edits(detector_configs, directory_path=variant_dir_path, evaluator=evaluator)
+        created_variants[name] = DetectorVariant(
+            name=name, compact_dir_path=variant_dir_path, edited_files=edited_files, statistics=statistics
+        )
+    return created_variants
@@ -1,11 +1,14 @@
 from pydantic import (
     BaseModel, Field, PlainSerializer, RootModel, ConfigDict,
-    SerializeAsAny
+    SerializeAsAny, field_validator
 )
 from typing import (
     Literal, Dict, Optional, Union, ClassVar, Annotated, Any,
-    Generic, TypeVar, Sequence, Tuple
+    Generic, TypeVar, Sequence, Tuple, List, Self, get_args
 )
+from functools import cached_property
+
+from ePIC_benchmarks._file.editors import parse_element_template
 from ePIC_benchmarks.detector.xpath import DetectorConfigXpath
 
 OptionalString = Optional[str]
@@ -55,76 +58,146 @@ class XmlElement(BaseModel):
     update_value : AnnotatedAttributeValue
     case_sensitive : bool = False
 
-    def create_queries(self) -> Sequence[str]:
+    #Attributes that DD4hep evaluates as expressions, which may reference <constant> definitions and units
+    expression_attributes : ClassVar[Tuple[str, ...]] = ()
 
-        all_queries = []
-        self._query_helper([''], all_queries)
-        return all_queries
+    #Names of the fields holding attribute values and sub-elements, in declaration order, set once per element class
+    _attribute_fields : ClassVar[Tuple[str, ...]] = ()
+    _element_fields : ClassVar[Tuple[str, ...]] = ()
 
-    def _query_helper(self, parent_queries : Sequence[str], all_queries : Sequence[Tuple[str, str, str, Any]]):
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs : Any) -> None:
 
-        attribute_lookups = {}
-        child_elements : Sequence[Optional[XmlElement]] = []
+        super().__pydantic_init_subclass__(**kwargs)
+        attribute_fields, element_fields = [], []
+        for field_name, field_info in cls.model_fields.items():
+            if field_name in _CONTROL_FIELDS:
+                continue
+            if _annotation_has_model(field_info.annotation):
+                element_fields.append(field_name)
+            else:
+                attribute_fields.append(field_name)
+        cls._attribute_fields = tuple(attribute_fields)
+        cls._element_fields = tuple(element_fields)
 
-        for field in self.model_fields_set:
+    #Assigning a field clears the cached queries of the element
+    def __setattr__(self, name : str, value : Any) -> None:
 
-            field_data = getattr(self, field, None)
-            if field_data is None or field in ['element_tag', 'update_attribute', 'update_type', 'update_value', 'case_sensitive']:
-                continue
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            self._clear_query_cache()
 
-            if isinstance(field_data, XmlElement):
-                child_elements.append(field_data)
+    #Copies share the cached queries of the copied element, which are stale if fields are updated
+    def model_copy(self, *, update : Optional[Dict[str, Any]] = None, deep : bool = False) -> Self:
 
-            elif hasattr(field_data, '__iter__') and not isinstance(field_data, str):
+        copied = super().model_copy(update=update, deep=deep)
+        copied._clear_query_cache()
+        return copied
 
-                for inner_field in field_data:
-                    if isinstance(inner_field, XmlElement):
-                        child_elements.append(inner_field)
-            else:
-                attribute_lookups[field] = field_data
+    def _clear_query_cache(self) -> None:
 
-        curr_query = DetectorConfigXpath.create_tag_query(
-            tag=self.element_tag, attributes=attribute_lookups, case_sensitive=self.case_sensitive
-        )
-        new_parent_queries = []
-        for parent_query in parent_queries:
+        self.__dict__.pop('_own_query', None)
 
-            new_query = parent_query + curr_query
-            if len(child_elements) == 0:
-                if self.update_attribute is None:
-                    err = f"The update attribute for the bottom level xml element '{self.element_tag}' must be provided."
-                    raise ValueError(err)
-                if self.update_type is None:
-                    err = f"The update type for the bottom level xml element '{self.element_tag}' must be provided."
-                    raise ValueError(err)
-                if self.update_type in ['SET', 'ADD'] and self.update_value is None:
-                    err = f"The update value must be included for 'SET' and 'ADD' update types. Got {self.update_type}."
-                    raise ValueError(err)
-                query_tuple = (new_query, self.update_attribute, self.update_type, self.update_value)
-                all_queries.append(query_tuple)
-                new_parent_queries.append(new_query)
+    def create_queries(self) -> Sequence[Tuple[str, str, str, Any]]:
 
-            elif self.update_attribute is not None and self.update_type is not None:
-                if self.update_type in ['SET', 'ADD'] and self.update_value is None:
-                    err = f"The update value must be included for 'SET' and 'ADD' update types. Got {self.update_type}."
-                    raise ValueError(err)
-                query_tuple = (new_query, self.update_attribute, self.update_type, self.update_value)
-                all_queries.append(query_tuple)
-                
+        return [query_tuple for query_tuple, _ in self._subtree_queries()]
+
+    #Returns the queries that update an expression attribute of their element
+    def create_expression_queries(self) -> Sequence[Tuple[str, str, str, Any]]:
+
+        return [query_tuple for query_tuple, is_expression in self._subtree_queries() if is_expression]
+
+    def _child_elements(self) -> Sequence["XmlElement"]:
+
+        child_elements = []
+        for field in self._element_fields:
+            field_data = getattr(self, field)
+            if field_data is None:
+                continue
+            #Sub-element fields hold validated elements or lists of elements
+            if field_data.__pydantic_root_model__:
+                child_elements.extend(field_data.root)
             else:
-                new_parent_queries.append(new_query)
+                child_elements.append(field_data)
+        return child_elements
 
-        for child_elem in child_elements:
+    #Tag query of the element, and its own query entry if it updates one of its attributes, or if it adds elements to
+    #or deletes the elements it matches, which are 'ADD' and 'DELETE' updates without an update attribute. Query entries are
+    #(query tuple, whether it updates an expression attribute) pairs. The cache is stored in the instance dictionary
+    #rather than as a private attribute, since private attributes are initialized by python code for every validated element
+    @cached_property
+    def _own_query(self) -> Tuple[str, Tuple[Tuple[Tuple[str, str, str, Any], bool], ...]]:
 
-            child_elem._query_helper(new_parent_queries, all_queries)
+        attribute_lookups = {}
+        for field in self._attribute_fields:
+            field_data = getattr(self, field)
+            if field_data is not None:
+                attribute_lookups[field] = field_data
+        tag_query = DetectorConfigXpath.create_tag_query(
+            tag=self.element_tag, attributes=attribute_lookups, case_sensitive=self.case_sensitive
+        )
 
+        own_entries = ()
+        if self.update_attribute is not None and self.update_type is not None:
+            if self.update_type in ['SET', 'ADD'] and self.update_value is None:
+                err = f"The update value must be included for 'SET' and 'ADD' update types. Got {self.update_type}."
+                raise ValueError(err)
+            query_tuple = (tag_query, self.update_attribute, self.update_type, self.update_value)
+            own_entries = ((query_tuple, self.update_attribute in self.expression_attributes),)
+        elif self.update_attribute is None and self.update_type in ['ADD', 'DELETE']:
+            if self.update_type == 'ADD':
+                if not isinstance(self.update_value, str):
+                    err = f"'ADD' updates without an update attribute require an xml element template as update value. Got {self.update_value}."
+                    raise ValueError(err)
+                parse_element_template(self.update_value)
+            query_tuple = (tag_query, None, self.update_type, self.update_value)
+            own_entries = ((query_tuple, False),)
+        return tag_query, own_entries
+
+    #Returns the query entries of the element's subtree. An element that updates one of its attributes, or adds or deletes elements, ends its subtree's queries,
+    #otherwise its tag query prefixes the queries of its children
+    def _subtree_queries(self) -> Sequence[Tuple[Tuple[str, str, str, Any], bool]]:
+
+        tag_query, own_entries = self._own_query
+        if len(own_entries) > 0:
+            return own_entries
+
+        child_elements = self._child_elements()
+        if len(child_elements) == 0:
+            if self.update_attribute is None:
+                err = f"The update attribute for the bottom level xml element '{self.element_tag}' must be provided."
+                raise ValueError(err)
+            err = f"The update type for the bottom level xml element '{self.element_tag}' must be provided."
+            raise ValueError(err)
+
+        return [
+            ((tag_query + query_tuple[0],) + query_tuple[1:], is_expression)
+            for child_elem in child_elements for query_tuple, is_expression in child_elem._subtree_queries()
+        ]
+
+#Fields of every XmlElement that control its update rather than being searched for
+_CONTROL_FIELDS = ('element_tag', 'update_attribute', 'update_type', 'update_value', 'case_sensitive')
+
+#Returns whether a field annotation contains a pydantic model, i.e. whether the field holds sub-elements
+def _annotation_has_model(annotation : Any) -> bool:
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+    return any(_annotation_has_model(argument) for argument in get_args(annotation))
 
 XmlElementType = TypeVar('XmlElement', bound=XmlElement)
 
 class XmlElementList(RootModel[XmlElement], Generic[XmlElementType]):
 
     model_config = ConfigDict(strict=True)
-    root : SerializeAsAny[Sequence[XmlElementType]]
+    #Lists are validated by pydantic-core directly, unlike generic sequences which are validated in python
+    root : SerializeAsAny[List[XmlElementType]]
+
+    @field_validator('root', mode='before')
+    def validate_root(cls, v : Any) -> Any:
+        if isinstance(v, tuple):
+            return list(v)
+        return v
 
     def __iter__(self):
         return iter(self.root)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, PlainSerializer
-from typing import Literal, Dict, Optional, Union, ClassVar, Annotated
+from typing import Literal, Dict, Optional, Union, ClassVar, Annotated, Tuple
 from ePIC_benchmarks.detector.xml_elements._base import (
     XmlElement, AnnotatedOptionalBool, AnnotatedOptionalString
 )
@@ -15,4 +15,5 @@ class XmlConstantElement(XmlElement):
     value : AnnotatedOptionalString
 
     update_attribute : Optional[Literal['name', 'value']] = None
+    expression_attributes : ClassVar[Tuple[str, ...]] = ('value',)
     
\ No newline at end of file
@@ -2,7 +2,7 @@ from pydantic import (
     BaseModel, Field, PlainSerializer, RootModel, ConfigDict, SerializeAsAny
 )
 from typing import (
-    Literal, Dict, Optional, Union, ClassVar, Annotated, Sequence
+    Literal, Dict, Optional, Union, ClassVar, Annotated, Sequence, Tuple
 )
 from ePIC_benchmarks.detector.xml_elements._base import (
     XmlElement, XmlElementList,
@@ -28,6 +28,7 @@ class XmlModuleComponentElement(XmlElement):
         'width', 'length', 'thickness',
         'vis', 'reflect'
     ]] = None
+    expression_attributes : ClassVar[Tuple[str, ...]] = ('width', 'length', 'thickness')
 
 XmlModuleComponentList = XmlElementList[XmlModuleComponentElement]
 
@@ -46,6 +47,7 @@ class XmlFrameElement(XmlElement):
     update_attribute : Optional[Literal[
         'material', 'vis', 'width', 'height', 'length', 'thickness'
     ]]
+    expression_attributes : ClassVar[Tuple[str, ...]] = ('width', 'height', 'length', 'thickness')
 
 class XmlTrdElement(XmlElement):
 
@@ -57,6 +59,7 @@ class XmlTrdElement(XmlElement):
     z : AnnotatedOptionalString
 
     update_attribute : Optional[Literal['x1', 'x2', 'z']] = None
+    expression_attributes : ClassVar[Tuple[str, ...]] = ('x1', 'x2', 'z')
 
 
 class XmlModuleElement(XmlElement):
@@ -69,9 +72,11 @@ class XmlModuleElement(XmlElement):
 
     update_attribute : Optional[Literal['name', 'vis']] = None
 
-    module_components : Union[
+    #Sub-elements that are either an element or a list of elements are serialized as their own type,
+    #instead of trying each type of the union
+    module_components : SerializeAsAny[Union[
         None, XmlModuleComponentElement, XmlModuleComponentList
-    ] = None
+    ]] = None
     trd : Optional[XmlTrdElement] = None
     frame : Optional[XmlFrameElement] = None
 
@@ -95,6 +100,7 @@ class XmlDimensionsElement(XmlElement):
     length : AnnotatedOptionalString
 
     update_attribute : Optional[Literal['rmin', 'rmax', 'length']] = None
+    expression_attributes : ClassVar[Tuple[str, ...]] = ('rmin', 'rmax', 'length')
 
 class XmlLayerMaterialElement(XmlElement):
 
@@ -109,6 +115,7 @@ class XmlLayerMaterialElement(XmlElement):
     update_attribute : Optional[Literal[
         'surface', 'binning', 'bins0', 'bins1'
     ]] = None
+    expression_attributes : ClassVar[Tuple[str, ...]] = ('bins0', 'bins1')
     
 XmlLayerMaterialList = XmlElementList[XmlLayerMaterialElement]
 
@@ -126,6 +133,7 @@ class XmlRphiLayoutElement(XmlElement):
     update_attribute : Optional[Literal[
         'phi_tilt', 'nphi', 'phi0', 'rc', 'dr'
     ]] = None
+    expression_attributes : ClassVar[Tuple[str, ...]] = ('phi_tilt', 'nphi', 'phi0', 'rc', 'dr')
 
 class XmlZLayoutElement(XmlElement):
 
@@ -139,6 +147,7 @@ class XmlZLayoutElement(XmlElement):
     update_attribute : Optional[Literal[
         'dr', 'z0', 'nz'
     ]] = None
+    expression_attributes : ClassVar[Tuple[str, ...]] = ('dr', 'z0', 'nz')
 
 class XmlBarrelEnvelopeElement(XmlElement):
 
@@ -152,6 +161,7 @@ class XmlBarrelEnvelopeElement(XmlElement):
     update_attribute : Optional[Literal[
         'inner_r', 'outer_r', 'z_length'
     ]] = None
+    expression_attributes : ClassVar[Tuple[str, ...]] = ('inner_r', 'outer_r', 'z_length')
 
 class XmlEnvelopeElement(XmlElement):
 
@@ -167,6 +177,7 @@ class XmlEnvelopeElement(XmlElement):
     update_attribute : Optional[Literal[
         'vis', 'rmin', 'rmax', 'length', 'zstart'
     ]] = None
+    expression_attributes : ClassVar[Tuple[str, ...]] = ('rmin', 'rmax', 'length', 'zstart')
 
 class XmlRingElement(XmlElement):
 
@@ -181,6 +192,7 @@ class XmlRingElement(XmlElement):
     update_attribute : Optional[Literal[
         'r', 'zstart', 'nmodules', 'dz', 'module'
     ]] = None
+    expression_attributes : ClassVar[Tuple[str, ...]] = ('r', 'zstart', 'nmodules', 'dz')
     
 
 class XmlLayerElement(XmlElement):
@@ -193,10 +205,11 @@ class XmlLayerElement(XmlElement):
     vis : AnnotatedOptionalString
 
     update_attribute : Optional[Literal['module', 'id', 'vis']] = None
+    expression_attributes : ClassVar[Tuple[str, ...]] = ('id',)
 
     #Sub-elements
     barrel_envelope : Optional[XmlBarrelEnvelopeElement] = None
-    layer_material : Optional[Union[XmlLayerMaterialElement, XmlLayerMaterialList]] = None
+    layer_material : SerializeAsAny[Optional[Union[XmlLayerMaterialElement, XmlLayerMaterialList]]] = None
     rphi_layout : Optional[XmlRphiLayoutElement] = None
     z_layout : Optional[XmlZLayoutElement] = None
     envelope : Optional[XmlEnvelopeElement] = None
@@ -217,9 +230,10 @@ class XmlDetectorElement(XmlElement):
     update_attribute : Optional[
         Literal['id', 'name', 'type', 'insideTrackingVolume']
     ] = None
+    expression_attributes : ClassVar[Tuple[str, ...]] = ('id',)
 
     #Sub-elements
-    modules : Optional[Union[XmlModuleElement, XmlModuleList]] = None
+    modules : SerializeAsAny[Optional[Union[XmlModuleElement, XmlModuleList]]] = None
     type_flags : Optional[XmlTypeFlagsElement] = None
     dimensions : Optional[XmlDimensionsElement] = None
-    layers : Optional[Union[XmlLayerElement, XmlLayerList]] = None
\ No newline at end of file
+    layers : SerializeAsAny[Optional[Union[XmlLayerElement, XmlLayerList]]] = None
\ No newline at end of file
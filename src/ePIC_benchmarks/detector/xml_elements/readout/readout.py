@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, PlainSerializer
-from typing import Literal, Dict, Optional, Union, ClassVar, Annotated
+from typing import Literal, Dict, Optional, Union, ClassVar, Annotated, Tuple
 from ePIC_benchmarks.detector.xml_elements._base import (
     XmlElement, AnnotatedOptionalBool, AnnotatedOptionalString
 )
@@ -15,6 +15,7 @@ class XmlSegmentationElement(XmlElement):
     grid_size_y : AnnotatedOptionalString
 
     update_attribute : Optional[Literal['type', 'grid_size_x', 'grid_size_y']] = None
+    expression_attributes : ClassVar[Tuple[str, ...]] = ('grid_size_x', 'grid_size_y')
     
 
 class XmlReadoutIdElement(XmlElement):
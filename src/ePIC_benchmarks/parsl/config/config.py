@@ -5,7 +5,7 @@ from parsl.config import Config
 from parsl.dataflow.taskrecord import TaskRecord
 from parsl.monitoring import MonitoringHub
 from parsl.dataflow.dependency_resolvers import DependencyResolver, DEEP_DEPENDENCY_RESOLVER
-from pydantic import ConfigDict, Field, RootModel, SerializeAsAny, computed_field, field_validator, ValidationInfo, field_serializer, WrapSerializer
+from pydantic import ConfigDict, Field, PrivateAttr, RootModel, SerializeAsAny, computed_field, field_validator, ValidationInfo, field_serializer, WrapSerializer
 
 from ePIC_benchmarks.parsl._base import BaseParslModel
 from ePIC_benchmarks.parsl.executors import (
@@ -20,6 +20,7 @@ from ePIC_benchmarks.parsl.monitoring import ParslMonitoringHub
 from ePIC_benchmarks.container.containers import ContainerUnion
 from ePIC_benchmarks.parsl.launchers.launchers import ParslLauncherConfig
 from ePIC_benchmarks.container._base import BaseContainerConfig
+from ePIC_benchmarks.utils.lookup import indexed_lookup
 
 ExecutorUnion = Union[
     ThreadPoolExecutorConfig, HighThroughputExecutorConfig,
@@ -98,6 +99,8 @@ class ParslConfig(BaseParslModel):
     usage_tracking: int = 0
     project_name: Optional[str] = None
     initialize_logging: bool = True
+    #Index of executor configs by label
+    _executor_index: Dict[str, ParslExecutorConfig] = PrivateAttr(default_factory=dict)
 
     # @field_validator('std_autopath', mode='after')
     # def set_log_autopath(cls, autopath, info : ValidationInfo) -> Callable:
@@ -134,9 +137,9 @@ class ParslConfig(BaseParslModel):
 
     def executor_by_label(self, label : str) -> ParslExecutorConfig:
 
-        for executor in self.executors:
-            if executor.label == label:
-                return executor
+        executor = indexed_lookup(self._executor_index, self.executors or [], label, name_attribute='label')
+        if executor is not None:
+            return executor
         err = f"Could not find executor with label '{label}'."
         raise ValueError(err)
     
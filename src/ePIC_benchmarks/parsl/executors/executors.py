@@ -39,6 +39,14 @@ class ParslExecutorConfig(BaseParslModel, ABC):
     def get_container_config(self) -> Optional[ContainerUnion]:
         pass
 
+    #Returns the number of cores reserved for each worker of the executor, or None if it is not limited
+    def get_cores_per_worker(self) -> Optional[float]:
+        return None
+
+    #Returns the memory in GB reserved for each worker of the executor, or None if it is not limited
+    def get_memory_per_worker(self) -> Optional[float]:
+        return None
+
 
 
 class ParslExecutorConfigWithoutProvider(ParslExecutorConfig):
@@ -97,6 +105,12 @@ class HighThroughputExecutorConfig(ParslExecutorConfigWithProvider):
     block_error_handler: Union[bool, Callable[[BlockProviderExecutor, Dict[str, JobStatus]], None]] = True
     encrypted: bool = False
 
+    def get_cores_per_worker(self) -> Optional[float]:
+        return self.cores_per_worker
+
+    def get_memory_per_worker(self) -> Optional[float]:
+        return self.mem_per_worker
+
     
 class MPIExecutorConfig(ParslExecutorConfigWithProvider):
     
@@ -166,4 +180,7 @@ class WorkQueueExecutorConfig(ParslExecutorConfigWithProvider):
     coprocess: bool = False
     scaling_cores_per_worker: int = 1
 
+    def get_cores_per_worker(self) -> Optional[float]:
+        return self.scaling_cores_per_worker
+
 
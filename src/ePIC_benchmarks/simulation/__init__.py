@@ -1,4 +1,6 @@
 from .config import SimulationConfig
+from .adaptive import AdaptiveEventsConfig
+from .sweep import SimulationSweep
 from . import simulation_types
 
-__all__ = ['SimulationConfig', 'simulation_types']
\ No newline at end of file
+__all__ = ['SimulationConfig', 'AdaptiveEventsConfig', 'SimulationSweep', 'simulation_types']
\ No newline at end of file
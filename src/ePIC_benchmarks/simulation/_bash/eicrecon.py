@@ -66,4 +66,9 @@ class EicreconModel(BashCommand):
     input_path : Annotated[PathType, PlainSerializer(
         EicreconInFileFlag.flag_string,
         return_type=str
-    )]
\ No newline at end of file
+    )]
+    #Optional flag for specifying the number of JANA worker threads used by eicrecon
+    eicrecon_num_threads : Annotated[Optional[int], PlainSerializer(
+        EicreconNumThreadsFlag.flag_string,
+        return_type=str
+    )] = None
@@ -55,6 +55,12 @@ class GunMultiplicityFlag(NpsimFlag[float]):
 class NpsimOutFileFlag(NpsimFlag[float]):
     flag : Literal["--outputFile"] = "--outputFile"
 
+class NpsimNumThreadsFlag(NpsimFlag[int]):
+    flag : Literal["--numberOfThreads"] = "--numberOfThreads"
+
+class NpsimRandomSeedFlag(NpsimFlag[int]):
+    flag : Literal["--random.seed"] = "--random.seed"
+
 ################################################################################################
 ### NOTE: that attribute names must be identical to the attribute names in Simulation Config ###
 ################################################################################################
@@ -146,4 +152,14 @@ class NpsimModel(BashCommand):
         return_type=str
     )]
 
+    #Optional flag that specifies the number of Geant4 worker threads used by npsim
+    npsim_num_threads : Annotated[Optional[int], PlainSerializer(
+        NpsimNumThreadsFlag.flag_string,
+        return_type=str
+    )] = None
 
+    #Optional flag that specifies the seed of npsim's random number generator
+    random_seed : Annotated[Optional[int], PlainSerializer(
+        NpsimRandomSeedFlag.flag_string,
+        return_type=str
+    )] = None
@@ -1,4 +1,4 @@
-from typing import Any, Optional
+from typing import Any, Optional, List
 from ePIC_benchmarks.simulation.simulation_types import Momentum, GunDistribution
 from ePIC_benchmarks.simulation.simulation_types.types import DistributionLimitType
 
@@ -93,7 +93,47 @@ def validate_multiplicity(multiplicity : float) -> None:
     if multiplicity <= 0.0:
         err = f"Multiplicity cannot be 0 or negative. Got '{multiplicity}'"
         raise ValueError(err)
-    
+
+#Checks that a thread count is greater than 0
+def validate_num_threads(num_threads : int) -> None:
+
+    if num_threads <= 0:
+        err = f"Number of threads cannot be 0 or negative. Got '{num_threads}'"
+        raise ValueError(err)
+
+#Parses a taskset style cpu list (ex: '0-3,8,10-11') into a sorted list of cpu ids
+def parse_cpu_list(cpu_list : str) -> List[int]:
+
+    cpu_ids = set()
+    for cpu_range in cpu_list.split(','):
+        cpu_range = cpu_range.strip()
+        try:
+            if '-' in cpu_range:
+                first_cpu, last_cpu = (int(limit) for limit in cpu_range.split('-', 1))
+            else:
+                first_cpu = last_cpu = int(cpu_range)
+        except ValueError:
+            err = f"Could not parse cpu range '{cpu_range}' in cpu list '{cpu_list}'"
+            raise ValueError(err)
+        if first_cpu < 0 or last_cpu < first_cpu:
+            err = f"Invalid cpu range '{cpu_range}' in cpu list '{cpu_list}'"
+            raise ValueError(err)
+        cpu_ids.update(range(first_cpu, last_cpu + 1))
+    return sorted(cpu_ids)
+
+#Checks that a cpu affinity list provides enough cpus for the requested number of threads
+def validate_cpu_affinity(cpu_affinity : Optional[str], num_threads : int) -> None:
+
+    if cpu_affinity is None:
+        return
+    num_cpus = len(parse_cpu_list(cpu_affinity))
+    if num_cpus < num_threads:
+        err = (
+            f"CPU affinity '{cpu_affinity}' only provides {num_cpus} cpus,"
+            f" but {num_threads} threads were requested"
+        )
+        raise ValueError(err)
+
 #TODO: Add validation for gunEnabled = False
 
 
@@ -0,0 +1,87 @@
+import math
+from typing import Dict, Optional, Self
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+#Keys of the precision estimates that adaptive simulations compare to their targets
+MOMENTUM_RESOLUTION_ERR_KEY = "momentum_resolution_err"
+EFFICIENCY_ERR_KEY = "efficiency_err"
+NUM_EVENTS_KEY = "num_events"
+
+#Settings of a simulation whose events are simulated in shards until a target precision is reached.
+#The simulation's num_events is the maximum number of events that are simulated
+class AdaptiveEventsConfig(BaseModel):
+
+    model_config = ConfigDict(validate_assignment=True, validate_default=True)
+
+    batch_events : int = Field(gt=0, description="Number of events simulated by each shard")
+    initial_batches : int = Field(default=1, gt=0, description="Number of shards simulated before the first precision estimate")
+    max_batches_per_round : Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Maximum number of shards submitted after each precision estimate"
+    )
+    target_momentum_resolution_err : Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Target relative uncertainty of the fitted momentum resolution"
+    )
+    target_efficiency_err : Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Target uncertainty of the tracking efficiency of every populated eta bin"
+    )
+
+    @model_validator(mode='after')
+    def check_targets(self) -> Self:
+
+        if self.target_momentum_resolution_err is None and self.target_efficiency_err is None:
+            raise ValueError("Adaptive simulations require a momentum resolution or efficiency uncertainty target")
+        return self
+
+    def _targets(self) -> Dict[str, float]:
+
+        targets = {}
+        if self.target_momentum_resolution_err is not None:
+            targets[MOMENTUM_RESOLUTION_ERR_KEY] = self.target_momentum_resolution_err
+        if self.target_efficiency_err is not None:
+            targets[EFFICIENCY_ERR_KEY] = self.target_efficiency_err
+        return targets
+
+    def max_batches(self, max_events : int) -> int:
+
+        return max(1, max_events // self.batch_events)
+
+    #Checks whether every configured uncertainty is at or below its target.
+    #Uncertainties that could not be estimated, such as failed fits, never reach their target
+    def precision_reached(self, precision : Dict[str, Optional[float]]) -> bool:
+
+        for key, target in self._targets().items():
+            uncertainty = precision.get(key)
+            if uncertainty is None or not math.isfinite(uncertainty) or uncertainty > target:
+                return False
+        return True
+
+    #Returns the number of shards to submit after a precision estimate, or 0 once the simulation is complete.
+    #Uncertainties scale with 1 / sqrt(events), which estimates the events still required to reach every target
+    def next_num_batches(self, precision : Dict[str, Optional[float]], num_batches : int, max_events : int) -> int:
+
+        remaining_batches = self.max_batches(max_events) - num_batches
+        if remaining_batches <= 0 or self.precision_reached(precision):
+            return 0
+
+        required_scale = 1.0
+        for key, target in self._targets().items():
+            uncertainty = precision.get(key)
+            if uncertainty is None or not math.isfinite(uncertainty):
+                #Without an estimate, the number of events is doubled
+                required_scale = max(required_scale, 2.0)
+            else:
+                required_scale = max(required_scale, (uncertainty / target) ** 2)
+
+        num_events = precision.get(NUM_EVENTS_KEY) or num_batches * self.batch_events
+        required_events = math.ceil(num_events * required_scale) - num_events
+        num_batches_to_submit = max(1, math.ceil(required_events / self.batch_events))
+        if self.max_batches_per_round is not None:
+            num_batches_to_submit = min(num_batches_to_submit, self.max_batches_per_round)
+        return min(num_batches_to_submit, remaining_batches)
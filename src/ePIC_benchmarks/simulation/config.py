@@ -1,18 +1,20 @@
 
+import hashlib
 from pathlib import Path
 from pydantic import (
     BaseModel, field_serializer, field_validator,
-    model_serializer, ConfigDict, Field, AliasPath,
+    model_serializer, model_validator, ConfigDict, Field, AliasPath,
     AliasChoices
 )
 from pydantic_core.core_schema import ValidationInfo
-from typing import Dict, Union, Optional, Any
+from typing import Dict, Union, Optional, Any, Self
 from ePIC_benchmarks._file.types import PathType
 from ePIC_benchmarks._file.utils import absolute_path
 
 from ePIC_benchmarks.simulation.simulation_types import Particle, Momentum, Angle, Eta
 from ePIC_benchmarks.simulation._bash import NpsimModel, EicreconModel
 from ePIC_benchmarks.simulation._distribution.config import DistributionSettings
+from ePIC_benchmarks.simulation.adaptive import AdaptiveEventsConfig
 from ePIC_benchmarks.simulation._utils import validate_enum, _generate_file_name
 import ePIC_benchmarks.simulation._validators as simulation_validator
 
@@ -21,6 +23,8 @@ DistributionTypes = Union[Angle, Eta]
 ROOT_FILE_SUFFIX = ".root"
 NPSIM_OUTPUT_FILE_PREFIX = "npsim_"
 EICRECON_OUTPUT_FILE_PREFIX = "eicrecon_"
+#Separates the name of an adaptive simulation from the index of its shards
+SHARD_NAME_SEPARATOR = "_shard"
 
 class SimulationBase(BaseModel):
 
@@ -54,6 +58,17 @@ class SimulationBase(BaseModel):
     detector_xml : Path = Field(exclude=False)
     use_material_map : bool = False
     material_map_path : Optional[PathType] = Field(default=None, init=False)
+    npsim_num_threads : int = Field(default=1, description="Number of threads used by each npsim execution")
+    eicrecon_num_threads : int = Field(default=1, description="Number of threads used by each eicrecon execution")
+    cpu_affinity : Optional[str] = Field(
+        default=None,
+        description="Optional taskset style list of cpus (ex: '0-3,8') that npsim and eicrecon are pinned to"
+    )
+    random_seed : Optional[int] = Field(default=None, description="Optional seed of npsim's random number generator")
+    adaptive_events : Optional[AdaptiveEventsConfig] = Field(
+        default=None,
+        description="Simulates events in shards until a target precision is reached, with num_events as the maximum"
+    )
 
 class SimulationConfig(SimulationBase, DistributionSettings):
 
@@ -66,7 +81,7 @@ class SimulationConfig(SimulationBase, DistributionSettings):
         dumped_self["detector_path"] = self._abs_detector_path(epic_repo_path)
         dumped_self["output_path"] = self._abs_npsim_output_path(output_dir_path)
         npsim_model = NpsimModel(**dumped_self)
-        return npsim_model.generate_command()
+        return self._pin_command(npsim_model.generate_command())
 
     #Generates the eicrecon command for a Simulation Config instance
     def eicrecon_cmd(self, output_dir_path : PathType, input_dir_path : PathType, epic_repo_path : Optional[PathType]=None):
@@ -76,7 +91,35 @@ class SimulationConfig(SimulationBase, DistributionSettings):
         dumped_self["output_path"] = self._abs_eicrecon_output_path(output_dir_path)
         dumped_self["input_path"] = self._abs_eicrecon_input_path(input_dir_path)
         eicrecon_model = EicreconModel(**dumped_self)
-        return eicrecon_model.generate_command()    
+        return self._pin_command(eicrecon_model.generate_command())
+
+    #Returns the config of a shard of an adaptive simulation, which simulates one batch of events with its own seed
+    def shard(self, shard_index : int) -> Self:
+
+        if self.adaptive_events is None:
+            err = f"Simulation '{self.name}' is not an adaptive simulation"
+            raise ValueError(err)
+        shard_name = f"{self.name}{SHARD_NAME_SEPARATOR}{shard_index:04d}"
+        seed_digest = hashlib.sha256(f"{self.random_seed}:{shard_name}".encode()).digest()
+        return self.model_copy(update={
+            'name': shard_name,
+            'num_events': self.adaptive_events.batch_events,
+            'random_seed': int.from_bytes(seed_digest[:4], 'big') % (2 ** 31 - 1) + 1,
+            'adaptive_events': None,
+        })
+
+    #Returns the number of cores that a task running npsim or eicrecon for this config requires
+    @property
+    def num_cores(self) -> int:
+
+        return max(self.npsim_num_threads, self.eicrecon_num_threads)
+
+    #Prefixes a command with taskset if a cpu affinity is set
+    def _pin_command(self, command : str) -> str:
+
+        if self.cpu_affinity is None:
+            return command
+        return f"taskset -c {self.cpu_affinity} {command}"
 
     #Returns the absolute path to a Simulation Config instance's detector build file
     #using the provided path to the ePIC repository
@@ -151,6 +194,36 @@ class SimulationConfig(SimulationBase, DistributionSettings):
             raise e
         return number_of_events
 
+    #Checks if the number of npsim / eicrecon threads is greater than 0
+    @field_validator('npsim_num_threads', 'eicrecon_num_threads', mode='after')
+    def check_valid_num_threads(cls, num_threads : int) -> int:
+        try:
+            simulation_validator.validate_num_threads(num_threads)
+        except Exception as e:
+            raise e
+        return num_threads
+
+    #Checks whether the cpu affinity list is valid and provides a cpu for every thread
+    @model_validator(mode='after')
+    def check_valid_cpu_affinity(self) -> Self:
+        try:
+            simulation_validator.validate_cpu_affinity(self.cpu_affinity, self.num_cores)
+        except Exception as e:
+            raise e
+        return self
+
+    #Checks whether an adaptive simulation's maximum number of events fits at least one shard
+    @model_validator(mode='after')
+    def check_valid_adaptive_events(self) -> Self:
+
+        if self.adaptive_events is not None and self.adaptive_events.batch_events > self.num_events:
+            err = (
+                f"The batch size of adaptive simulation '{self.name}' ({self.adaptive_events.batch_events})"
+                f" must not exceed its maximum number of events ({self.num_events})"
+            )
+            raise ValueError(err)
+        return self
+
     #Checks whether the provided particle is valid and casts it if necessary.
     @field_validator('particle', mode='before')
     def validate_particle(cls, particle : Union[str, Particle]) -> str:
@@ -204,6 +277,16 @@ class SimulationConfig(SimulationBase, DistributionSettings):
             serialized_dict["material_map_path"] = str(self.material_map_path)
         if self.use_material_map:
             serialized_dict["use_material_map"] = self.use_material_map
+        if self.npsim_num_threads != 1:
+            serialized_dict["npsim_num_threads"] = self.npsim_num_threads
+        if self.eicrecon_num_threads != 1:
+            serialized_dict["eicrecon_num_threads"] = self.eicrecon_num_threads
+        if self.cpu_affinity is not None:
+            serialized_dict["cpu_affinity"] = self.cpu_affinity
+        if self.random_seed is not None:
+            serialized_dict["random_seed"] = self.random_seed
+        if self.adaptive_events is not None:
+            serialized_dict["adaptive_events"] = self.adaptive_events.model_dump(exclude_none=True)
 
         return serialized_dict
 
@@ -0,0 +1,28 @@
+from typing import Any, Dict, Iterator
+
+from pydantic import Field
+
+from ePIC_benchmarks.simulation.config import SimulationConfig
+from ePIC_benchmarks.utils.sweep import SweepConfig, substitute_template
+
+#Sweep that lazily expands a simulation template into one SimulationConfig per point.
+#Each parameter sets the simulation field of the same name, and can also be used as '${parameter}' in the template
+class SimulationSweep(SweepConfig):
+
+    name_prefix : str = Field(default="sim", description="Prefix of the generated simulation names")
+    simulation : Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Fields shared by every simulation of the sweep"
+    )
+
+    def simulation_config(self, point : Dict[str, Any]) -> SimulationConfig:
+
+        simulation_kwargs = substitute_template(self.simulation, point)
+        simulation_kwargs.update(point)
+        simulation_kwargs["name"] = self.point_name(point)
+        return SimulationConfig.model_validate(simulation_kwargs)
+
+    def __iter__(self) -> Iterator[SimulationConfig]:
+
+        for point in self.points():
+            yield self.simulation_config(point)
@@ -1,5 +1,8 @@
+import json
 from typing import Sequence, Any, TypeVar, Hashable
 
+from pydantic import BaseModel
+
 T = TypeVar("T")
 
 #Checks whether any 2 objects in a list are equal
@@ -20,6 +23,15 @@ def any_identical_objects(object_iterable : Sequence[T]) -> bool:
 
             object_set = set(object_iterable)
             return len(object_set) != len(object_iterable)
+
+        #If the list's elements are pydantic models, compare their serialized forms in a set ( O(n) )
+        if all(isinstance(obj, BaseModel) for obj in object_iterable):
+
+            object_keys = set(
+                (type(obj), json.dumps(obj.model_dump(), sort_keys=True, default=str)) for obj in object_iterable
+            )
+            return len(object_keys) != len(object_iterable)
+
         try:
             _ = first_elem < second_elem
             comparable = True
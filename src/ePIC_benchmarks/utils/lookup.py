@@ -0,0 +1,27 @@
+from typing import Dict, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+
+#Builds a {name : object} index of the given objects, keeping the first object of each name
+def build_name_index(objects : Iterable[T], name_attribute : str = "name") -> Dict[str, T]:
+
+    index : Dict[str, T] = {}
+    for obj in objects:
+        index.setdefault(getattr(obj, name_attribute), obj)
+    return index
+
+#Returns the object with the given name from an index in O(1).
+#The index is rebuilt in place if the name is missing or no longer matches its object,
+#which only happens when the indexed objects were changed without updating the index
+def indexed_lookup(
+        index : Dict[str, T], objects : Iterable[T],
+        name : str, name_attribute : str = "name") -> Optional[T]:
+
+    obj = index.get(name)
+    if obj is not None and getattr(obj, name_attribute) == name:
+        return obj
+
+    rebuilt_index = build_name_index(objects, name_attribute)
+    index.clear()
+    index.update(rebuilt_index)
+    return rebuilt_index.get(name)
@@ -0,0 +1,222 @@
+import itertools
+import math
+import re
+from string import Template
+from typing import Any, Dict, Iterator, List, Literal, Optional, Self, Tuple
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+SweepSampling = Literal['cartesian', 'latin_hypercube']
+
+#Characters that are replaced in the parameter values of generated names
+_NAME_UNSAFE_CHARACTERS = re.compile(r"[^A-Za-z0-9.+-]+")
+#Number of significant digits of values sampled from a range
+RANGE_SIGNIFICANT_DIGITS = 6
+
+#Values of a single sweep parameter, either listed or sampled from a range
+class SweepParameter(BaseModel):
+
+    model_config = ConfigDict(validate_assignment=True, validate_default=True)
+
+    values : Optional[List[Any]] = Field(default=None, description="Listed values of the parameter")
+    min : Optional[float] = Field(default=None, description="Lower limit of the parameter's range")
+    max : Optional[float] = Field(default=None, description="Upper limit of the parameter's range")
+    num_points : Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Number of evenly spaced points of the range used by cartesian sweeps"
+    )
+    log : bool = Field(default=False, description="Spaces range points evenly on a logarithmic scale")
+    unit : Optional[str] = Field(default=None, description="Unit appended to values sampled from the range, ex: 'GeV'")
+
+    @model_validator(mode='after')
+    def check_values_or_range(self) -> Self:
+
+        has_range = self.min is not None and self.max is not None
+        if self.values is None and not has_range:
+            raise ValueError("A sweep parameter requires either 'values' or both 'min' and 'max'")
+        if self.values is not None and len(self.values) == 0:
+            raise ValueError("A sweep parameter requires at least one value")
+        if has_range and self.log and min(self.min, self.max) <= 0:
+            raise ValueError("Logarithmic sweep parameter ranges must be positive")
+        return self
+
+    @property
+    def is_range(self) -> bool:
+        return self.values is None
+
+    #Maps positions in [0, 1] to values of the range
+    def _range_values(self, positions : np.ndarray) -> List[Any]:
+
+        if self.log:
+            log_min, log_max = math.log10(self.min), math.log10(self.max)
+            points = np.power(10.0, log_min + positions * (log_max - log_min))
+        else:
+            points = self.min + positions * (self.max - self.min)
+        return [self._format_range_value(point) for point in points]
+
+    def _format_range_value(self, point : float) -> Any:
+
+        value = float(f"{point:.{RANGE_SIGNIFICANT_DIGITS}g}")
+        if value.is_integer():
+            value = int(value)
+        if self.unit is not None:
+            return f"{value}{self.unit}"
+        return value
+
+    #Values of the parameter used by cartesian sweeps
+    def grid_values(self) -> List[Any]:
+
+        if not self.is_range:
+            return list(self.values)
+        if self.num_points is None:
+            raise ValueError("Sweep parameter ranges require 'num_points' in cartesian sweeps")
+        if self.num_points == 1:
+            return self._range_values(np.array([0.5]))
+        return self._range_values(np.linspace(0.0, 1.0, self.num_points))
+
+    #Values of the parameter at positions in [0, 1], as sampled by latin hypercube sweeps
+    def sampled_values(self, positions : np.ndarray) -> List[Any]:
+
+        if not self.is_range:
+            indices = np.minimum((positions * len(self.values)).astype(int), len(self.values) - 1)
+            return [self.values[index] for index in indices]
+        return self._range_values(positions)
+
+#Base configuration of a parameter sweep.
+#Points of the sweep are generated lazily, and every point is named after its parameter values,
+#so the names of a sweep's configs are deterministic and unique by construction
+class SweepConfig(BaseModel):
+
+    model_config = ConfigDict(validate_assignment=True, validate_default=True)
+
+    parameters : Dict[str, SweepParameter] = Field(
+        description="Dictionary of {parameter name : values} pairs that are swept"
+    )
+    sampling : SweepSampling = Field(
+        default='cartesian',
+        description="Samples every combination of values (cartesian) or num_samples points of a latin hypercube"
+    )
+    num_samples : Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Number of points sampled by latin hypercube sweeps"
+    )
+    seed : int = Field(default=0, description="Seed of the random number generator of latin hypercube sweeps")
+    name_prefix : str = Field(default="sweep", description="Prefix of the generated config names")
+
+    #Allows parameters to be given as a list of values, or as a single value
+    @field_validator('parameters', mode='before')
+    def validate_parameter_shorthands(cls, parameters : Any) -> Any:
+
+        if not isinstance(parameters, dict):
+            return parameters
+        validated_parameters = {}
+        for name, parameter in parameters.items():
+            if isinstance(parameter, (dict, SweepParameter)):
+                validated_parameters[name] = parameter
+            elif isinstance(parameter, (list, tuple)):
+                validated_parameters[name] = {"values": list(parameter)}
+            else:
+                validated_parameters[name] = {"values": [parameter]}
+        return validated_parameters
+
+    @model_validator(mode='after')
+    def check_sampling(self) -> Self:
+
+        if len(self.parameters) == 0:
+            raise ValueError("A sweep requires at least one parameter")
+        if self.sampling == 'latin_hypercube' and self.num_samples is None:
+            raise ValueError("Latin hypercube sweeps require 'num_samples'")
+        if self.sampling == 'cartesian':
+            for name, parameter in self.parameters.items():
+                if parameter.is_range and parameter.num_points is None:
+                    err = f"Range of sweep parameter '{name}' requires 'num_points' in cartesian sweeps"
+                    raise ValueError(err)
+        return self
+
+    #Upper bound of the number of points, since duplicate latin hypercube samples are dropped
+    def __len__(self) -> int:
+
+        if self.sampling == 'latin_hypercube':
+            return self.num_samples
+        return math.prod(len(parameter.grid_values()) for parameter in self.parameters.values())
+
+    def _cartesian_points(self) -> Iterator[Tuple[Any, ...]]:
+
+        return itertools.product(*(parameter.grid_values() for parameter in self.parameters.values()))
+
+    #Samples one value per stratum of every parameter, with the strata of each parameter randomly permuted
+    def _latin_hypercube_points(self) -> Iterator[Tuple[Any, ...]]:
+
+        rng = np.random.default_rng(self.seed)
+        columns = []
+        for parameter in self.parameters.values():
+            strata = rng.permutation(self.num_samples)
+            positions = (strata + rng.random(self.num_samples)) / self.num_samples
+            columns.append(parameter.sampled_values(positions))
+        return zip(*columns)
+
+    #Lazily generates every unique point of the sweep as a {parameter name : value} dictionary.
+    #Repeated points, such as duplicate latin hypercube samples, are skipped, and distinct points whose names are identical
+    #once sanitized, ex: '1*mm' and '1 mm', raise a ValueError
+    def points(self) -> Iterator[Dict[str, Any]]:
+
+        if self.sampling == 'latin_hypercube':
+            raw_points = self._latin_hypercube_points()
+        else:
+            raw_points = self._cartesian_points()
+
+        parameter_names = list(self.parameters.keys())
+        seen_points : Dict[str, Tuple[Any, ...]] = {}
+        for raw_point in raw_points:
+            point = dict(zip(parameter_names, raw_point))
+            name = self.point_name(point)
+            seen_point = seen_points.get(name)
+            if seen_point is not None:
+                if seen_point == tuple(raw_point):
+                    continue
+                err = (
+                    f"Sweep points {dict(zip(parameter_names, seen_point))} and {point} have the same name '{name}'."
+                    " Change the values of the sweep parameters so that their names differ."
+                )
+                raise ValueError(err)
+            seen_points[name] = tuple(raw_point)
+            yield point
+
+    #Generates the name of a point, ex: 'sweep_momentum-10GeV_particle-pi+'
+    def point_name(self, point : Dict[str, Any]) -> str:
+
+        name_parts = [self.name_prefix]
+        for parameter_name, value in point.items():
+            value_str = _NAME_UNSAFE_CHARACTERS.sub("_", _value_str(value)).strip("_")
+            name_parts.append(f"{parameter_name}-{value_str}")
+        return "_".join(name_parts)
+
+    #Lazily generates the names of every point of the sweep
+    def names(self) -> Iterator[str]:
+
+        for point in self.points():
+            yield self.point_name(point)
+
+def _value_str(value : Any) -> str:
+
+    if hasattr(value, "value") and isinstance(value.value, str):
+        return value.value
+    return str(value)
+
+#Replaces '${parameter}' placeholders in the strings of a (nested) template with the values of a sweep point.
+#A string that only holds a placeholder is replaced by the value itself, which keeps its type
+def substitute_template(template : Any, point : Dict[str, Any]) -> Any:
+
+    if isinstance(template, dict):
+        return {key : substitute_template(value, point) for key, value in template.items()}
+    if isinstance(template, (list, tuple)):
+        return [substitute_template(value, point) for value in template]
+    if isinstance(template, str) and "$" in template:
+        for parameter_name, value in point.items():
+            if template == f"${{{parameter_name}}}" or template == f"${parameter_name}":
+                return value
+        return Template(template).safe_substitute({name : _value_str(value) for name, value in point.items()})
+    return template
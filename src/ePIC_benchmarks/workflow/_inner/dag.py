@@ -0,0 +1,261 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+from ePIC_benchmarks.workflow.config import WorkflowConfig
+from ePIC_benchmarks.workflow.stage import WorkflowStageName
+from ePIC_benchmarks.container._base import BaseContainerConfig
+from ePIC_benchmarks.workflow.bash.methods.container import pull_containers
+from ePIC_benchmarks.workflow.bash.methods.epic import (
+    clone_epic, checkout_epic_branch, compile_epic, generate_material_map, restore_material_map
+)
+from ePIC_benchmarks.workflow.bash.methods.epic.methods import DEFAULT_MAT_MAP_NEVENTS
+from ePIC_benchmarks.workflow.bash.methods.simulation import run_npsim, run_eicrecon
+from ePIC_benchmarks.workflow.python.methods.detector import apply_detector_configs
+from ePIC_benchmarks.workflow.python.methods.analysis import generate_performance_plots, estimate_simulation_precision
+from ePIC_benchmarks.workflow.join import join_app
+
+DagNodeKey = Tuple[WorkflowStageName, str, Hashable]
+
+#Builds and submits the standard benchmark workflow graph:
+#container pull -> clone -> checkout -> detector edits -> compile -> material map -> npsim -> eicrecon -> analysis
+#Adaptive simulations repeat npsim -> eicrecon -> precision estimate for shards of events until their precision target is reached
+class WorkflowDag:
+
+    parent : WorkflowConfig
+
+    def __init__(self, parent):
+        assert(isinstance(parent, WorkflowConfig))
+        self.parent = parent
+        self._apps : Dict[Tuple[WorkflowStageName, str], Callable] = {}
+        self._nodes : Dict[DagNodeKey, Future] = {}
+        #Apps and nodes are also created from the threads of join apps. The lock is reentrant since _node creates apps
+        self._node_lock = threading.RLock()
+        #Material map generation tasks by material map cache key, so builds with identical geometries generate a single map
+        self._material_map_futures : Dict[str, Future] = {}
+        self._material_map_lock = threading.Lock()
+
+    #Returns the parsl app of a stage's method, creating it the first time it is requested
+    def _app(self, stage : WorkflowStageName, method : Callable) -> Callable:
+
+        app_key = (stage, method.__name__)
+        with self._node_lock:
+            if app_key not in self._apps:
+                self._apps[app_key] = self.parent.executor.stage_app(stage, method)
+            return self._apps[app_key]
+
+    #Submits the task of a graph node, or returns the future of the identical node if it was already submitted
+    def _node(self, stage : WorkflowStageName, key : Hashable, method : Callable, *args, **kwargs) -> Future:
+
+        node_key = (stage, method.__name__, key)
+        with self._node_lock:
+            if node_key not in self._nodes:
+                self._nodes[node_key] = self._app(stage, method)(*args, **kwargs)
+            return self._nodes[node_key]
+
+    #Returns every unique container used by the workflow
+    def containers(self) -> Sequence[BaseContainerConfig]:
+
+        all_containers = []
+        if self.parent.container is not None:
+            all_containers.append(self.parent.container)
+        if self.parent.parsl_config is not None and self.parent.parsl_config.executors is not None:
+            all_containers.extend(self.parent.executor.get_all_containers())
+
+        unique_containers = {}
+        for container in all_containers:
+            unique_containers.setdefault(container.pull_command(), container)
+        return list(unique_containers.values())
+
+    #Groups benchmarks by the benchmark whose ePIC build they use
+    def build_groups(self) -> Dict[str, List[str]]:
+
+        groups : Dict[str, List[str]] = {}
+        for benchmark_name in self.parent.benchmark_names():
+            build_name = self.parent.build_benchmark_name(benchmark_name)
+            groups.setdefault(build_name, []).append(benchmark_name)
+        return groups
+
+    #Submits every task of the workflow and returns the futures of the final analysis tasks
+    def submit(self) -> List[Future]:
+
+        self._nodes = {}
+        self._material_map_futures = {}
+        pull_future = None
+        containers = self.containers()
+        if len(containers) > 0:
+            pull_future = self._node('container', 'all', pull_containers, *containers)
+
+        final_futures = []
+        for build_name, benchmark_names in self.build_groups().items():
+
+            compile_future = self._submit_build(build_name, pull_future)
+            material_map_future = self._submit_material_map(build_name, benchmark_names, compile_future)
+
+            for benchmark_name in benchmark_names:
+                for simulation_name in self.parent.simulation_names(benchmark_name):
+                    analysis_future = self._submit_simulation(
+                        benchmark_name, simulation_name, compile_future, material_map_future
+                    )
+                    final_futures.append(analysis_future)
+
+        return final_futures
+
+    #Submits the clone, checkout, detector edit and compile tasks of an ePIC build
+    def _submit_build(self, build_name : str, pull_future : Optional[Future]) -> Future:
+
+        benchmark_config = self.parent.benchmark_config(build_name)
+        checkout_future = None
+
+        #Existing ePIC directories are copied during directory initialization instead of being cloned
+        if benchmark_config.existing_epic_directory_path is None:
+            clone_future = self._node('epic', build_name, clone_epic, self.parent, build_name)
+            checkout_future = self._node(
+                'epic', build_name, checkout_epic_branch, self.parent, build_name,
+                dependency=clone_future
+            )
+        detector_future = self._node(
+            'detector', build_name, apply_detector_configs, self.parent, build_name,
+            dependency=checkout_future
+        )
+        compile_future = self._node(
+            'build', build_name, compile_epic, self.parent, build_name,
+            container=self.parent.container, dependencies=[detector_future, pull_future]
+        )
+        return compile_future
+
+    #Submits a single material map generation task for an ePIC build, if any benchmark using it requires one
+    def _submit_material_map(self, build_name : str, benchmark_names : Sequence[str], compile_future : Future) -> Optional[Future]:
+
+        for benchmark_name in benchmark_names:
+            benchmark_config = self.parent.benchmark_config(benchmark_name)
+            if benchmark_config.generate_material_map and benchmark_config.existing_material_map_path is None:
+                if self.parent.material_maps.enabled:
+                    return self._submit_cached_material_map(build_name, benchmark_name, compile_future)
+                return self._node(
+                    'material_map', build_name, generate_material_map, self.parent, benchmark_name,
+                    container=self.parent.container, dependency=compile_future
+                )
+        return None
+
+    #Restores the material map of an ePIC build from the material map cache, or generates and caches it.
+    #The cache key is the hash of the built geometry, so it is only resolved once the build has completed
+    def _submit_cached_material_map(self, build_name : str, benchmark_name : str, compile_future : Future) -> Future:
+
+        material_maps = self.parent.material_maps
+
+        def resolve_cached_material_map(*_compile_result) -> Future:
+
+            cache_key = material_maps.cache_key(benchmark_name, DEFAULT_MAT_MAP_NEVENTS)
+            cached_material_map_path = material_maps.cached_material_map_path(cache_key)
+            with self._material_map_lock:
+                generation_future = self._material_map_futures.get(cache_key)
+                if generation_future is None and material_maps.lookup(cache_key) is None:
+                    generation_future = self._node(
+                        'material_map', build_name, generate_material_map, self.parent, benchmark_name,
+                        cached_material_map_path=str(cached_material_map_path), container=self.parent.container
+                    )
+                    self._material_map_futures[cache_key] = generation_future
+                    return generation_future
+
+            #Another build with the same geometry generates the material map, or it was already cached
+            return self._node(
+                'material_map', build_name, restore_material_map, self.parent, benchmark_name,
+                cached_material_map_path=str(cached_material_map_path), container=self.parent.container,
+                dependency=generation_future
+            )
+
+        node_key = ('material_map', resolve_cached_material_map.__name__, build_name)
+        with self._node_lock:
+            if node_key not in self._nodes:
+                self._nodes[node_key] = join_app(resolve_cached_material_map)(compile_future)
+            return self._nodes[node_key]
+
+    #Submits the npsim and eicrecon tasks of a simulation (or shard of a simulation) and returns the eicrecon future
+    def _submit_reconstruction(
+            self, benchmark_name : str, simulation_name : str,
+            compile_future : Future, material_map_future : Optional[Future]) -> Future:
+
+        simulation_key = (benchmark_name, simulation_name)
+        simulation_config = self.parent.simulation_config(benchmark_name, simulation_name)
+        npsim_future = self._node(
+            'simulation', simulation_key, run_npsim, self.parent, benchmark_name, simulation_name,
+            container=self.parent.container, dependency=compile_future
+        )
+        eicrecon_future = self._node(
+            'reconstruction', simulation_key, run_eicrecon, self.parent, benchmark_name, simulation_name,
+            use_material_map=simulation_config.use_material_map, container=self.parent.container,
+            dependencies=[npsim_future, material_map_future]
+        )
+        return eicrecon_future
+
+    #Submits the npsim, eicrecon and analysis tasks of a simulation
+    def _submit_simulation(
+            self, benchmark_name : str, simulation_name : str,
+            compile_future : Future, material_map_future : Optional[Future]) -> Future:
+
+        simulation_config = self.parent.simulation_config(benchmark_name, simulation_name)
+        if simulation_config.adaptive_events is not None:
+            return self._submit_adaptive_round(
+                benchmark_name, simulation_name, 0, simulation_config.adaptive_events.initial_batches,
+                compile_future, material_map_future
+            )
+
+        eicrecon_future = self._submit_reconstruction(benchmark_name, simulation_name, compile_future, material_map_future)
+        return self._submit_analysis(benchmark_name, simulation_name, dependency=eicrecon_future)
+
+    #Submits the final analysis task of a simulation
+    def _submit_analysis(self, benchmark_name : str, simulation_name : str, **kwargs) -> Future:
+
+        return self._node(
+            'analysis', (benchmark_name, simulation_name), generate_performance_plots,
+            self.parent, benchmark_name, simulation_name, **kwargs
+        )
+
+    #Submits a round of shards of an adaptive simulation and a precision estimate over every shard simulated so far.
+    #Once the estimate completes, either another round sized to reach the precision targets is submitted,
+    #or the simulation's analysis is submitted for all of its shards
+    def _submit_adaptive_round(
+            self, benchmark_name : str, simulation_name : str, num_batches : int, num_new_batches : int,
+            compile_future : Future, material_map_future : Optional[Future]) -> Future:
+
+        benchmark_config = self.parent.benchmark_config(benchmark_name)
+        simulation_config = benchmark_config.get_simulation_config(simulation_name)
+        adaptive_events = simulation_config.adaptive_events
+        max_batches = adaptive_events.max_batches(simulation_config.num_events)
+        num_new_batches = max(0, min(num_new_batches, max_batches - num_batches))
+
+        reconstruction_futures = []
+        reconstruction_file_paths = []
+        for shard_index in range(num_batches + num_new_batches):
+            shard_name = benchmark_config.simulation_shard(simulation_name, shard_index).name
+            self.parent.executor.init_simulation_directories(benchmark_name, shard_name)
+            reconstruction_futures.append(
+                self._submit_reconstruction(benchmark_name, shard_name, compile_future, material_map_future)
+            )
+            reconstruction_file_paths.append(str(self.parent.paths.reconstruction_out_file_path(benchmark_name, shard_name)))
+
+        num_batches = len(reconstruction_file_paths)
+        precision_future = self._node(
+            'analysis', (benchmark_name, simulation_name, num_batches), estimate_simulation_precision,
+            self.parent, benchmark_name, simulation_name,
+            reconstruction_file_paths=reconstruction_file_paths, dependencies=reconstruction_futures
+        )
+
+        def continue_adaptive_simulation(precision : Dict[str, Any]) -> Future:
+
+            num_next_batches = adaptive_events.next_num_batches(precision, num_batches, simulation_config.num_events)
+            if num_next_batches > 0:
+                return self._submit_adaptive_round(
+                    benchmark_name, simulation_name, num_batches, num_next_batches,
+                    compile_future, material_map_future
+                )
+            return self._submit_analysis(
+                benchmark_name, simulation_name, reconstruction_file_paths=reconstruction_file_paths
+            )
+
+        return join_app(continue_adaptive_simulation)(precision_future)
+
+#Workflow script that submits the built-in workflow DAG
+def submit_workflow_dag(workflow_config : WorkflowConfig) -> List[Future]:
+
+    return workflow_config.dag.submit()
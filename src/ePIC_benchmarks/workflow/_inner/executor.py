@@ -1,12 +1,23 @@
-import shutil
-from multiprocessing import Pool
+import inspect
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cached_property
+from pathlib import Path
 from typing import Optional, Sequence, Callable
+from parsl import bash_app, python_app
+from ePIC_benchmarks._file.trash import DirectoryTrash
+from ePIC_benchmarks._file.utils import copy_tree
 from ePIC_benchmarks.workflow.config import WorkflowConfig
+from ePIC_benchmarks.workflow.context import TaskContext, accepts_task_context
 from ePIC_benchmarks.workflow.future import WorkflowFuture
 from ePIC_benchmarks.container.containers import ContainerUnion
 from ePIC_benchmarks.workflow.run import execute_workflow
+from ePIC_benchmarks.workflow.stage import WorkflowStageName, PYTHON_APP_STAGES, SIMULATION_THREAD_STAGES
 
 WorkflowScript = Callable[[WorkflowConfig], WorkflowFuture]
+#Upper bound on the default number of threads that initialize benchmark directories
+DEFAULT_MAX_INIT_THREADS = 32
+
 class WorkflowExecutor:
 
     parent : WorkflowConfig
@@ -15,6 +26,12 @@ class WorkflowExecutor:
         assert(isinstance(parent, WorkflowConfig))
         self.parent = parent
 
+    #Deletes discarded workflow directories in the background
+    @cached_property
+    def trash(self) -> DirectoryTrash:
+
+        return DirectoryTrash(self.parent.paths.trash_dir_path, max_workers=self.parent.max_init_threads)
+
     def epic_branch(self, benchmark_name : str) -> str:
 
         benchmark_config = self.parent.benchmark_config(benchmark_name)
@@ -28,6 +45,52 @@ class WorkflowExecutor:
         
         return self.parent.parsl_config.executor_container(executor_label)
     
+    #Wraps a function as a parsl app that is routed to the executors of a workflow stage,
+    #and that is invoked with the stage's walltime and resource specification.
+    #Tasks of the npsim and eicrecon stages request the number of threads of their simulation as their cores.
+    #Tasks of memoized stages are hashed by the content of their stage inputs instead of the whole workflow configuration,
+    #and functions that accept a TaskContext are sent one in place of the whole workflow configuration
+    def stage_app(self, stage : WorkflowStageName, function : Callable) -> Callable:
+
+        from .memo import STAGE_HASH_KWARG
+        memoized = self.parent.memo.is_memoized(stage) and self.parent.memo.is_memoizable(function)
+        uses_task_context = accepts_task_context(function) and self.parent.memo.is_memoizable(function)
+        app_decorator = python_app if stage in PYTHON_APP_STAGES else bash_app
+        app = app_decorator(
+            function, executors=self.parent.stage_executors(stage),
+            cache=memoized, ignore_for_cache=['workflow_config'] if memoized else None
+        )
+        stage_kwargs = self.parent.stage_app_kwargs(stage)
+        simulation_resources = stage in SIMULATION_THREAD_STAGES
+        signature = inspect.signature(function)
+        profiler = self.parent.profiler if self.parent.profile else None
+
+        def stage_app_wrapper(*args, **kwargs):
+            if not memoized and not uses_task_context and not simulation_resources and profiler is None:
+                return app(*args, **{**stage_kwargs, **kwargs})
+
+            #Every argument is passed by keyword so that the workflow configuration can be excluded from the task hash
+            app_kwargs = {}
+            for name, value in signature.bind_partial(*args, **kwargs).arguments.items():
+                if signature.parameters[name].kind == inspect.Parameter.VAR_KEYWORD:
+                    app_kwargs.update(value)
+                else:
+                    app_kwargs[name] = value
+            benchmark_name = app_kwargs.get('benchmark_name')
+            simulation_name = app_kwargs.get('simulation_name')
+            if memoized:
+                app_kwargs[STAGE_HASH_KWARG] = self.parent.memo.stage_hash(stage, benchmark_name, simulation_name)
+            if uses_task_context and isinstance(app_kwargs.get('workflow_config'), WorkflowConfig):
+                app_kwargs['workflow_config'] = self.task_context(benchmark_name, simulation_name)
+            call_stage_kwargs = stage_kwargs
+            if simulation_resources and simulation_name is not None:
+                call_stage_kwargs = self.parent.stage_app_kwargs(stage, benchmark_name, simulation_name)
+            future = app(**{**call_stage_kwargs, **app_kwargs})
+            if profiler is not None:
+                profiler.record(stage, function.__name__, future, benchmark_name, simulation_name)
+            return future
+        return stage_app_wrapper
+
     def run_benchmarks(
         self, workflow : WorkflowConfig, script_func : Optional[WorkflowScript] = None,
         script_path : Optional[str] = None, script_func_name : Optional[str] = None) -> None:
@@ -37,16 +100,75 @@ class WorkflowExecutor:
 
     def apply_detector_configs(self, benchmark_name : str):
 
-        benchmark_config = self.parent.benchmark_config(benchmark_name)
-        benchmark_config.apply_detector_configs(self.parent.paths.workflow_dir_path)
+        return self.parent.paths.apply_detector_configs(benchmark_name)
 
     def npsim_command_string(self, benchmark_name : str, simulation_name : str) -> str:
         benchmark_config = self.parent.benchmark_config(benchmark_name)
-        return benchmark_config.npsim_cmd(simulation_name, self.parent.paths.workflow_dir_path)
+        epic_path = self.parent.paths.epic_repo_path(benchmark_name)
+        return benchmark_config.npsim_cmd(simulation_name, self.parent.paths.workflow_dir_path, epic_path=epic_path)
 
     def eicrecon_command_string(self, benchmark_name : str, simulation_name : str) -> str:
         benchmark_config = self.parent.benchmark_config(benchmark_name)
-        return benchmark_config.eicrecon_cmd(simulation_name, self.parent.paths.workflow_dir_path)
+        epic_path = self.parent.paths.epic_repo_path(benchmark_name)
+        return benchmark_config.eicrecon_cmd(simulation_name, self.parent.paths.workflow_dir_path, epic_path=epic_path)
+
+    #Returns the resolved paths and command strings that the tasks of a benchmark (and simulation) require
+    def task_context(self, benchmark_name : str, simulation_name : Optional[str] = None) -> TaskContext:
+
+        paths = self.parent.paths
+        build_config = self.parent.benchmark_config(self.parent.build_benchmark_name(benchmark_name))
+        benchmark_config = self.parent.benchmark_config(benchmark_name)
+        epic_repo_path = paths.epic_repo_path(benchmark_name)
+        material_map_path = Path(paths.material_map_path(benchmark_name))
+        existing_material_map_path = benchmark_config.existing_material_map_path
+        context_kwargs = dict(
+            benchmark_name=benchmark_name,
+            epic_repo_path=epic_repo_path,
+            epic_branch=build_config.epic_branch,
+            build_num_threads=self.parent.stage_config('build').cores or 1,
+            detector_configs=tuple(build_config.detector_configs),
+            generate_material_map=benchmark_config.generate_material_map,
+            existing_material_map_path=Path(existing_material_map_path) if existing_material_map_path is not None else None,
+            material_map_dir_path=paths.material_map_dir_path(benchmark_name),
+            material_map_script_path=paths.material_map_script_path(benchmark_name),
+            material_map_path=material_map_path,
+            analysis_out_dir_path=paths.analysis_out_dir_path(benchmark_name),
+            skip_complete_outputs=self.parent.skip_complete_outputs,
+        )
+        if simulation_name is None:
+            return TaskContext(**context_kwargs)
+
+        #Simulations that use a material map are reconstructed with the benchmark's material map
+        simulation_config = self.parent.simulation_config(benchmark_name, simulation_name)
+        if simulation_config.use_material_map:
+            simulation_config = simulation_config.model_copy(update={'material_map_path': material_map_path})
+        eicrecon_command = simulation_config.eicrecon_cmd(
+            epic_repo_path=epic_repo_path,
+            input_dir_path=paths.simulation_out_dir_path(benchmark_name),
+            output_dir_path=paths.reconstruction_out_dir_path(benchmark_name)
+        )
+        return TaskContext(
+            **context_kwargs,
+            simulation_name=simulation_name,
+            simulation_config=simulation_config,
+            detector_build_path=paths.detector_build_path(benchmark_name, simulation_name),
+            simulation_out_file_path=paths.simulation_out_file_path(benchmark_name, simulation_name),
+            reconstruction_out_file_path=paths.reconstruction_out_file_path(benchmark_name, simulation_name),
+            simulation_instance_temp_dir_path=paths.simulation_instance_temp_dir_path(benchmark_name, simulation_name),
+            reconstruction_instance_temp_dir_path=paths.reconstruction_instance_temp_dir_path(benchmark_name, simulation_name),
+            npsim_command=self.npsim_command_string(benchmark_name, simulation_name),
+            eicrecon_command=eicrecon_command,
+        )
+
+    #Checks whether the npsim output of a simulation is complete and newer than the detector description it simulated
+    def simulation_output_complete(self, benchmark_name : str, simulation_name : str) -> bool:
+
+        return self.task_context(benchmark_name, simulation_name).simulation_output_complete()
+
+    #Checks whether the eicrecon output of a simulation is complete and newer than its npsim output and material map
+    def reconstruction_output_complete(self, benchmark_name : str, simulation_name : str) -> bool:
+
+        return self.task_context(benchmark_name, simulation_name).reconstruction_output_complete()
 
     def init_benchmark_directory(self, benchmark_name):
 
@@ -54,133 +176,113 @@ class WorkflowExecutor:
 
         benchmark_dir_path = self.parent.paths.benchmark_dir_path(benchmark_name)
         if self.parent.redo_all_benchmarks:
-            shutil.rmtree(benchmark_dir_path, ignore_errors=True)
+            self.trash.discard(benchmark_dir_path)
         benchmark_dir_path.mkdir(parents=True, exist_ok=True)
 
-        epic_path = self.parent.paths.epic_repo_path(benchmark_name)
-        
-        if self.parent.redo_epic_building:
-            shutil.rmtree(epic_path, ignore_errors=True)
-        epic_path.mkdir(parents=True, exist_ok=True)
-        
-        #Copy existing ePIC Repository to Benchmark ePIC Dir if it is not None
-        if benchmark_config.existing_epic_directory_path is not None:
-            existing_epic_path = benchmark_config.existing_epic_directory_path
-            shutil.copytree(existing_epic_path, epic_path, dirs_exist_ok=True)
+        #Only the benchmark that owns a (possibly shared) ePIC build initializes its ePIC directory
+        if self.parent.build_benchmark_name(benchmark_name) == benchmark_name:
+            epic_path = self.parent.paths.epic_repo_path(benchmark_name)
+            
+            if self.parent.redo_epic_building:
+                self.trash.discard(epic_path)
+            epic_path.mkdir(parents=True, exist_ok=True)
+            
+            #Copy existing ePIC Repository to Benchmark ePIC Dir if it is not None
+            if benchmark_config.existing_epic_directory_path is not None:
+                existing_epic_path = benchmark_config.existing_epic_directory_path
+                copy_tree(existing_epic_path, epic_path, mode=self.parent.epic_copy_mode)
 
         analysis_path = self.parent.paths.analysis_out_dir_path(benchmark_name)
         if self.parent.redo_analysis:
-            shutil.rmtree(analysis_path, ignore_errors=True)
+            self.trash.discard(analysis_path)
         analysis_path.mkdir(parents=True, exist_ok=True)
 
         sim_out_dir_path = self.parent.paths.simulation_out_dir_path(benchmark_name)
         sim_temp_dir_path = self.parent.paths.simulation_temp_dir_path(benchmark_name)
         if self.parent.redo_simulations:
-            shutil.rmtree(sim_out_dir_path, ignore_errors=True)
-            shutil.rmtree(sim_temp_dir_path, ignore_errors=True)
+            self.trash.discard(sim_out_dir_path)
+            self.trash.discard(sim_temp_dir_path)
         sim_out_dir_path.mkdir(parents=True, exist_ok=True)
         sim_temp_dir_path.mkdir(parents=True, exist_ok=True)
 
         recon_out_dir_path = self.parent.paths.reconstruction_out_dir_path(benchmark_name)
         recon_temp_dir_path = self.parent.paths.reconstruction_temp_dir_path(benchmark_name)
         if self.parent.redo_reconstructions:
-            shutil.rmtree(recon_out_dir_path, ignore_errors=True)
-            shutil.rmtree(recon_temp_dir_path, ignore_errors=True)
+            self.trash.discard(recon_out_dir_path)
+            self.trash.discard(recon_temp_dir_path)
 
         recon_out_dir_path.mkdir(parents=True, exist_ok=True)
         recon_temp_dir_path.mkdir(parents=True, exist_ok=True)
 
         #Initialize temporary directory for each npsim and eicrecon execution  
         for simulation_name in self.parent.simulation_names(benchmark_name):
-            simulation_instance_temp_path = self.parent.paths.simulation_instance_temp_dir_path(benchmark_name, simulation_name)
-            simulation_instance_temp_path.mkdir(parents=True, exist_ok=True)
+            self.init_simulation_directories(benchmark_name, simulation_name)
+
+    #Initializes the temporary directories of a simulation's npsim and eicrecon executions
+    def init_simulation_directories(self, benchmark_name : str, simulation_name : str) -> None:
+
+        simulation_instance_temp_path = self.parent.paths.simulation_instance_temp_dir_path(benchmark_name, simulation_name)
+        simulation_instance_temp_path.mkdir(parents=True, exist_ok=True)
 
-            reconstruction_instance_temp_path = self.parent.paths.reconstruction_instance_temp_dir_path(benchmark_name, simulation_name)
-            reconstruction_instance_temp_path.mkdir(parents=True, exist_ok=True)
+        reconstruction_instance_temp_path = self.parent.paths.reconstruction_instance_temp_dir_path(benchmark_name, simulation_name)
+        reconstruction_instance_temp_path.mkdir(parents=True, exist_ok=True)
 
+    #Initializes the directories of every benchmark with a bounded pool of threads,
+    #and raises an error naming every benchmark whose directories could not be initialized
     def init_directories(self):
 
         benchmark_suite_path = self.parent.paths.workflow_dir_path
         benchmark_suite_path.mkdir(parents=True, exist_ok=True)
+        self.trash.empty()
 
         benchmark_names = self.parent.benchmark_names()
-
-        pool = Pool(len(benchmark_names))
-
-        try:
-            pool.map(self.init_benchmark_directory, benchmark_names)
-        except:
-            pool.close()
-            pool.join()
-
-
-        # for benchmark_name in self.parent.benchmark_names():
-
-
-
-            # benchmark_dir_path = self.parent.paths.benchmark_dir_path(benchmark_name)
-            # if self.parent.redo_all_benchmarks:
-            #     shutil.rmtree(benchmark_dir_path, ignore_errors=True)
-            # benchmark_dir_path.mkdir(parents=True, exist_ok=True)
-
-            # epic_path = self.parent.paths.epic_repo_path(benchmark_name)
-            # if self.parent.redo_epic_building:
-            #     shutil.rmtree(epic_path, ignore_errors=True)
-            # epic_path.mkdir(parents=True, exist_ok=True)
-
-            # analysis_path = self.parent.paths.analysis_out_dir_path(benchmark_name)
-            # if self.parent.redo_analysis:
-            #     shutil.rmtree(epic_path, ignore_errors=True)
-            # analysis_path.mkdir(parents=True, exist_ok=True)
-
-            # sim_out_dir_path = self.parent.paths.simulation_out_dir_path(benchmark_name)
-            # sim_temp_dir_path = self.parent.paths.simulation_temp_dir_path(benchmark_name)
-            # if self.parent.redo_simulations:
-            #     shutil.rmtree(sim_out_dir_path, ignore_errors=True)
-            #     shutil.rmtree(sim_temp_dir_path, ignore_errors=True)
-            # sim_out_dir_path.mkdir(parents=True, exist_ok=True)
-            # sim_temp_dir_path.mkdir(parents=True, exist_ok=True)
-
-            # recon_out_dir_path = self.parent.paths.reconstruction_out_dir_path(benchmark_name)
-            # recon_temp_dir_path = self.parent.paths.reconstruction_temp_dir_path(benchmark_name)
-            # if self.parent.redo_reconstructions:
-            #     shutil.rmtree(recon_out_dir_path, ignore_errors=True)
-            #     shutil.rmtree(recon_temp_dir_path, ignore_errors=True)
-
-            # recon_out_dir_path.mkdir(parents=True, exist_ok=True)
-            # recon_temp_dir_path.mkdir(parents=True, exist_ok=True)
-
-            # #Initialize temporary directory for each npsim and eicrecon execution  
-            # for simulation_name in self.parent.simulation_names(benchmark_name):
-            #     simulation_instance_temp_path = self.parent.paths.simulation_instance_temp_dir_path(benchmark_name, simulation_name)
-            #     simulation_instance_temp_path.mkdir(parents=True, exist_ok=True)
-
-            #     reconstruction_instance_temp_path = self.parent.paths.reconstruction_instance_temp_dir_path(benchmark_name, simulation_name)
-            #     reconstruction_instance_temp_path.mkdir(parents=True, exist_ok=True)
-
+        if len(benchmark_names) == 0:
+            return
+
+        max_workers = self.parent.max_init_threads or min(DEFAULT_MAX_INIT_THREADS, (os.cpu_count() or 1) + 4)
+        errors = {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(benchmark_names))) as pool:
+            futures = {
+                pool.submit(self.init_benchmark_directory, benchmark_name) : benchmark_name
+                for benchmark_name in benchmark_names
+            }
+            for future in as_completed(futures):
+                if future.exception() is not None:
+                    errors[futures[future]] = future.exception()
+
+        if len(errors) > 0:
+            err = "Could not initialize the directories of benchmarks:\n" + "\n".join(
+                f"    {benchmark_name}: {error!r}" for benchmark_name, error in errors.items()
+            )
+            raise RuntimeError(err) from next(iter(errors.values()))
+
+    #Moves every directory that isn't kept into the trash, which deletes them in the background
+    #unless the workflow waits for its cleanup to complete
     def cleanup_directories(self):
 
         for benchmark_name in self.parent.benchmark_names():
 
             if not self.parent.keep_epic_repos:
                 epic_path = self.parent.paths.epic_repo_path(benchmark_name)
-                shutil.rmtree(epic_path, ignore_errors=True)
+                self.trash.discard(epic_path)
 
             if not self.parent.keep_simulation_outputs:
                 sim_out_dir_path = self.parent.paths.simulation_out_dir_path(benchmark_name)
-                shutil.rmtree(sim_out_dir_path, ignore_errors=True)
+                self.trash.discard(sim_out_dir_path)
 
             if not self.parent.keep_reconstruction_outputs:
                 recon_out_dir_path = self.parent.paths.reconstruction_out_dir_path(benchmark_name)
-                shutil.rmtree(recon_out_dir_path, ignore_errors=True)
+                self.trash.discard(recon_out_dir_path)
 
             if not self.parent.keep_analysis_outputs:
                 analysis_out_path = self.parent.paths.analysis_out_dir_path(benchmark_name)
-                shutil.rmtree(analysis_out_path, ignore_errors=True)
+                self.trash.discard(analysis_out_path)
 
             sim_temp_dir_path = self.parent.paths.simulation_temp_dir_path(benchmark_name)
-            shutil.rmtree(sim_temp_dir_path, ignore_errors=True)
+            self.trash.discard(sim_temp_dir_path)
 
             recon_temp_dir_path = self.parent.paths.reconstruction_temp_dir_path(benchmark_name)
-            shutil.rmtree(recon_temp_dir_path, ignore_errors=True)
+            self.trash.discard(recon_temp_dir_path)
 
+        if not self.parent.background_cleanup:
+            self.trash.wait()
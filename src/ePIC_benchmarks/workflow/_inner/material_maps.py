@@ -0,0 +1,80 @@
+import hashlib
+import subprocess
+from pathlib import Path
+from typing import Optional
+from ePIC_benchmarks._file.types import PathType
+from ePIC_benchmarks.detector.geometry import geometry_hash as compact_geometry_hash
+from ePIC_benchmarks.workflow.config import WorkflowConfig
+
+MATERIAL_MAP_FILE_NAME = "material-map.cbor"
+COMPACT_DIR_NAME = "compact"
+
+#Returns the commit that an ePIC repository is checked out at, or None if the directory isn't a git repository
+def epic_commit(epic_repo_path : PathType) -> Optional[str]:
+
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(epic_repo_path), "rev-parse", "HEAD"],
+            capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+#Returns the sha256 hash of the geometry of an ePIC repository's compact directory and the commit it is checked out at.
+#Detector edits are applied to the compact files before the build, so the hash identifies the built geometry.
+#Compact files are hashed in their canonical form and cached until they change, so that builds whose files only differ by
+#their formatting or comments share their material maps
+def geometry_hash(epic_repo_path : PathType) -> str:
+
+    epic_repo_path = Path(epic_repo_path)
+    compact_dir_path = epic_repo_path.joinpath(COMPACT_DIR_NAME)
+
+    hasher = hashlib.sha256()
+    hasher.update(str(epic_commit(epic_repo_path)).encode())
+    hasher.update(b"\0")
+    hasher.update(compact_geometry_hash(compact_dir_path).encode())
+    return hasher.hexdigest()
+
+#Content-addressed cache of generated material maps, shared by every benchmark and workflow that uses the same cache directory.
+#Material maps are stored under the hash of the geometry they were generated for and their number of events
+class WorkflowMaterialMaps:
+
+    parent : WorkflowConfig
+
+    def __init__(self, parent):
+        assert(isinstance(parent, WorkflowConfig))
+        self.parent = parent
+
+    @property
+    def enabled(self) -> bool:
+
+        return self.parent.material_map_cache_directory is not None
+
+    @property
+    def cache_dir_path(self) -> Path:
+
+        if self.parent.material_map_cache_directory is None:
+            err = f"Workflow '{self.parent.name}' doesn't define a material map cache directory."
+            raise ValueError(err)
+        #Relative cache directories are relative to the working directory
+        working_dir_path = Path(self.parent.working_directory)
+        return working_dir_path.joinpath(self.parent.material_map_cache_directory).resolve()
+
+    #Returns the cache key of the material map of a benchmark's build. The build must already be checked out and edited
+    def cache_key(self, benchmark_name : str, n_events : int) -> str:
+
+        epic_repo_path = self.parent.paths.epic_repo_path(benchmark_name)
+        return hashlib.sha256(f"{geometry_hash(epic_repo_path)}:{n_events}".encode()).hexdigest()
+
+    def cached_material_map_path(self, cache_key : str) -> Path:
+
+        return self.cache_dir_path.joinpath(cache_key, MATERIAL_MAP_FILE_NAME)
+
+    #Returns the path of a cached material map, or None if no material map was cached for the key
+    def lookup(self, cache_key : str) -> Optional[Path]:
+
+        cached_path = self.cached_material_map_path(cache_key)
+        if cached_path.is_file():
+            return cached_path
+        return None
@@ -0,0 +1,120 @@
+import hashlib
+import inspect
+import json
+import pickle
+from typing import Any, Callable, Optional
+from parsl.dataflow.memoization import id_for_memo
+from ePIC_benchmarks.workflow.config import WorkflowConfig
+from ePIC_benchmarks.workflow.stage import WorkflowStageName
+from ePIC_benchmarks.container._base import BaseContainerConfig
+
+#Name of the keyword argument that carries the content hash of a stage task's inputs
+STAGE_HASH_KWARG = "stage_hash"
+
+BUILD_STAGES = ('epic', 'detector', 'build')
+SIMULATION_STAGES = ('simulation', 'reconstruction', 'analysis')
+
+#Returns the sha256 hash of the JSON representation of the given contents
+def content_hash(*contents : Any) -> str:
+
+    hasher = hashlib.sha256()
+    for content in contents:
+        hasher.update(json.dumps(content, sort_keys=True, default=str).encode())
+    return hasher.hexdigest()
+
+#Containers are passed to stage tasks as keyword arguments, so parsl must be able to hash them
+@id_for_memo.register(BaseContainerConfig)
+def id_for_memo_container(container : BaseContainerConfig, output_ref : bool = False) -> bytes:
+
+    return pickle.dumps(content_hash(type(container).__name__, container.model_dump()))
+
+#Computes per-stage memoization keys from only the inputs that affect each stage, so that
+#unrelated changes to the workflow configuration don't invalidate the checkpoints of a stage
+class WorkflowMemo:
+
+    parent : WorkflowConfig
+
+    def __init__(self, parent):
+        assert(isinstance(parent, WorkflowConfig))
+        self.parent = parent
+
+    #Returns True if the tasks of a stage are memoized by parsl
+    #NOTE: Stages that are redone, or whose outputs are deleted at the end of the workflow, are never memoized
+    def is_memoized(self, stage : WorkflowStageName) -> bool:
+
+        if self.parent.redo_all_benchmarks or not self.parent.parsl_config.app_cache:
+            return False
+        if stage in BUILD_STAGES or stage == 'material_map':
+            return not self.parent.redo_epic_building and self.parent.keep_epic_repos
+        elif stage == 'simulation':
+            return not self.parent.redo_simulations and self.parent.keep_simulation_outputs
+        elif stage == 'reconstruction':
+            return not self.parent.redo_reconstructions and self.parent.keep_reconstruction_outputs
+        elif stage == 'analysis':
+            return not self.parent.redo_analysis and self.parent.keep_analysis_outputs
+        return False
+
+    #Returns True if a function's tasks can be memoized by content.
+    #These take the workflow configuration as their first argument, a benchmark name and arbitrary keyword arguments
+    def is_memoizable(self, function : Callable) -> bool:
+
+        parameters = list(inspect.signature(function).parameters.values())
+        if len(parameters) == 0 or parameters[0].name != 'workflow_config':
+            return False
+        parameter_kinds = [parameter.kind for parameter in parameters]
+        parameter_names = [parameter.name for parameter in parameters]
+        return (
+            'benchmark_name' in parameter_names
+            and inspect.Parameter.VAR_POSITIONAL not in parameter_kinds
+            and inspect.Parameter.VAR_KEYWORD in parameter_kinds
+        )
+
+    #Hash of the ePIC branch and detector changes of the build used by a benchmark
+    def build_hash(self, benchmark_name : str) -> str:
+
+        build_name = self.parent.build_benchmark_name(benchmark_name)
+        build_config = self.parent.benchmark_config(build_name)
+        return content_hash(build_name, build_config.build_key())
+
+    #Hash of the material map used by a benchmark
+    def material_map_hash(self, benchmark_name : str) -> str:
+
+        benchmark_config = self.parent.benchmark_config(benchmark_name)
+        return content_hash(
+            self.build_hash(benchmark_name),
+            benchmark_config.generate_material_map,
+            str(benchmark_config.existing_material_map_path)
+        )
+
+    #Hash of a simulation's configuration and the build it runs on
+    def simulation_hash(self, benchmark_name : str, simulation_name : str) -> str:
+
+        simulation_config = self.parent.simulation_config(benchmark_name, simulation_name)
+        return content_hash(self.build_hash(benchmark_name), simulation_config.model_dump())
+
+    #Hash of a simulation's reconstruction inputs, including its material map if it uses one
+    def reconstruction_hash(self, benchmark_name : str, simulation_name : str) -> str:
+
+        simulation_config = self.parent.simulation_config(benchmark_name, simulation_name)
+        material_map_hash = None
+        if simulation_config.use_material_map:
+            material_map_hash = self.material_map_hash(benchmark_name)
+        return content_hash(self.simulation_hash(benchmark_name, simulation_name), material_map_hash)
+
+    #Returns the content hash of the inputs of a stage task
+    def stage_hash(self, stage : WorkflowStageName, benchmark_name : str, simulation_name : Optional[str] = None) -> str:
+
+        if stage in BUILD_STAGES:
+            return self.build_hash(benchmark_name)
+        elif stage == 'material_map':
+            return self.material_map_hash(benchmark_name)
+        elif stage in SIMULATION_STAGES:
+            if simulation_name is None:
+                err = f"A simulation name is required to hash the inputs of the '{stage}' stage."
+                raise ValueError(err)
+            if stage == 'simulation':
+                return self.simulation_hash(benchmark_name, simulation_name)
+            return self.reconstruction_hash(benchmark_name, simulation_name)
+
+        err = f"Tasks of the '{stage}' stage are not memoized by content."
+        raise ValueError(err)
@@ -1,8 +1,9 @@
 from functools import cached_property
 from pathlib import Path
+from typing import Callable, Dict, Hashable
 from ePIC_benchmarks.benchmark.config import BenchmarkConfig
 from ePIC_benchmarks.simulation.config import SimulationConfig
-from ePIC_benchmarks.workflow.config import WorkflowConfig
+from ePIC_benchmarks.workflow.config import WorkflowConfig, TRASH_DIR_NAME, PROFILE_DIR_NAME
 
 class WorkflowPaths:
 
@@ -11,6 +12,17 @@ class WorkflowPaths:
     def __init__(self, parent):
         assert(isinstance(parent, WorkflowConfig))
         self.parent = parent
+        self._path_cache : Dict[Hashable, Path] = {}
+
+    #Returns a memoized path. Keys contain every configuration value that a path depends on,
+    #so a configuration change never returns a stale path
+    def _memoized_path(self, key : Hashable, compute : Callable[[], Path]) -> Path:
+
+        path = self._path_cache.get(key)
+        if path is None:
+            path = compute()
+            self._path_cache[key] = path
+        return path
 
     @cached_property
     def workflow_dir_path(self):
@@ -21,21 +33,25 @@ class WorkflowPaths:
             return working_dir_path
         return working_dir_path.joinpath(self.parent.name)
 
+    #Directory that discarded workflow directories are moved into before they are deleted
+    @cached_property
+    def trash_dir_path(self) -> Path:
+
+        return self.workflow_dir_path.joinpath(TRASH_DIR_NAME)
+
+    #Directory of the workflow's profiling reports
+    @cached_property
+    def profile_dir_path(self) -> Path:
+
+        return self.workflow_dir_path.joinpath(PROFILE_DIR_NAME)
+
     def benchmark_names(self):
 
-        names = []
-        for benchmark in self.parent.benchmarks:
-            names.append(benchmark.name)
-        return names
+        return self.parent.benchmark_names()
 
     def benchmark_config(self, benchmark_name : str) -> BenchmarkConfig:
 
-        for benchmark in self.parent.benchmarks:
-            if benchmark.name == benchmark_name:
-                return benchmark
-
-        err = f"Benchmark config with name '{benchmark_name}' could be found"
-        raise ValueError(err)
+        return self.parent.benchmark_config(benchmark_name)
 
     def simulation_names(self, benchmark_name : str):
         benchmark_config = self.parent.benchmark_config(benchmark_name)
@@ -53,23 +69,26 @@ class WorkflowPaths:
 
     def apply_detector_configs(self, benchmark_name : str):
 
-        benchmark_config = self.parent.benchmark_config(benchmark_name)
-        benchmark_config.apply_detector_configs(self.workflow_dir_path)
+        benchmark_config = self.parent.benchmark_config(self.parent.build_benchmark_name(benchmark_name))
+        return benchmark_config.apply_detector_configs(self.workflow_dir_path)
 
     def benchmark_dir_path(self, benchmark_name : str) -> Path:
 
         benchmark_config = self.parent.benchmark_config(benchmark_name)
-        return benchmark_config.benchmark_dir_path(self.workflow_dir_path)
+        return self._memoized_path(
+            ('benchmark_dir', benchmark_name, benchmark_config.benchmark_dir_name),
+            lambda : benchmark_config.benchmark_dir_path(self.workflow_dir_path)
+        )
 
+    #NOTE: Returns the ePIC repository of the benchmark whose build is shared if ePIC builds are shared
     def epic_repo_path(self, benchmark_name : str) -> Path:
 
-        benchmark_config = self.parent.benchmark_config(benchmark_name)
+        benchmark_config = self.parent.benchmark_config(self.parent.build_benchmark_name(benchmark_name))
         return benchmark_config.epic_repo_path(self.workflow_dir_path)
     
     def material_map_dir_path(self, benchmark_name):
 
-        benchmark_config = self.parent.benchmark_config(benchmark_name)
-        epic_dir_path = benchmark_config.epic_repo_path(self.workflow_dir_path)
+        epic_dir_path = self.epic_repo_path(benchmark_name)
         return epic_dir_path.joinpath("scripts", "material_map")
 
     def material_map_script_path(self, benchmark_name):
@@ -80,7 +99,9 @@ class WorkflowPaths:
     def material_map_path(self, benchmark_name : str, file_name : str = "material-map.cbor") -> Path:
 
         benchmark_config = self.parent.benchmark_config(benchmark_name)
-        return benchmark_config.material_map_path(self.workflow_dir_path, file_name)
+        if benchmark_config.existing_material_map_path:
+            return benchmark_config.existing_material_map_path
+        return self.material_map_dir_path(benchmark_name).joinpath(file_name)
         # material_map_dir = self.material_map_dir_path(benchmark_name)
         # return material_map_dir.joinpath(file_name)
 
@@ -102,12 +123,24 @@ class WorkflowPaths:
     def simulation_out_file_path(self, benchmark_name : str, simulation_name : str) -> Path:
 
         benchmark_config = self.parent.benchmark_config(benchmark_name)
-        return benchmark_config.simulation_out_file_path(simulation_name, self.workflow_dir_path)
+        return self._memoized_path(
+            (
+                'simulation_out_file', benchmark_name, simulation_name,
+                benchmark_config.benchmark_dir_name, benchmark_config.simulation_out_directory_name
+            ),
+            lambda : benchmark_config.simulation_out_file_path(simulation_name, self.workflow_dir_path)
+        )
 
     def reconstruction_out_file_path(self, benchmark_name : str, simulation_name : str) -> Path:
 
         benchmark_config = self.parent.benchmark_config(benchmark_name)
-        return benchmark_config.reconstruction_out_file_path(simulation_name, self.workflow_dir_path)
+        return self._memoized_path(
+            (
+                'reconstruction_out_file', benchmark_name, simulation_name,
+                benchmark_config.benchmark_dir_name, benchmark_config.reconstruction_out_directory_name
+            ),
+            lambda : benchmark_config.reconstruction_out_file_path(simulation_name, self.workflow_dir_path)
+        )
 
     def simulation_temp_dir_path(self, benchmark_name : str) -> Path:
 
@@ -129,5 +162,5 @@ class WorkflowPaths:
         return reconstruction_temp_path.joinpath(simulation_name)
 
     def detector_build_path(self, benchmark_name : str, simulation_name : str) -> Path:
-        benchmark_config = self.parent.benchmark_config(benchmark_name)
-        return benchmark_config.detector_build_path(simulation_name, self.workflow_dir_path)
+        simulation_config = self.parent.simulation_config(benchmark_name, simulation_name)
+        return simulation_config._abs_detector_path(self.epic_repo_path(benchmark_name))
@@ -0,0 +1,295 @@
+import math
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ePIC_benchmarks.simulation.config import SimulationConfig, SHARD_NAME_SEPARATOR
+from ePIC_benchmarks.parsl.executors.executors import ParslExecutorConfig, ParslExecutorConfigWithProvider
+from ePIC_benchmarks.workflow.config import WorkflowConfig
+from ePIC_benchmarks.workflow.stage import SIMULATION_THREAD_STAGES, WORKFLOW_STAGE_NAMES, StageConfig, WorkflowStageName
+from ePIC_benchmarks.workflow.profile import TaskProfile, read_profile_tasks
+from ePIC_benchmarks.workflow.plan.cost import EVENT_STAGES, CostModel, StageCost
+from ePIC_benchmarks.workflow.plan.plan import (
+    SECONDS_PER_HOUR, PlannedTask, ProviderRecommendation, StagePlan, WorkflowPlan
+)
+
+#Number of cores per node assumed for providers and executors that don't define it
+DEFAULT_CORES_PER_NODE = 64
+
+#Estimates the cost of a workflow before it runs, and calibrates cost models with the tasks of previous runs
+class WorkflowPlanner:
+
+    parent : WorkflowConfig
+
+    def __init__(self, parent):
+        assert(isinstance(parent, WorkflowConfig))
+        self.parent = parent
+
+    #Returns the configuration of a simulation or of a shard of an adaptive simulation,
+    #which may not be registered if its tasks were read from a previous run's profile reports
+    def _simulation_config(self, benchmark_name : str, simulation_name : str) -> Optional[SimulationConfig]:
+
+        benchmark_config = self.parent.benchmark_config(benchmark_name)
+        try:
+            return benchmark_config.get_simulation_config(simulation_name)
+        except ValueError:
+            pass
+        base_name, separator, shard_index = simulation_name.rpartition(SHARD_NAME_SEPARATOR)
+        if len(separator) == 0 or not shard_index.isdigit():
+            return None
+        try:
+            return benchmark_config.simulation_shard(base_name, int(shard_index))
+        except ValueError:
+            return None
+
+    def _stage_cores(self, stage : WorkflowStageName, simulation_config : Optional[SimulationConfig] = None) -> int:
+
+        if stage in SIMULATION_THREAD_STAGES and simulation_config is not None:
+            return getattr(simulation_config, SIMULATION_THREAD_STAGES[stage])
+        return self.parent.stage_config(stage).cores or 1
+
+    #Lists every task that the built-in workflow DAG submits.
+    #Adaptive simulations are planned with their maximum number of events
+    def planned_tasks(self) -> List[PlannedTask]:
+
+        dag = self.parent.dag
+        tasks = []
+        if len(dag.containers()) > 0:
+            tasks.append(PlannedTask(stage='container', benchmark_name=None))
+
+        for build_name, benchmark_names in dag.build_groups().items():
+            build_config = self.parent.benchmark_config(build_name)
+            if build_config.existing_epic_directory_path is None:
+                tasks.extend(PlannedTask(stage='epic', benchmark_name=build_name) for _ in range(2))
+            tasks.append(PlannedTask(stage='detector', benchmark_name=build_name))
+            tasks.append(PlannedTask(stage='build', benchmark_name=build_name, cores=self._stage_cores('build')))
+            if any(
+                self.parent.benchmark_config(benchmark_name).generate_material_map
+                and self.parent.benchmark_config(benchmark_name).existing_material_map_path is None
+                for benchmark_name in benchmark_names
+            ):
+                tasks.append(PlannedTask(stage='material_map', benchmark_name=build_name, cores=self._stage_cores('material_map')))
+
+            for benchmark_name in benchmark_names:
+                for simulation_name in self.parent.simulation_names(benchmark_name):
+                    tasks.extend(self._planned_simulation_tasks(benchmark_name, simulation_name))
+        return tasks
+
+    def _planned_simulation_tasks(self, benchmark_name : str, simulation_name : str) -> List[PlannedTask]:
+
+        simulation_config = self.parent.simulation_config(benchmark_name, simulation_name)
+        adaptive_events = simulation_config.adaptive_events
+        if adaptive_events is None:
+            shards = [(simulation_name, simulation_config.num_events)]
+        else:
+            num_shards = adaptive_events.max_batches(simulation_config.num_events)
+            shards = [(f"{simulation_name}{SHARD_NAME_SEPARATOR}{index:04d}", adaptive_events.batch_events) for index in range(num_shards)]
+
+        tasks = []
+        for shard_name, num_events in shards:
+            for stage in ('simulation', 'reconstruction'):
+                tasks.append(PlannedTask(
+                    stage=stage, benchmark_name=benchmark_name, simulation_name=shard_name,
+                    num_events=num_events, cores=self._stage_cores(stage, simulation_config)
+                ))
+        tasks.append(PlannedTask(
+            stage='analysis', benchmark_name=benchmark_name, simulation_name=simulation_name,
+            num_events=sum(num_events for _, num_events in shards), cores=self._stage_cores('analysis')
+        ))
+        return tasks
+
+    #Estimates the core hours, output size and peak concurrency of every stage of the workflow,
+    #and recommends block settings for the providers of the workflow's executors
+    def plan(self, cost_model : Optional[CostModel] = None, default_cores_per_node : int = DEFAULT_CORES_PER_NODE) -> WorkflowPlan:
+
+        cost_model = cost_model or CostModel()
+        stage_plans : Dict[str, StagePlan] = {}
+        for task in self.planned_tasks():
+            stage_cost = cost_model.stage_cost(task.stage)
+            stage_plan = stage_plans.setdefault(task.stage, StagePlan(stage=task.stage))
+            core_seconds = stage_cost.core_seconds(task.num_events)
+            stage_plan.tasks += 1
+            stage_plan.events += task.num_events
+            stage_plan.core_hours += core_seconds / SECONDS_PER_HOUR
+            stage_plan.output_bytes += stage_cost.output_bytes(task.num_events)
+            stage_plan.max_task_hours = max(stage_plan.max_task_hours, core_seconds / task.cores / SECONDS_PER_HOUR)
+            #Every task of a stage depends only on tasks of earlier stages, so all of them can run at once
+            stage_plan.peak_concurrency += 1
+            stage_plan.peak_cores += task.cores
+
+        ordered_plans = {stage : stage_plans[stage] for stage in WORKFLOW_STAGE_NAMES if stage in stage_plans}
+        plan = WorkflowPlan(
+            workflow_name=self.parent.name,
+            stages=ordered_plans,
+            critical_path_hours=sum(stage_plan.max_task_hours for stage_plan in ordered_plans.values()),
+        )
+        plan.recommendations = self.recommend_providers(plan, default_cores_per_node=default_cores_per_node)
+        return plan
+
+    #Returns the number of cores of each node of an executor's provider, and whether that number is assumed
+    def _cores_per_node(self, executor : ParslExecutorConfigWithProvider, default_cores_per_node : int) -> Tuple[int, bool]:
+
+        provider_cores = getattr(executor.provider, 'cores_per_node', None)
+        if provider_cores is not None:
+            return int(provider_cores), False
+        max_workers = getattr(executor, 'max_workers_per_node', None)
+        worker_cores = executor.get_cores_per_worker()
+        if max_workers is not None and worker_cores is not None and math.isfinite(max_workers):
+            return max(1, int(max_workers * worker_cores)), False
+        return default_cores_per_node, True
+
+    def _routed_stages(self, executor : ParslExecutorConfig, stages : Sequence[str]) -> Dict[str, int]:
+
+        routed_stages = {}
+        for stage in stages:
+            labels = [stage_executor.label for stage_executor in self.parent.stage_executor_configs(stage)]
+            if executor.label in labels:
+                routed_stages[stage] = len(labels)
+        return routed_stages
+
+    #Recommends the nodes per block and maximum number of blocks of every executor's provider.
+    #Executors need no more nodes than the peak cores of their stages fill, and no fewer than the nodes that
+    #complete their stages' core hours within a single walltime of their provider
+    def recommend_providers(
+            self, plan : WorkflowPlan,
+            default_cores_per_node : int = DEFAULT_CORES_PER_NODE) -> List[ProviderRecommendation]:
+
+        if self.parent.parsl_config is None or self.parent.parsl_config.executors is None:
+            return []
+
+        recommendations = []
+        for executor in self.parent.parsl_config.executors:
+            if not isinstance(executor, ParslExecutorConfigWithProvider):
+                continue
+            routed_stages = self._routed_stages(executor, list(plan.stages.keys()))
+            if len(routed_stages) == 0:
+                continue
+
+            #Stages routed to several executors are assumed to be split evenly between them
+            core_hours = sum(plan.stages[stage].core_hours / num_executors for stage, num_executors in routed_stages.items())
+            peak_cores = max(math.ceil(plan.stages[stage].peak_cores / num_executors) for stage, num_executors in routed_stages.items())
+            cores_per_node, cores_per_node_assumed = self._cores_per_node(executor, default_cores_per_node)
+
+            peak_nodes = max(1, math.ceil(peak_cores / cores_per_node))
+            total_nodes = peak_nodes
+            walltime = getattr(executor.provider, 'walltime', None)
+            if walltime is not None:
+                walltime_hours = StageConfig(walltime=walltime).walltime / SECONDS_PER_HOUR
+                throughput_nodes = max(1, math.ceil(core_hours / (cores_per_node * walltime_hours)))
+                total_nodes = min(peak_nodes, throughput_nodes)
+
+            nodes_per_block = getattr(executor.provider, 'nodes_per_block', 1)
+            max_blocks = getattr(executor.provider, 'max_blocks', 1)
+            recommended_nodes_per_block = max(1, min(nodes_per_block, total_nodes))
+            recommended_max_blocks = math.ceil(total_nodes / recommended_nodes_per_block)
+            stage_hours = max(plan.stages[stage].max_task_hours for stage in routed_stages)
+            recommendations.append(ProviderRecommendation(
+                executor_label=executor.label,
+                provider_type=executor.provider.config_type_name,
+                stages=list(routed_stages.keys()),
+                cores_per_node=cores_per_node,
+                cores_per_node_assumed=cores_per_node_assumed,
+                core_hours=core_hours,
+                node_hours=core_hours / cores_per_node,
+                peak_cores=peak_cores,
+                nodes_per_block=nodes_per_block,
+                max_blocks=max_blocks,
+                recommended_nodes_per_block=recommended_nodes_per_block,
+                recommended_max_blocks=recommended_max_blocks,
+                estimated_wall_hours=max(core_hours / (recommended_nodes_per_block * recommended_max_blocks * cores_per_node), stage_hours),
+            ))
+        return recommendations
+
+    #Returns the measured tasks used for calibration: those of the profiler's last run,
+    #or those of the profile reports in the workflow directory
+    def measured_tasks(self) -> List[TaskProfile]:
+
+        tasks = self.parent.profiler.tasks if self.parent.profile else []
+        if len(tasks) == 0 and self.parent.paths.profile_dir_path.is_dir():
+            tasks = read_profile_tasks(self.parent.paths.profile_dir_path)
+        return tasks
+
+    #Returns the core seconds, events and output bytes of a measured task.
+    #Core seconds are the task's cpu time if monitoring recorded it, and otherwise its run time on all of its cores
+    def _task_measurement(self, task : TaskProfile) -> Optional[Tuple[float, int, Optional[int]]]:
+
+        if task.memoized or task.status not in (None, 'exec_done') or task.stage not in WORKFLOW_STAGE_NAMES:
+            return None
+        simulation_config = None
+        if task.benchmark_name is not None and task.simulation_name is not None:
+            simulation_config = self._simulation_config(task.benchmark_name, task.simulation_name)
+
+        if task.cpu_time is not None:
+            core_seconds = task.cpu_time
+        elif task.run_time is not None:
+            core_seconds = task.run_time * self._stage_cores(task.stage, simulation_config)
+        else:
+            return None
+
+        num_events = 0
+        if task.stage in EVENT_STAGES and simulation_config is not None:
+            num_events = simulation_config.num_events
+
+        output_bytes = None
+        if simulation_config is not None and task.stage in ('simulation', 'reconstruction'):
+            if task.stage == 'simulation':
+                output_path = self.parent.paths.simulation_out_file_path(task.benchmark_name, task.simulation_name)
+            else:
+                output_path = self.parent.paths.reconstruction_out_file_path(task.benchmark_name, task.simulation_name)
+            if os.path.isfile(output_path):
+                output_bytes = os.path.getsize(output_path)
+        return core_seconds, num_events, output_bytes
+
+    #Fits the cost of a stage to its measured tasks. Stages whose cost scales with events are fitted with a
+    #fixed and a per event cost if their tasks simulated different numbers of events, and otherwise scale both
+    #costs of the prior so that they match the measured mean
+    def _fit_stage_cost(self, prior : StageCost, measurements : Sequence[Tuple[float, int, Optional[int]]]) -> StageCost:
+
+        core_seconds = np.array([measurement[0] for measurement in measurements], dtype=float)
+        num_events = np.array([measurement[1] for measurement in measurements], dtype=float)
+        fitted = prior.model_copy(update={'num_samples': len(measurements)})
+
+        if num_events.sum() <= 0:
+            fitted.core_seconds_per_task = float(core_seconds.mean())
+        elif len(np.unique(num_events)) > 1:
+            per_event, per_task = np.polyfit(num_events, core_seconds, 1)
+            if per_event < 0:
+                per_event, per_task = 0.0, core_seconds.mean()
+            elif per_task < 0:
+                per_event, per_task = core_seconds.sum() / num_events.sum(), 0.0
+            fitted.core_seconds_per_task = float(per_task)
+            fitted.core_seconds_per_event = float(per_event)
+        else:
+            prior_core_seconds = prior.core_seconds(int(num_events[0]))
+            if prior_core_seconds > 0:
+                scale = core_seconds.mean() / prior_core_seconds
+                fitted.core_seconds_per_task = prior.core_seconds_per_task * scale
+                fitted.core_seconds_per_event = prior.core_seconds_per_event * scale
+            else:
+                fitted.core_seconds_per_event = float(core_seconds.sum() / num_events.sum())
+
+        measured_outputs = [(output_bytes, events) for _, events, output_bytes in measurements if output_bytes is not None]
+        measured_output_events = sum(events for _, events in measured_outputs)
+        if measured_output_events > 0:
+            fitted.output_bytes_per_task = 0.0
+            fitted.output_bytes_per_event = sum(output_bytes for output_bytes, _ in measured_outputs) / measured_output_events
+        return fitted
+
+    #Returns a copy of a cost model with the cost of every measured stage fitted to its measured tasks
+    def calibrate(self, cost_model : Optional[CostModel] = None, tasks : Optional[Sequence[TaskProfile]] = None) -> CostModel:
+
+        cost_model = cost_model or CostModel()
+        tasks = self.measured_tasks() if tasks is None else tasks
+
+        measurements_by_stage : Dict[str, List[Tuple[float, int, Optional[int]]]] = {}
+        for task in tasks:
+            measurement = self._task_measurement(task)
+            if measurement is not None:
+                measurements_by_stage.setdefault(task.stage, []).append(measurement)
+
+        stage_costs = {
+            stage : self._fit_stage_cost(cost_model.stage_cost(stage), measurements)
+            for stage, measurements in measurements_by_stage.items()
+        }
+        return cost_model.with_stage_costs(stage_costs)
@@ -0,0 +1,124 @@
+import json
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ePIC_benchmarks.workflow.config import WorkflowConfig
+from ePIC_benchmarks.workflow.profile import (
+    TaskProfile, benchmark_report, read_monitoring_database, write_benchmark_report
+)
+
+WORKFLOW_PROFILE_FILE_NAME = "workflow.json"
+
+def _timestamp(value : Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value is not None else None
+
+#Records the tasks submitted through stage apps and writes a critical path and utilization report per benchmark.
+#Submission, launch and return times are read from parsl's task records, while the running time, cpu time and
+#peak memory of each task are read from the parsl monitoring database if monitoring is enabled
+class WorkflowProfiler:
+
+    parent : WorkflowConfig
+
+    def __init__(self, parent):
+        assert(isinstance(parent, WorkflowConfig))
+        self.parent = parent
+        self._lock = threading.Lock()
+        self._records : List[Dict[str, Any]] = []
+        self._tasks : List[TaskProfile] = []
+        self._run_id : Optional[str] = None
+        self._logging_endpoint : Optional[str] = None
+
+    #Task profiles of the last collected run
+    @property
+    def tasks(self) -> List[TaskProfile]:
+
+        return list(self._tasks)
+
+    #Clears the records of a previous run and stores the run's monitoring database location
+    def start(self, dfk) -> None:
+
+        with self._lock:
+            self._records = []
+            self._tasks = []
+        self._run_id = dfk.run_id
+        monitoring = getattr(dfk, 'monitoring', None)
+        self._logging_endpoint = getattr(monitoring, 'logging_endpoint', None)
+
+    def record(
+            self, stage : str, function_name : str, future : Future,
+            benchmark_name : Optional[str], simulation_name : Optional[str] = None) -> None:
+
+        with self._lock:
+            self._records.append(dict(
+                stage=stage, function_name=function_name, future=future,
+                benchmark_name=benchmark_name, simulation_name=simulation_name
+            ))
+
+    #Reads the timestamps and dependencies of every recorded task from parsl's task records.
+    #Must be called before the data flow kernel is cleaned up
+    def collect(self) -> List[TaskProfile]:
+
+        with self._lock:
+            records = list(self._records)
+
+        tasks = []
+        for record in records:
+            future = record["future"]
+            task_record = getattr(future, 'task_record', None)
+            if task_record is None:
+                continue
+            status = task_record.get('status')
+            tasks.append(TaskProfile(
+                task_id=task_record['id'],
+                stage=record["stage"],
+                function_name=record["function_name"],
+                benchmark_name=record["benchmark_name"],
+                simulation_name=record["simulation_name"],
+                status=status.name if status is not None else None,
+                dependencies=[
+                    dependency.tid for dependency in task_record.get('depends') or []
+                    if getattr(dependency, 'tid', None) is not None
+                ],
+                time_submitted=_timestamp(task_record.get('time_invoked')),
+                time_launched=_timestamp(task_record.get('try_time_launched')),
+                time_returned=_timestamp(task_record.get('time_returned')),
+            ))
+        self._tasks = tasks
+        return tasks
+
+    #Adds the running times and resource usage recorded by parsl monitoring to the collected tasks.
+    #Monitoring data is only complete once the data flow kernel is cleaned up
+    def add_monitoring_data(self) -> None:
+
+        if self._run_id is None:
+            return
+        monitoring_values = read_monitoring_database(self._logging_endpoint, self._run_id)
+        for task in self._tasks:
+            for name, value in monitoring_values.get(task.task_id, {}).items():
+                setattr(task, name, value)
+
+    #Writes the json and html report of every benchmark, and a json summary of the workflow
+    def write_reports(self, output_dir_path : Optional[Path] = None) -> Path:
+
+        self.add_monitoring_data()
+        output_dir_path = output_dir_path or self.parent.paths.profile_dir_path
+        output_dir_path.mkdir(parents=True, exist_ok=True)
+
+        summary = {"workflow_name": self.parent.name, "run_id": self._run_id, "benchmarks": {}}
+        for benchmark_name in self.parent.benchmark_names():
+            report = benchmark_report(self._tasks, benchmark_name)
+            report_path = write_benchmark_report(report, output_dir_path)
+            summary["benchmarks"][benchmark_name] = {
+                "wall_time": report["wall_time"],
+                "critical_path_time": report["critical_path_time"],
+                "bottleneck_stage": report["bottleneck_stage"],
+                "report": report_path.name,
+            }
+
+        summary_path = output_dir_path.joinpath(WORKFLOW_PROFILE_FILE_NAME)
+        with open(summary_path, "w") as f:
+            json.dump(summary, f, indent=2, default=str)
+        return summary_path
@@ -1,5 +1,5 @@
 from .apps import (
-    clone_epic_app, checkout_epic_branch_app, compile_epic_app
+    clone_epic_app, checkout_epic_branch_app, compile_epic_app, restore_material_map_app
 )
 
-__all__ = ['clone_epic_app', 'checkout_epic_branch_app', 'compile_epic_app']
\ No newline at end of file
+__all__ = ['clone_epic_app', 'checkout_epic_branch_app', 'compile_epic_app', 'restore_material_map_app']
\ No newline at end of file
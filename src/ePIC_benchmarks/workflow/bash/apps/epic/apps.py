@@ -1,5 +1,5 @@
 from ePIC_benchmarks.workflow.bash import bash_app
-from ePIC_benchmarks.workflow.bash.methods.epic import clone_epic, checkout_epic_branch, compile_epic, generate_material_map
+from ePIC_benchmarks.workflow.bash.methods.epic import clone_epic, checkout_epic_branch, compile_epic, generate_material_map, restore_material_map
 
 clone_epic_app = bash_app(clone_epic)
 
@@ -7,4 +7,6 @@ checkout_epic_branch_app = bash_app(checkout_epic_branch)
 
 compile_epic_app = bash_app(compile_epic)
 
-generate_material_map = bash_app(generate_material_map)
\ No newline at end of file
+generate_material_map = bash_app(generate_material_map)
+
+restore_material_map_app = bash_app(restore_material_map)
\ No newline at end of file
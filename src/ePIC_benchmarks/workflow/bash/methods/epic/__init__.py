@@ -1,3 +1,3 @@
-from .methods import clone_epic, checkout_epic_branch, compile_epic, generate_material_map
+from .methods import clone_epic, checkout_epic_branch, compile_epic, generate_material_map, restore_material_map
 
-__all__ = ['clone_epic', 'checkout_epic_branch', 'compile_epic', 'generate_material_map']
\ No newline at end of file
+__all__ = ['clone_epic', 'checkout_epic_branch', 'compile_epic', 'generate_material_map', 'restore_material_map']
\ No newline at end of file
@@ -1,21 +1,24 @@
 from parsl import AUTO_LOGNAME
-from ePIC_benchmarks.workflow.config import WorkflowConfig
+from ePIC_benchmarks.workflow.context import WorkflowContext, resolve_task_context
 from ePIC_benchmarks.container.containers import ContainerUnion
 from ePIC_benchmarks.workflow.bash.utils import concatenate_commands, source_epic_command
+from pathlib import Path
 from typing import Optional
+from ePIC_benchmarks._file.types import PathType
 
 EPIC_REPO_URL = "https://github.com/eic/epic.git"
 DEFAULT_MAT_MAP_NEVENTS = 1000
 
 #Returns the string format for the command that clones the ePIC repository
 def clone_epic(
-    workflow_config : WorkflowConfig,
+    workflow_config : WorkflowContext,
     benchmark_name : str,
     container : Optional[ContainerUnion] = None,
     stdout=AUTO_LOGNAME, stderr=AUTO_LOGNAME,
     **kwargs) -> str:
 
-    epic_directory_path = workflow_config.paths.epic_repo_path(benchmark_name)
+    context = resolve_task_context(workflow_config, benchmark_name)
+    epic_directory_path = context.epic_repo_path
     clone_command = f'git clone {EPIC_REPO_URL} "{epic_directory_path}"'
     if container is not None:
         clone_command = container.init_with_extra_commands(clone_command)
@@ -23,14 +26,15 @@ def clone_epic(
 
 #Returns the string format for the command that changes the ePIC repository branch
 def checkout_epic_branch(
-    workflow_config : WorkflowConfig,
+    workflow_config : WorkflowContext,
     benchmark_name : str,
     container : Optional[ContainerUnion] = None,
     stdout=AUTO_LOGNAME, stderr=AUTO_LOGNAME,
     **kwargs) -> str:
 
-    epic_directory_path = workflow_config.paths.epic_repo_path(benchmark_name)
-    branch = workflow_config.executor.epic_branch(benchmark_name)
+    context = resolve_task_context(workflow_config, benchmark_name)
+    epic_directory_path = context.epic_repo_path
+    branch = context.epic_branch
     checkout_command = f'git -C "{epic_directory_path}" checkout "{branch}"'
     if container is not None:
         checkout_command = container.init_with_extra_commands(checkout_command)
@@ -38,14 +42,18 @@ def checkout_epic_branch(
 
 #Returns the string format for the command that compiles and builds the ePIC repository
 def compile_epic(
-        workflow_config : WorkflowConfig,
+        workflow_config : WorkflowContext,
         benchmark_name : str,
-        num_threads : int = 1,
+        num_threads : Optional[int] = None,
         container : Optional[ContainerUnion] = None,
         stdout=AUTO_LOGNAME, stderr=AUTO_LOGNAME,
         **kwargs) -> str:
 
-    epic_directory_path = workflow_config.paths.epic_repo_path(benchmark_name)
+    #Build with the number of cores requested by the build stage if the number of threads isn't provided
+    context = resolve_task_context(workflow_config, benchmark_name)
+    if num_threads is None:
+        num_threads = context.build_num_threads
+    epic_directory_path = context.epic_repo_path
     change_directory_cmd = f'cd {epic_directory_path}'
     compile_pt_one_cmd = 'cmake -B build -S . -DCMAKE_INSTALL_PREFIX=install'
     compile_pt_two_cmd = f'cmake --build build -- install -j {num_threads}'
@@ -56,39 +64,53 @@ def compile_epic(
 
 #Returns the string format for the command that generates the material map for the ePIC repository
 def generate_material_map(
-        workflow_config : WorkflowConfig,
+        workflow_config : WorkflowContext,
         benchmark_name : str,
         n_events=DEFAULT_MAT_MAP_NEVENTS,
         keep_root_files : bool = False, 
+        cached_material_map_path : Optional[PathType] = None,
         container : Optional[ContainerUnion] = None,
         stdout=AUTO_LOGNAME, stderr=AUTO_LOGNAME,
         **kwargs) -> str:
     
-    benchmark_config = workflow_config.benchmark_config(benchmark_name)
-    if not benchmark_config.generate_material_map:
-        echo_cmd =  f"echo 'No simulation for benchmark {benchmark_config.name} uses a material map. I will do nothing.'"
+    context = resolve_task_context(workflow_config, benchmark_name)
+    if not context.generate_material_map:
+        echo_cmd =  f"echo 'No simulation for benchmark {benchmark_name} uses a material map. I will do nothing.'"
         return echo_cmd
     
-    if benchmark_config.existing_material_map_path is not None:
-        echo_cmd =  f"echo 'Material map for benchmark {benchmark_config.name} already exists. I will not generate a new material map.'"
+    if context.existing_material_map_path is not None:
+        echo_cmd =  f"echo 'Material map for benchmark {benchmark_name} already exists. I will not generate a new material map.'"
         return echo_cmd
 
-    source_command = source_epic_command(workflow_config, benchmark_name)
-    material_map_dir = workflow_config.paths.material_map_dir_path(benchmark_name)
+    source_command = source_epic_command(context, benchmark_name)
+    material_map_dir = context.material_map_dir_path
     change_directory_cmd = f'cd {material_map_dir}'
-    material_map_script_path = str(workflow_config.paths.material_map_script_path(benchmark_name))
+    material_map_script_path = str(context.material_map_script_path)
 
     if not material_map_script_path.startswith("/"):
         material_map_script_path = f'./{material_map_script_path}'
 
     material_map_script_path = f'{material_map_script_path} --nevents={n_events}'
     run_mat_map_script_cmd = material_map_script_path
-    
+
+    #Removes the material map of a previous run, so that a failed script can't leave a stale material map behind
+    remove_mat_map_cmd = f'rm -f "{context.material_map_path}"'
+
+    #Stores the new material map in the material map cache only if the script succeeds.
+    #It is renamed into place so that readers never see a partial copy
+    if cached_material_map_path is not None:
+        cached_material_map_path = Path(cached_material_map_path)
+        tmp_cached_path = cached_material_map_path.with_name(f".{cached_material_map_path.name}.{benchmark_name}.tmp")
+        mkdir_cmd = f'mkdir -p "{cached_material_map_path.parent}"'
+        copy_cmd = f'cp -f "{context.material_map_path}" "{tmp_cached_path}"'
+        rename_cmd = f'mv -f "{tmp_cached_path}" "{cached_material_map_path}"'
+        run_mat_map_script_cmd = ' && '.join((run_mat_map_script_cmd, mkdir_cmd, copy_cmd, rename_cmd))
+
     if not keep_root_files:
         delete_mat_map_root_outputs = 'rm *.root'
-        all_commands = concatenate_commands(source_command, change_directory_cmd, run_mat_map_script_cmd, delete_mat_map_root_outputs)
+        all_commands = concatenate_commands(source_command, change_directory_cmd, remove_mat_map_cmd, run_mat_map_script_cmd, delete_mat_map_root_outputs)
     else:
-        all_commands = concatenate_commands(source_command, change_directory_cmd, run_mat_map_script_cmd)
+        all_commands = concatenate_commands(source_command, change_directory_cmd, remove_mat_map_cmd, run_mat_map_script_cmd)
 
     if container is not None:
         all_commands = container.init_with_extra_commands(all_commands)
@@ -100,3 +122,22 @@ def generate_material_map(
 
 
     
+
+#Returns the string format for the command that restores a benchmark's material map from the material map cache
+def restore_material_map(
+        workflow_config : WorkflowContext,
+        benchmark_name : str,
+        cached_material_map_path : PathType,
+        container : Optional[ContainerUnion] = None,
+        stdout=AUTO_LOGNAME, stderr=AUTO_LOGNAME,
+        **kwargs) -> str:
+
+    context = resolve_task_context(workflow_config, benchmark_name)
+    material_map_path = context.material_map_path
+    mkdir_cmd = f'mkdir -p "{material_map_path.parent}"'
+    #Cached material maps are never rewritten, so they are hard linked where possible
+    link_cmd = f'ln -f "{cached_material_map_path}" "{material_map_path}" || cp -f "{cached_material_map_path}" "{material_map_path}"'
+    all_commands = concatenate_commands(mkdir_cmd, link_cmd)
+    if container is not None:
+        all_commands = container.init_with_extra_commands(all_commands)
+    return all_commands
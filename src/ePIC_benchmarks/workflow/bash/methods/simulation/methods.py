@@ -1,11 +1,14 @@
 from parsl import AUTO_LOGNAME
-from ePIC_benchmarks.workflow.config import WorkflowConfig
+from ePIC_benchmarks.workflow.context import WorkflowContext, resolve_task_context
 from ePIC_benchmarks.container.containers import ContainerUnion
 from typing import Optional, Union, Sequence
-from ePIC_benchmarks.workflow.bash.utils import concatenate_commands, source_epic_command, change_directory_command
+from ePIC_benchmarks.workflow.bash.utils import (
+    concatenate_commands, source_epic_command, change_directory_command,
+    remove_output_stamp_command, write_output_stamp_command
+)
 
 def run_npsim(
-        workflow_config : WorkflowConfig,
+        workflow_config : WorkflowContext,
         benchmark_name : str,
         simulation_name : str,
         container : Optional[ContainerUnion] = None,
@@ -13,25 +16,37 @@ def run_npsim(
         stdout=AUTO_LOGNAME, stderr=AUTO_LOGNAME,
         **kwargs) -> str:
 
-    source_command = source_epic_command(workflow_config, benchmark_name)
-    temp_dir = workflow_config.paths.simulation_instance_temp_dir_path(benchmark_name, simulation_name)
-    change_temp_dir_cmd = change_directory_command(temp_dir)
-    npsim_command = workflow_config.executor.npsim_command_string(
-        benchmark_name=benchmark_name,
-        simulation_name=simulation_name, 
-    )
+    context = resolve_task_context(workflow_config, benchmark_name, simulation_name)
+    npsim_command = context.npsim_command
 
     if isinstance(extra_args, list):
         npsim_command = npsim_command + " " + " ".join(extra_args)
     elif isinstance(extra_args, str):
         npsim_command = npsim_command + " " + extra_args
-    all_commands = concatenate_commands(change_temp_dir_cmd, source_command, npsim_command)
+
+    #Restarts only rerun npsim for simulations whose output is missing, incomplete, outdated,
+    #or was written by a different command or geometry
+    if context.simulation_output_complete(npsim_command):
+        echo_cmd = f"echo 'Simulation output for simulation {simulation_name} of benchmark {benchmark_name} is complete. I will not rerun npsim.'"
+        return echo_cmd
+
+    source_command = source_epic_command(context, benchmark_name)
+    temp_dir = context.simulation_instance_temp_dir_path
+    change_temp_dir_cmd = change_directory_command(temp_dir)
+
+    #The output is stamped only once npsim succeeds
+    out_file_path = context.simulation_out_file_path
+    remove_stamp_cmd = remove_output_stamp_command(out_file_path)
+    write_stamp_cmd = write_output_stamp_command(out_file_path, context.simulation_output_stamp(npsim_command))
+    all_commands = concatenate_commands(
+        remove_stamp_cmd, change_temp_dir_cmd, source_command, f'{npsim_command} && {write_stamp_cmd}'
+    )
     if container is not None:
         all_commands = container.init_with_extra_commands(all_commands)
     return all_commands
 
 def run_eicrecon(
-        workflow_config : WorkflowConfig,
+        workflow_config : WorkflowContext,
         benchmark_name : str,
         simulation_name : str,
         use_material_map : bool = False,
@@ -40,8 +55,10 @@ def run_eicrecon(
         stdout=AUTO_LOGNAME, stderr=AUTO_LOGNAME,
         **kwargs) -> str:
     
+    #The eicrecon command of the task context already uses the benchmark's material map
+    context = resolve_task_context(workflow_config, benchmark_name, simulation_name)
     if use_material_map:
-        material_map_path = workflow_config.paths.material_map_path(benchmark_name)
+        material_map_path = context.material_map_path
         if not material_map_path.exists():
             err = (
                 "Material map path could not be found.\n"
@@ -49,23 +66,31 @@ def run_eicrecon(
                 f"provide an existing material map to the Benchmark Config named '{benchmark_name}'"
             )
             raise RuntimeError(err)
-        #Set the simulation config's material_map_path
-        workflow_config.simulation_config(benchmark_name, simulation_name).material_map_path = material_map_path
 
-    source_command = source_epic_command(workflow_config, benchmark_name)
-    temp_dir = workflow_config.paths.reconstruction_instance_temp_dir_path(benchmark_name, simulation_name)
-    change_temp_dir_cmd = change_directory_command(temp_dir)
-    eicrecon_command = workflow_config.executor.eicrecon_command_string(
-        benchmark_name=benchmark_name,
-        simulation_name=simulation_name, 
-    )
-    all_commands = concatenate_commands(change_temp_dir_cmd, source_command, eicrecon_command)
+    eicrecon_command = context.eicrecon_command
 
     if isinstance(extra_args, list):
         eicrecon_command = eicrecon_command + " " + " ".join(extra_args)
     elif isinstance(extra_args, str):
         eicrecon_command = eicrecon_command + " " + extra_args
-    all_commands = concatenate_commands(change_temp_dir_cmd, source_command, eicrecon_command)
+
+    #Restarts only rerun eicrecon for simulations whose reconstruction is missing, incomplete, outdated,
+    #or was written by a different command or geometry
+    if context.reconstruction_output_complete(eicrecon_command):
+        echo_cmd = f"echo 'Reconstruction output for simulation {simulation_name} of benchmark {benchmark_name} is complete. I will not rerun eicrecon.'"
+        return echo_cmd
+
+    source_command = source_epic_command(context, benchmark_name)
+    temp_dir = context.reconstruction_instance_temp_dir_path
+    change_temp_dir_cmd = change_directory_command(temp_dir)
+
+    #The output is stamped only once eicrecon succeeds
+    out_file_path = context.reconstruction_out_file_path
+    remove_stamp_cmd = remove_output_stamp_command(out_file_path)
+    write_stamp_cmd = write_output_stamp_command(out_file_path, context.reconstruction_output_stamp(eicrecon_command))
+    all_commands = concatenate_commands(
+        remove_stamp_cmd, change_temp_dir_cmd, source_command, f'{eicrecon_command} && {write_stamp_cmd}'
+    )
     if container is not None:
         all_commands = container.init_with_extra_commands(all_commands)
     return all_commands
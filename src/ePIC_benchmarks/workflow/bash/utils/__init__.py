@@ -1,7 +1,9 @@
 from .utils import (
-    concatenate_commands, source_epic_command, change_directory_command
+    concatenate_commands, source_epic_command, change_directory_command,
+    remove_output_stamp_command, write_output_stamp_command
 )
 
 __all__ = [
-    'concatenate_commands', 'source_epic_command', 'change_directory_command'
+    'concatenate_commands', 'source_epic_command', 'change_directory_command',
+    'remove_output_stamp_command', 'write_output_stamp_command'
 ]
\ No newline at end of file
@@ -1,6 +1,7 @@
 from typing import Sequence 
+from ePIC_benchmarks._file.root import output_stamp_path
 from ePIC_benchmarks._file.types import PathType
-from ePIC_benchmarks.workflow.config import WorkflowConfig
+from ePIC_benchmarks.workflow.context import TaskContext, WorkflowContext
 
 #Concatenates multiple bash commands
 def concatenate_commands(*commands : Sequence[str]):
@@ -8,8 +9,11 @@ def concatenate_commands(*commands : Sequence[str]):
     return ';'.join(commands)
 
 #Returns the command that sources the ePIC repository for the current process
-def source_epic_command(workflow_config : WorkflowConfig, benchmark_name : str) -> str:
-    epic_directory_path = workflow_config.paths.epic_repo_path(benchmark_name)
+def source_epic_command(workflow_config : WorkflowContext, benchmark_name : str) -> str:
+    if isinstance(workflow_config, TaskContext):
+        epic_directory_path = workflow_config.epic_repo_path
+    else:
+        epic_directory_path = workflow_config.paths.epic_repo_path(benchmark_name)
     install_script_path = epic_directory_path.joinpath('install', 'bin', 'thisepic.sh')
     source_command = f'source {install_script_path}'
     return source_command
@@ -18,3 +22,14 @@ def source_epic_command(workflow_config : WorkflowConfig, benchmark_name : str)
 def change_directory_command(path : PathType):
 
     return f'cd {path}'
+
+
+#Returns the command that deletes the stamp file of an output file
+def remove_output_stamp_command(file_path : PathType) -> str:
+
+    return f'rm -f "{output_stamp_path(file_path)}"'
+
+#Returns the command that writes a stamp into the stamp file of an output file
+def write_output_stamp_command(file_path : PathType, stamp : str) -> str:
+
+    return f'echo {stamp} > "{output_stamp_path(file_path)}"'
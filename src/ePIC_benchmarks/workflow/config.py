@@ -2,24 +2,34 @@ from __future__ import annotations
 from functools import cached_property
 import os
 from pathlib import Path
-from typing import Optional, List, Any, Self, Callable
+from typing import Optional, List, Any, Self, Callable, Dict, FrozenSet, Union, Literal, Sequence, Tuple
 
 from parsl import Config
-from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator, ConfigDict, AliasChoices
+from pydantic import (
+    BaseModel, Field, PrivateAttr, ModelWrapValidatorHandler, ValidationError, field_serializer,
+    field_validator, model_validator, ConfigDict, AliasChoices
+)
 from pydantic_core.core_schema import ValidationInfo
 
 from ePIC_benchmarks.parsl.config import ParslConfig
 from ePIC_benchmarks.benchmark.config import BenchmarkConfig
+from ePIC_benchmarks.benchmark.sweep import BenchmarkSweep
 from ePIC_benchmarks.simulation.config import SimulationConfig
 from ePIC_benchmarks.detector.config import DetectorConfig
 from ePIC_benchmarks.parsl.executors import HighThroughputExecutorConfig, MPIExecutorConfig, WorkQueueExecutorConfig
+from ePIC_benchmarks.parsl.executors.executors import ParslExecutorConfig
+from ePIC_benchmarks.workflow.stage import StageConfig, WorkflowStageName, SIMULATION_THREAD_STAGES
+from ePIC_benchmarks.container.containers import DockerConfig, ShifterConfig
 from ePIC_benchmarks.workflow.future import WorkflowFuture
-from ePIC_benchmarks._file.types import PathType
+from ePIC_benchmarks._file.types import PathType, TreeCopyMode
 from ePIC_benchmarks._file.utils import save_raw_config, load_from_file
 from ePIC_benchmarks.utils.equality import any_identical_objects
+from ePIC_benchmarks.utils.lookup import build_name_index, indexed_lookup
 from ePIC_benchmarks._file.supported import DEFAULT_CONFIG_FILE_EXT
 
 RUN_INFO_DIR_NAME = "runinfo"
+TRASH_DIR_NAME = ".trash"
+PROFILE_DIR_NAME = "profile"
 
 class WorkflowConfig(BaseModel):
 
@@ -45,11 +55,19 @@ class WorkflowConfig(BaseModel):
         description="Path to the current working directory"
     )
     benchmarks : List[BenchmarkConfig] = Field(default_factory=list)
+    benchmark_sweeps : List[BenchmarkSweep] = Field(
+        default_factory=list,
+        description="List of BenchmarkSweep objects which are expanded into benchmark configs"
+    )
     redo_all_benchmarks : bool = Field(default=False)
     redo_epic_building : bool = Field(default=False)
     redo_simulations : bool = Field(default=False)
     redo_reconstructions : bool = Field(default=False)
     redo_analysis : bool = Field(default=False)
+    skip_complete_outputs : bool = Field(
+        default=True,
+        description="Skips npsim and eicrecon executions whose output ROOT files are complete and newer than their inputs"
+    )
     parsl_config : Optional[ParslConfig] = Field(default=None)
     script_path : Optional[PathType] = Field(default=None, deprecated=True)
     workflow_script : Optional[Callable[[Self], WorkflowFuture]] = Field(default=None, exclude=True)
@@ -57,6 +75,52 @@ class WorkflowConfig(BaseModel):
     keep_simulation_outputs : bool = Field(default=True)
     keep_reconstruction_outputs : bool = Field(default=True)
     keep_analysis_outputs : bool = Field(default=True)
+    epic_copy_mode : TreeCopyMode = Field(
+        default='reflink',
+        description="How existing ePIC directories are copied into benchmark directories"
+    )
+    background_cleanup : bool = Field(
+        default=True,
+        description="Deletes the directories that aren't kept in the background after a workflow completes"
+    )
+    max_init_threads : Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Maximum number of threads that initialize benchmark directories"
+    )
+    stages : Dict[WorkflowStageName, StageConfig] = Field(
+        default_factory=dict,
+        description="Executor routing and resource requirements for each workflow stage"
+    )
+    container : Optional[Union[DockerConfig, ShifterConfig]] = Field(
+        default=None,
+        discriminator='container_type',
+        description="Container that the bash apps of the built-in workflow DAG are run inside"
+    )
+    profile : bool = Field(
+        default=False,
+        description="Writes a critical path and utilization report of every benchmark after the workflow completes"
+    )
+    material_map_cache_directory : Optional[str] = Field(
+        default=None,
+        description=(
+            "Directory of a material map cache shared across benchmarks and workflows."
+            " Material maps are stored under the hash of the built geometry, and reused instead of being regenerated"
+        )
+    )
+    share_epic_builds : bool = Field(
+        default=False,
+        description=(
+            "Toggles whether benchmarks with identical ePIC branches and detector configs"
+            " share a single ePIC repository and build"
+        )
+    )
+    #Index of benchmark configs by name
+    _benchmark_index : Dict[str, BenchmarkConfig] = PrivateAttr(default_factory=dict)
+    #Index of the name of the benchmark that owns each shared ePIC build, by build key
+    _build_owner_index : Dict[Tuple[str, ...], str] = PrivateAttr(default_factory=dict)
+    #Names of the benchmark configs that were generated by sweeps, which are serialized as their sweeps
+    _swept_benchmark_names : FrozenSet[str] = PrivateAttr(default_factory=frozenset)
 
     @cached_property
     def paths(self):
@@ -68,8 +132,36 @@ class WorkflowConfig(BaseModel):
         from ._inner.executor import WorkflowExecutor
         return WorkflowExecutor(parent=self)
 
+    @cached_property
+    def dag(self):
+        from ._inner.dag import WorkflowDag
+        return WorkflowDag(parent=self)
+
+    @cached_property
+    def memo(self):
+        from ._inner.memo import WorkflowMemo
+        return WorkflowMemo(parent=self)
+
+    @cached_property
+    def profiler(self):
+        from ._inner.profiler import WorkflowProfiler
+        return WorkflowProfiler(parent=self)
+
+    @cached_property
+    def planner(self):
+        from ._inner.planner import WorkflowPlanner
+        return WorkflowPlanner(parent=self)
+
+    @cached_property
+    def material_maps(self):
+        from ._inner.material_maps import WorkflowMaterialMaps
+        return WorkflowMaterialMaps(parent=self)
+
     def add_benchmark(self, benchmark_config : BenchmarkConfig) -> None:
         self.benchmarks.append(benchmark_config)
+        self._benchmark_index.setdefault(benchmark_config.name, benchmark_config)
+        if len(self._build_owner_index) > 0:
+            self._build_owner_index.setdefault(benchmark_config.build_key(), benchmark_config.name)
 
     @classmethod
     def load_from_file(cls, filepath) -> WorkflowConfig:
@@ -108,13 +200,34 @@ class WorkflowConfig(BaseModel):
 
     def benchmark_config(self, benchmark_name : str) -> BenchmarkConfig:
 
-        for benchmark in self.benchmarks:
-            if benchmark.name == benchmark_name:
-                return benchmark
+        benchmark = indexed_lookup(self._benchmark_index, self.benchmarks, benchmark_name)
+        if benchmark is not None:
+            return benchmark
 
         err = f"Benchmark config with name '{benchmark_name}' could be found"
         raise ValueError(err)
 
+    #Returns the name of the benchmark whose ePIC repository and build is used by the given benchmark
+    #NOTE: This is always the given benchmark unless ePIC builds are shared
+    def build_benchmark_name(self, benchmark_name : str) -> str:
+
+        benchmark_config = self.benchmark_config(benchmark_name)
+        if not self.share_epic_builds:
+            return benchmark_config.name
+        build_key = benchmark_config.build_key()
+        owner_name = self._build_owner_index.get(build_key)
+        if owner_name is not None:
+            owner_config = indexed_lookup(self._benchmark_index, self.benchmarks, owner_name)
+            if owner_config is not None and owner_config.build_key() == build_key:
+                return owner_name
+
+        #The index is rebuilt if benchmarks or their detector configs were changed since it was built
+        build_owner_index = {}
+        for benchmark in self.benchmarks:
+            build_owner_index.setdefault(benchmark.build_key(), benchmark.name)
+        self._build_owner_index = build_owner_index
+        return build_owner_index.get(build_key, benchmark_config.name)
+
     def simulation_names(self, benchmark_name : str):
         benchmark_config = self.benchmark_config(benchmark_name)
         return benchmark_config.simulation_names()
@@ -129,7 +242,103 @@ class WorkflowConfig(BaseModel):
         executor_names = [executor.label for executor in self.parsl_config.executors]
         return executor_names
 
+    #Returns the stage configuration for a workflow stage, or a default stage configuration if none was provided
+    def stage_config(self, stage : WorkflowStageName) -> StageConfig:
+
+        return self.stages.get(stage, StageConfig())
+
+    #Returns the executor labels that a stage's tasks are routed to
+    def stage_executors(self, stage : WorkflowStageName) -> Union[List[str], Literal['all']]:
+
+        stage_config = self.stage_config(stage)
+        if stage_config.executors is None:
+            return 'all'
+        return list(stage_config.executors)
+
+    #Returns the configurations of the executors that a stage's tasks can run on
+    def stage_executor_configs(self, stage : WorkflowStageName) -> Sequence[ParslExecutorConfig]:
+
+        if self.parsl_config is None or self.parsl_config.executors is None:
+            return []
+        stage_executors = self.stage_executors(stage)
+        if stage_executors == 'all':
+            return list(self.parsl_config.executors)
+        return [self.parsl_config.executor_by_label(label) for label in stage_executors]
+
+    #Returns the keyword arguments passed to the parsl app invocations of a stage.
+    #The npsim and eicrecon tasks of a simulation request its number of threads as their cores
+    def stage_app_kwargs(
+            self, stage : WorkflowStageName,
+            benchmark_name : Optional[str] = None, simulation_name : Optional[str] = None) -> Dict[str, Any]:
+
+        stage_config = self.stage_config(stage)
+        app_kwargs = {}
+        if stage_config.walltime is not None:
+            app_kwargs['walltime'] = stage_config.walltime
+
+        #Only WorkQueue executors accept per task core, memory and disk requirements
+        resource_spec = stage_config.resource_specification()
+        if stage in SIMULATION_THREAD_STAGES and benchmark_name is not None and simulation_name is not None:
+            simulation_config = self.simulation_config(benchmark_name, simulation_name)
+            resource_spec['cores'] = getattr(simulation_config, SIMULATION_THREAD_STAGES[stage])
+        executor_configs = self.stage_executor_configs(stage)
+        if len(resource_spec) > 0 and len(executor_configs) > 0 and all(
+            isinstance(executor, WorkQueueExecutorConfig) for executor in executor_configs
+        ):
+            app_kwargs['parsl_resource_specification'] = resource_spec
+        return app_kwargs
+
         
+    #Expands benchmark sweeps into benchmark configs.
+    #Benchmark configs that are listed explicitly take precedence over sweep benchmarks of the same name
+    @model_validator(mode='wrap')
+    @classmethod
+    def expand_benchmark_sweeps(cls, data : Any, handler : ModelWrapValidatorHandler[Self]) -> Self:
+
+        #Revalidated instances keep the benchmarks that their sweeps generated
+        if isinstance(data, cls):
+            workflow_config = handler(data)
+            workflow_config._swept_benchmark_names = data._swept_benchmark_names
+            return workflow_config
+        if not isinstance(data, dict) or not data.get("benchmark_sweeps"):
+            return handler(data)
+
+        benchmark_sweeps = [
+            BenchmarkSweep.model_validate(benchmark_sweep) for benchmark_sweep in data["benchmark_sweeps"]
+        ]
+        benchmarks = list(data.get("benchmarks", []))
+        benchmark_names = set()
+        for benchmark in benchmarks:
+            if isinstance(benchmark, BenchmarkConfig):
+                benchmark_names.add(benchmark.name)
+            elif isinstance(benchmark, dict):
+                benchmark_names.add(benchmark.get("name"))
+
+        swept_names = set()
+        for benchmark_sweep in benchmark_sweeps:
+            for point in benchmark_sweep.points():
+                if benchmark_sweep.point_name(point) in benchmark_names:
+                    continue
+                benchmark = benchmark_sweep.benchmark_config(point)
+                benchmark_names.add(benchmark.name)
+                swept_names.add(benchmark.name)
+                benchmarks.append(benchmark)
+
+        workflow_config = handler({**data, "benchmarks": benchmarks, "benchmark_sweeps": benchmark_sweeps})
+        workflow_config._swept_benchmark_names = frozenset(swept_names)
+        return workflow_config
+
+    #Benchmarks generated by sweeps are serialized as their sweeps, and listed benchmarks that override a sweep point are kept
+    @field_serializer('benchmarks')
+    def serialize_benchmarks(self, benchmarks : List[BenchmarkConfig]) -> List[Dict[str, Any]]:
+
+        return [benchmark.model_dump() for benchmark in benchmarks if benchmark.name not in self._swept_benchmark_names]
+
+    @field_serializer('benchmark_sweeps')
+    def serialize_benchmark_sweeps(self, benchmark_sweeps : List[BenchmarkSweep]) -> List[Dict[str, Any]]:
+
+        return [benchmark_sweep.model_dump(exclude_defaults=True) for benchmark_sweep in benchmark_sweeps]
+
     @field_validator('parsl_config', mode='before')
     def validate_parsl_config(cls, value : Any, info : ValidationInfo) -> ParslConfig:
         if value is None:
@@ -210,9 +419,75 @@ class WorkflowConfig(BaseModel):
                 raise ValidationError(err)
         return str(script_path)
     
+    @model_validator(mode='after')
+    def index_benchmarks(self) -> Self:
+
+        self._benchmark_index = build_name_index(self.benchmarks)
+        self._build_owner_index = {}
+        return self
+
     @model_validator(mode='after')
     def validate_unique_benchmarks(self) -> Self:
 
         if any_identical_objects(self.benchmarks):
             raise AttributeError("All benchmarks must be unique")
         return self
+
+    #Ensures every stage is routed to executors that exist and that can fit the stage's tasks
+    @model_validator(mode='after')
+    def validate_stage_executors(self) -> Self:
+
+        if self.parsl_config is None or self.parsl_config.executors is None:
+            return self
+
+        executor_names = self.parsl_executor_names()
+        for stage, stage_config in self.stages.items():
+            for label in stage_config.executors or []:
+                if label not in executor_names:
+                    err = (
+                        f"Stage '{stage}' is routed to executor '{label}' which is not defined in the parsl config.\n"
+                        f"Valid executors are {', '.join(executor_names)}."
+                    )
+                    raise ValueError(err)
+
+            for executor in self.stage_executor_configs(stage):
+                worker_cores = executor.get_cores_per_worker()
+                if stage_config.cores is not None and worker_cores is not None and stage_config.cores > worker_cores:
+                    err = (
+                        f"Stage '{stage}' requires {stage_config.cores} cores per task,"
+                        f" but executor '{executor.label}' gives each worker {worker_cores} cores."
+                    )
+                    raise ValueError(err)
+                worker_memory = executor.get_memory_per_worker()
+                if stage_config.memory is not None and worker_memory is not None and stage_config.memory > worker_memory:
+                    err = (
+                        f"Stage '{stage}' requires {stage_config.memory} GB of memory per task,"
+                        f" but executor '{executor.label}' gives each worker {worker_memory} GB."
+                    )
+                    raise ValueError(err)
+        return self
+
+    #Ensures npsim / eicrecon thread counts fit within the cores given to the workers of their stage's executors
+    @model_validator(mode='after')
+    def validate_simulation_threads(self) -> Self:
+
+        if self.parsl_config is None or self.parsl_config.executors is None:
+            return self
+
+        for stage, threads_field in SIMULATION_THREAD_STAGES.items():
+            worker_cores = [executor.get_cores_per_worker() for executor in self.stage_executor_configs(stage)]
+            if len(worker_cores) == 0 or any(cores is None for cores in worker_cores):
+                continue
+            max_worker_cores = max(worker_cores)
+
+            for benchmark in self.benchmarks:
+                for simulation in benchmark.simulation_configs:
+                    num_threads = getattr(simulation, threads_field)
+                    if num_threads > max_worker_cores:
+                        err = (
+                            f"Simulation '{simulation.name}' of benchmark '{benchmark.name}' uses {num_threads}"
+                            f" threads for its '{stage}' stage, but parsl workers are given at most {max_worker_cores} cores."
+                            " Increase 'cores_per_worker' or lower the simulation's thread counts."
+                        )
+                        raise ValueError(err)
+        return self
@@ -0,0 +1,3 @@
+from .context import TaskContext, WorkflowContext, resolve_task_context, accepts_task_context
+
+__all__ = ['TaskContext', 'WorkflowContext', 'resolve_task_context', 'accepts_task_context']
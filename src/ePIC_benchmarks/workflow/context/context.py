@@ -0,0 +1,114 @@
+import inspect
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Tuple, Union, get_args
+
+from ePIC_benchmarks._file.root import output_stamp, root_output_complete
+from ePIC_benchmarks.detector.config import DetectorConfig
+from ePIC_benchmarks.detector.geometry import geometry_hash
+from ePIC_benchmarks.simulation.config import SimulationConfig
+from ePIC_benchmarks.workflow.config import WorkflowConfig
+
+#Resolved paths and command strings of a single workflow task.
+#Tasks are sent this context instead of the whole WorkflowConfig, so that the size of each task's payload
+#doesn't grow with the number of benchmarks and simulations in a workflow
+@dataclass(frozen=True)
+class TaskContext:
+
+    benchmark_name : str
+    epic_repo_path : Path
+    epic_branch : str
+    build_num_threads : int
+    detector_configs : Tuple[DetectorConfig, ...]
+    generate_material_map : bool
+    existing_material_map_path : Optional[Path]
+    material_map_dir_path : Path
+    material_map_script_path : Path
+    material_map_path : Path
+    analysis_out_dir_path : Path
+    skip_complete_outputs : bool = True
+    simulation_name : Optional[str] = None
+    simulation_config : Optional[SimulationConfig] = None
+    detector_build_path : Optional[Path] = None
+    simulation_out_file_path : Optional[Path] = None
+    reconstruction_out_file_path : Optional[Path] = None
+    simulation_instance_temp_dir_path : Optional[Path] = None
+    reconstruction_instance_temp_dir_path : Optional[Path] = None
+    npsim_command : Optional[str] = None
+    eicrecon_command : Optional[str] = None
+
+    @property
+    def epic_compact_dir_path(self) -> Path:
+
+        return self.epic_repo_path.joinpath('compact')
+
+    def _require_simulation(self) -> SimulationConfig:
+
+        if self.simulation_config is None:
+            err = f"Task context of benchmark '{self.benchmark_name}' was not created for a simulation"
+            raise ValueError(err)
+        return self.simulation_config
+
+    #Returns the hash of the geometry described by the benchmark's ePIC repository, once its detector edits are applied
+    def geometry_hash(self) -> str:
+
+        return geometry_hash(self.epic_compact_dir_path)
+
+    #Returns the stamp of the npsim output written by a command, which defaults to the context's npsim command
+    def simulation_output_stamp(self, command : Optional[str] = None) -> str:
+
+        self._require_simulation()
+        return output_stamp(command if command is not None else self.npsim_command, self.geometry_hash())
+
+    #Returns the stamp of the eicrecon output written by a command, which defaults to the context's eicrecon command
+    def reconstruction_output_stamp(self, command : Optional[str] = None) -> str:
+
+        self._require_simulation()
+        return output_stamp(command if command is not None else self.eicrecon_command, self.geometry_hash())
+
+    #Checks whether the npsim output is complete, newer than the detector description it simulated,
+    #and was written by the same command and geometry
+    def simulation_output_complete(self, command : Optional[str] = None) -> bool:
+
+        simulation_config = self._require_simulation()
+        if not self.skip_complete_outputs or not self.epic_compact_dir_path.is_dir():
+            return False
+        return root_output_complete(
+            self.simulation_out_file_path, simulation_config.num_events, self.detector_build_path,
+            stamp=self.simulation_output_stamp(command)
+        )
+
+    #Checks whether the eicrecon output is complete, newer than its npsim output and material map,
+    #and was written by the same command and geometry
+    def reconstruction_output_complete(self, command : Optional[str] = None) -> bool:
+
+        simulation_config = self._require_simulation()
+        if not self.skip_complete_outputs or not self.epic_compact_dir_path.is_dir():
+            return False
+        material_map_path = self.material_map_path if simulation_config.use_material_map else None
+        return root_output_complete(
+            self.reconstruction_out_file_path, simulation_config.num_events,
+            self.simulation_out_file_path, material_map_path,
+            stamp=self.reconstruction_output_stamp(command)
+        )
+
+#Type of the first argument of workflow methods that run with either a WorkflowConfig or a TaskContext
+WorkflowContext = Union[WorkflowConfig, TaskContext]
+
+#Returns the task context of a benchmark (and simulation), creating it if a WorkflowConfig is given
+def resolve_task_context(
+        workflow_context : WorkflowContext, benchmark_name : str,
+        simulation_name : Optional[str] = None) -> TaskContext:
+
+    if isinstance(workflow_context, TaskContext):
+        return workflow_context
+    return workflow_context.executor.task_context(benchmark_name, simulation_name)
+
+#Checks whether a function's first argument is annotated to accept a TaskContext in place of a WorkflowConfig
+def accepts_task_context(function : Callable) -> bool:
+
+    parameters = list(inspect.signature(function).parameters.values())
+    if len(parameters) == 0 or parameters[0].name != 'workflow_config':
+        return False
+    annotation = parameters[0].annotation
+    return annotation is TaskContext or TaskContext in get_args(annotation)
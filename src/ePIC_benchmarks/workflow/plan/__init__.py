@@ -0,0 +1,7 @@
+from .cost import StageCost, CostModel, DEFAULT_STAGE_COSTS, load_cost_model
+from .plan import PlannedTask, StagePlan, ProviderRecommendation, WorkflowPlan
+
+__all__ = [
+    'StageCost', 'CostModel', 'DEFAULT_STAGE_COSTS', 'load_cost_model',
+    'PlannedTask', 'StagePlan', 'ProviderRecommendation', 'WorkflowPlan'
+]
\ No newline at end of file
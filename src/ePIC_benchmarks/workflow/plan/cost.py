@@ -0,0 +1,82 @@
+from __future__ import annotations
+from typing import Dict, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from ePIC_benchmarks._file.types import PathType
+from ePIC_benchmarks._file.utils import load_from_file, save_raw_config
+from ePIC_benchmarks.workflow.stage import WorkflowStageName
+
+#Stages whose cost scales with the number of events of a simulation
+EVENT_STAGES = ('simulation', 'reconstruction', 'analysis')
+
+#Cost of a single task of a workflow stage, as a fixed cost plus a cost per simulated event
+class StageCost(BaseModel):
+
+    model_config = ConfigDict(validate_assignment=True, validate_default=True)
+
+    core_seconds_per_task : float = Field(default=0.0, ge=0, description="Core seconds used by each task, regardless of its events")
+    core_seconds_per_event : float = Field(default=0.0, ge=0, description="Core seconds used per event of a task")
+    output_bytes_per_task : float = Field(default=0.0, ge=0, description="Bytes written by each task, regardless of its events")
+    output_bytes_per_event : float = Field(default=0.0, ge=0, description="Bytes written per event of a task")
+    num_samples : int = Field(default=0, ge=0, description="Number of measured tasks that the cost was calibrated with")
+
+    def core_seconds(self, num_events : int = 0) -> float:
+
+        return self.core_seconds_per_task + self.core_seconds_per_event * num_events
+
+    def output_bytes(self, num_events : int = 0) -> float:
+
+        return self.output_bytes_per_task + self.output_bytes_per_event * num_events
+
+#Rough costs of single pion simulations on a modern cpu core. They are placeholders until a cost model is
+#calibrated with the measured tasks of a workflow run
+DEFAULT_STAGE_COSTS : Dict[WorkflowStageName, StageCost] = {
+    'container' : StageCost(core_seconds_per_task=300.0),
+    'epic' : StageCost(core_seconds_per_task=30.0, output_bytes_per_task=50e6),
+    'detector' : StageCost(core_seconds_per_task=1.0),
+    'build' : StageCost(core_seconds_per_task=4 * 3600.0, output_bytes_per_task=2e9),
+    'material_map' : StageCost(core_seconds_per_task=3600.0, output_bytes_per_task=50e6),
+    'simulation' : StageCost(core_seconds_per_task=30.0, core_seconds_per_event=0.5, output_bytes_per_event=100e3),
+    'reconstruction' : StageCost(core_seconds_per_task=60.0, core_seconds_per_event=0.3, output_bytes_per_event=50e3),
+    'analysis' : StageCost(core_seconds_per_task=20.0, core_seconds_per_event=1e-3, output_bytes_per_task=1e6),
+}
+
+#Per stage cost model used to plan workflows before they are run.
+#Stages without a cost use the default cost of the stage
+class CostModel(BaseModel):
+
+    model_config = ConfigDict(validate_assignment=True, validate_default=True)
+
+    stages : Dict[WorkflowStageName, StageCost] = Field(
+        default_factory=dict,
+        description="Dictionary of {stage name : StageCost} pairs that replace the default stage costs"
+    )
+
+    def stage_cost(self, stage : WorkflowStageName) -> StageCost:
+
+        stage_cost = self.stages.get(stage)
+        if stage_cost is not None:
+            return stage_cost
+        return DEFAULT_STAGE_COSTS.get(stage, StageCost())
+
+    #Returns a copy of the cost model with the costs of the given stages replaced
+    def with_stage_costs(self, stage_costs : Dict[WorkflowStageName, StageCost]) -> CostModel:
+
+        return CostModel(stages={**self.stages, **stage_costs})
+
+    @classmethod
+    def load_from_file(cls, filepath : PathType) -> CostModel:
+
+        return CostModel.model_validate(load_from_file(filepath))
+
+    def save(self, filepath : PathType) -> None:
+
+        save_raw_config(raw_config=self, file_path=filepath, overwrite=True)
+
+#Returns the cost model stored in a file, or the default cost model if no file is provided
+def load_cost_model(filepath : Optional[PathType] = None) -> CostModel:
+
+    if filepath is None:
+        return CostModel()
+    return CostModel.load_from_file(filepath)
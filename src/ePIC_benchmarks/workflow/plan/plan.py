@@ -0,0 +1,115 @@
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ePIC_benchmarks._file.types import PathType
+
+SECONDS_PER_HOUR = 3600.0
+
+#A task that a workflow will submit, with the number of events and cores it runs with
+@dataclass(frozen=True)
+class PlannedTask:
+
+    stage : str
+    benchmark_name : Optional[str]
+    simulation_name : Optional[str] = None
+    num_events : int = 0
+    cores : int = 1
+
+#Estimated cost of the tasks of a workflow stage
+@dataclass
+class StagePlan:
+
+    stage : str
+    tasks : int = 0
+    events : int = 0
+    core_hours : float = 0.0
+    output_bytes : float = 0.0
+    #Number of the stage's tasks that can run at the same time, and the cores they use
+    peak_concurrency : int = 0
+    peak_cores : int = 0
+    #Estimated run time of the stage's longest task
+    max_task_hours : float = 0.0
+
+#Recommended block settings of the provider of an executor
+@dataclass
+class ProviderRecommendation:
+
+    executor_label : str
+    provider_type : str
+    stages : List[str]
+    cores_per_node : int
+    #Whether the number of cores per node is an assumption, since neither the provider nor the executor defines it
+    cores_per_node_assumed : bool
+    core_hours : float
+    node_hours : float
+    peak_cores : int
+    nodes_per_block : int
+    max_blocks : int
+    recommended_nodes_per_block : int
+    recommended_max_blocks : int
+    estimated_wall_hours : float
+
+#Estimated cost of a workflow, with per stage estimates and provider recommendations
+@dataclass
+class WorkflowPlan:
+
+    workflow_name : str
+    stages : Dict[str, StagePlan] = field(default_factory=dict)
+    recommendations : List[ProviderRecommendation] = field(default_factory=list)
+    #Estimated wall time with unlimited resources, from the longest task of each stage of the workflow graph
+    critical_path_hours : float = 0.0
+
+    @property
+    def core_hours(self) -> float:
+        return sum(stage_plan.core_hours for stage_plan in self.stages.values())
+
+    @property
+    def output_bytes(self) -> float:
+        return sum(stage_plan.output_bytes for stage_plan in self.stages.values())
+
+    @property
+    def peak_cores(self) -> int:
+        return max((stage_plan.peak_cores for stage_plan in self.stages.values()), default=0)
+
+    def to_dict(self) -> Dict[str, Any]:
+
+        plan_dict = asdict(self)
+        plan_dict.update(core_hours=self.core_hours, output_bytes=self.output_bytes, peak_cores=self.peak_cores)
+        return plan_dict
+
+    def write(self, output_path : PathType) -> Path:
+
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return output_path
+
+    #Returns a plain text table of the plan
+    def summary(self) -> str:
+
+        lines = [
+            f"Plan of workflow '{self.workflow_name}'",
+            f"{'stage':<16}{'tasks':>8}{'events':>12}{'core hours':>14}{'output GB':>12}{'peak tasks':>12}{'peak cores':>12}",
+        ]
+        for stage_plan in self.stages.values():
+            lines.append(
+                f"{stage_plan.stage:<16}{stage_plan.tasks:>8}{stage_plan.events:>12}{stage_plan.core_hours:>14.2f}"
+                f"{stage_plan.output_bytes / 1e9:>12.2f}{stage_plan.peak_concurrency:>12}{stage_plan.peak_cores:>12}"
+            )
+        lines.append(
+            f"{'total':<16}{'':>8}{'':>12}{self.core_hours:>14.2f}{self.output_bytes / 1e9:>12.2f}{'':>12}{self.peak_cores:>12}"
+        )
+        lines.append(f"Critical path: {self.critical_path_hours:.2f} hours")
+        for recommendation in self.recommendations:
+            assumed = " (assumed)" if recommendation.cores_per_node_assumed else ""
+            lines.append(
+                f"Executor '{recommendation.executor_label}' ({recommendation.provider_type}, "
+                f"{recommendation.cores_per_node} cores per node{assumed}): {recommendation.node_hours:.2f} node hours, "
+                f"nodes_per_block={recommendation.recommended_nodes_per_block} (currently {recommendation.nodes_per_block}), "
+                f"max_blocks={recommendation.recommended_max_blocks} (currently {recommendation.max_blocks}), "
+                f"~{recommendation.estimated_wall_hours:.2f} wall hours"
+            )
+        return "\n".join(lines)
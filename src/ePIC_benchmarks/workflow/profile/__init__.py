@@ -0,0 +1,9 @@
+from .report import (
+    TaskProfile, benchmark_report, critical_path, render_html, write_benchmark_report, read_profile_tasks
+)
+from .monitoring import read_monitoring_database
+
+__all__ = [
+    'TaskProfile', 'benchmark_report', 'critical_path', 'render_html',
+    'write_benchmark_report', 'read_profile_tasks', 'read_monitoring_database'
+]
\ No newline at end of file
@@ -0,0 +1,48 @@
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+SQLITE_ENDPOINT_PREFIX = "sqlite:///"
+
+def _timestamp(value : Any) -> Optional[float]:
+
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(str(value)).timestamp()
+
+#Reads the running time, cpu time and peak resident memory of every task of a run from a parsl monitoring database.
+#Returns a {task id : values} dictionary, which is empty if the database is not a readable sqlite database
+def read_monitoring_database(logging_endpoint : Optional[str], run_id : str) -> Dict[int, Dict[str, Any]]:
+
+    if logging_endpoint is None or not logging_endpoint.startswith(SQLITE_ENDPOINT_PREFIX):
+        return {}
+    database_path = Path(logging_endpoint[len(SQLITE_ENDPOINT_PREFIX):])
+    if not database_path.is_file():
+        return {}
+
+    task_values : Dict[int, Dict[str, Any]] = {}
+    try:
+        with sqlite3.connect(f"file:{database_path}?mode=ro", uri=True) as connection:
+            #The last try of a task is the one whose timing determined when the task returned
+            try_rows = connection.execute(
+                "SELECT task_id, task_try_time_running FROM try WHERE run_id = ? ORDER BY task_id, try_id",
+                (run_id,)
+            ).fetchall()
+            for task_id, time_running in try_rows:
+                task_values.setdefault(task_id, {})["time_running"] = _timestamp(time_running)
+
+            resource_rows = connection.execute(
+                "SELECT task_id, MAX(psutil_process_time_user + psutil_process_time_system),"
+                " MAX(psutil_process_memory_resident) FROM resource WHERE run_id = ? GROUP BY task_id",
+                (run_id,)
+            ).fetchall()
+            for task_id, cpu_time, max_rss in resource_rows:
+                values = task_values.setdefault(task_id, {})
+                values["cpu_time"] = cpu_time
+                values["max_rss"] = int(max_rss) if max_rss is not None else None
+    except sqlite3.Error:
+        return {}
+    return task_values
@@ -0,0 +1,295 @@
+import html
+import json
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from ePIC_benchmarks._file.types import PathType
+
+#Timing and resource usage of a single workflow task.
+#Times are unix timestamps in seconds. The running time, cpu time and peak memory are only known
+#when the workflow's parsl config enables monitoring
+@dataclass
+class TaskProfile:
+
+    task_id : int
+    stage : str
+    function_name : str
+    benchmark_name : Optional[str]
+    simulation_name : Optional[str] = None
+    status : Optional[str] = None
+    dependencies : List[int] = field(default_factory=list)
+    time_submitted : Optional[float] = None
+    time_launched : Optional[float] = None
+    time_running : Optional[float] = None
+    time_returned : Optional[float] = None
+    cpu_time : Optional[float] = None
+    max_rss : Optional[int] = None
+
+    @property
+    def memoized(self) -> bool:
+        return self.status == 'memo_done'
+
+    #Time spent waiting for the task's dependencies
+    @property
+    def dependency_wait(self) -> Optional[float]:
+        return _elapsed(self.time_submitted, self.time_launched)
+
+    #Time spent queued in an executor before the task started running
+    @property
+    def queue_wait(self) -> Optional[float]:
+        return _elapsed(self.time_launched, self.time_running)
+
+    #Time spent running, including the executor's queue if the task's running time is unknown
+    @property
+    def run_time(self) -> Optional[float]:
+        return _elapsed(self.time_running or self.time_launched, self.time_returned)
+
+    def to_dict(self) -> Dict[str, Any]:
+
+        task_dict = asdict(self)
+        task_dict.update(
+            memoized=self.memoized, dependency_wait=self.dependency_wait,
+            queue_wait=self.queue_wait, run_time=self.run_time
+        )
+        return task_dict
+
+def _elapsed(start : Optional[float], end : Optional[float]) -> Optional[float]:
+
+    if start is None or end is None:
+        return None
+    return max(0.0, end - start)
+
+def _sum(values : Sequence[Optional[float]]) -> float:
+    return float(sum(value for value in values if value is not None))
+
+#Sum of the known values, or None if no value is known
+def _known_sum(values : Sequence[Optional[float]]) -> Optional[float]:
+    known_values = [value for value in values if value is not None]
+    return float(sum(known_values)) if len(known_values) > 0 else None
+
+def _max(values : Sequence[Optional[float]]) -> Optional[float]:
+    known_values = [value for value in values if value is not None]
+    return max(known_values) if len(known_values) > 0 else None
+
+def _mean(values : Sequence[Optional[float]]) -> Optional[float]:
+    known_values = [value for value in values if value is not None]
+    return sum(known_values) / len(known_values) if len(known_values) > 0 else None
+
+#Returns the tasks of a benchmark and every task they depend on, such as the tasks of a shared ePIC build
+def benchmark_tasks(tasks : Sequence[TaskProfile], benchmark_name : str) -> List[TaskProfile]:
+
+    tasks_by_id = {task.task_id : task for task in tasks}
+    selected = {task.task_id for task in tasks if task.benchmark_name == benchmark_name}
+    pending = list(selected)
+    while len(pending) > 0:
+        task = tasks_by_id[pending.pop()]
+        for dependency_id in task.dependencies:
+            if dependency_id in tasks_by_id and dependency_id not in selected:
+                selected.add(dependency_id)
+                pending.append(dependency_id)
+    return [task for task in tasks if task.task_id in selected]
+
+#Returns the chain of tasks that determined when the last of the given tasks completed.
+#Starting from the last task to return, each step follows the dependency that returned last.
+#Tasks without dependencies that were submitted while the workflow ran, such as those of adaptive simulations,
+#follow the last task that returned before they were submitted
+def critical_path(tasks : Sequence[TaskProfile]) -> List[TaskProfile]:
+
+    returned_tasks = [task for task in tasks if task.time_returned is not None]
+    if len(returned_tasks) == 0:
+        return []
+    tasks_by_id = {task.task_id : task for task in returned_tasks}
+    first_submitted = min(task.time_submitted or task.time_returned for task in returned_tasks)
+
+    path = [max(returned_tasks, key=lambda task: task.time_returned)]
+    visited = {path[0].task_id}
+    while True:
+        task = path[-1]
+        candidates = [tasks_by_id[dependency_id] for dependency_id in task.dependencies if dependency_id in tasks_by_id]
+        if len(candidates) == 0 and task.time_submitted is not None and task.time_submitted > first_submitted:
+            candidates = [
+                other for other in returned_tasks
+                if other.time_returned <= task.time_submitted and other.task_id not in visited
+            ]
+        candidates = [candidate for candidate in candidates if candidate.task_id not in visited]
+        if len(candidates) == 0:
+            break
+        predecessor = max(candidates, key=lambda candidate: candidate.time_returned)
+        visited.add(predecessor.task_id)
+        path.append(predecessor)
+    path.reverse()
+    return path
+
+#Builds the critical path and utilization report of a benchmark from the profiles of every workflow task
+def benchmark_report(tasks : Sequence[TaskProfile], benchmark_name : str) -> Dict[str, Any]:
+
+    tasks = benchmark_tasks(tasks, benchmark_name)
+    path = critical_path(tasks)
+    start_times = [task.time_submitted for task in tasks if task.time_submitted is not None]
+    end_times = [task.time_returned for task in tasks if task.time_returned is not None]
+    start_time = min(start_times) if len(start_times) > 0 else None
+    wall_time = _elapsed(start_time, max(end_times) if len(end_times) > 0 else None) or 0.0
+
+    #Each task of the critical path accounts for the time between its predecessor's return and its own
+    path_entries = []
+    critical_time_by_stage : Dict[str, float] = {}
+    previous_returned = start_time
+    for task in path:
+        critical_time = _elapsed(previous_returned, task.time_returned) or 0.0
+        critical_time_by_stage[task.stage] = critical_time_by_stage.get(task.stage, 0.0) + critical_time
+        path_entries.append({**task.to_dict(), "critical_time": critical_time})
+        previous_returned = task.time_returned
+
+    stages : Dict[str, Dict[str, Any]] = {}
+    for stage in dict.fromkeys(task.stage for task in tasks):
+        stage_tasks = [task for task in tasks if task.stage == stage]
+        run_times = [task.run_time for task in stage_tasks if not task.memoized]
+        stages[stage] = {
+            "tasks": len(stage_tasks),
+            "memoized": sum(task.memoized for task in stage_tasks),
+            "failed": sum(task.status in ('failed', 'dep_fail') for task in stage_tasks),
+            "run_time_total": _sum(run_times),
+            "run_time_mean": _mean(run_times),
+            "run_time_max": _max(run_times),
+            "dependency_wait_mean": _mean([task.dependency_wait for task in stage_tasks]),
+            "queue_wait_mean": _mean([task.queue_wait for task in stage_tasks]),
+            "cpu_time_total": _known_sum([task.cpu_time for task in stage_tasks]),
+            "max_rss": _max([task.max_rss for task in stage_tasks]),
+            #Average number of the stage's tasks running at once over the benchmark's wall time
+            "utilization": _sum(run_times) / wall_time if wall_time > 0 else None,
+            "critical_time": critical_time_by_stage.get(stage, 0.0),
+        }
+
+    bottleneck_stage = None
+    if len(critical_time_by_stage) > 0:
+        bottleneck_stage = max(critical_time_by_stage, key=critical_time_by_stage.get)
+    return {
+        "benchmark_name": benchmark_name,
+        "start_time": start_time,
+        "wall_time": wall_time,
+        "critical_path_time": _sum([entry["critical_time"] for entry in path_entries]),
+        "bottleneck_stage": bottleneck_stage,
+        "stages": stages,
+        "critical_path": path_entries,
+        "tasks": [task.to_dict() for task in tasks],
+    }
+
+def _format_seconds(seconds : Optional[float]) -> str:
+
+    if seconds is None:
+        return "-"
+    if seconds >= 3600:
+        return f"{seconds / 3600:.2f} h"
+    if seconds >= 60:
+        return f"{seconds / 60:.2f} min"
+    return f"{seconds:.2f} s"
+
+def _format_bytes(num_bytes : Optional[float]) -> str:
+
+    if num_bytes is None:
+        return "-"
+    return f"{num_bytes / 2 ** 20:.1f} MiB"
+
+def _format_ratio(ratio : Optional[float]) -> str:
+    return "-" if ratio is None else f"{ratio:.2f}"
+
+#Renders a benchmark report as a standalone html page with a stage table and a timeline of the critical path
+def render_html(report : Dict[str, Any]) -> str:
+
+    escape = html.escape
+    wall_time = report["wall_time"] or 0.0
+    start_time = report["start_time"] or 0.0
+
+    stage_rows = []
+    for stage, stage_report in report["stages"].items():
+        highlight = ' class="bottleneck"' if stage == report["bottleneck_stage"] else ""
+        stage_rows.append(
+            f"<tr{highlight}><td>{escape(stage)}</td><td>{stage_report['tasks']}</td><td>{stage_report['memoized']}</td>"
+            f"<td>{stage_report['failed']}</td><td>{_format_seconds(stage_report['critical_time'])}</td>"
+            f"<td>{_format_seconds(stage_report['run_time_total'])}</td><td>{_format_seconds(stage_report['run_time_mean'])}</td>"
+            f"<td>{_format_seconds(stage_report['run_time_max'])}</td><td>{_format_seconds(stage_report['queue_wait_mean'])}</td>"
+            f"<td>{_format_seconds(stage_report['cpu_time_total'])}</td><td>{_format_bytes(stage_report['max_rss'])}</td>"
+            f"<td>{_format_ratio(stage_report['utilization'])}</td></tr>"
+        )
+
+    path_rows = []
+    for entry in report["critical_path"]:
+        begin = (entry["time_submitted"] or start_time) - start_time
+        end = (entry["time_returned"] or start_time) - start_time
+        left = 100 * begin / wall_time if wall_time > 0 else 0
+        width = max(0.2, 100 * (end - begin) / wall_time) if wall_time > 0 else 0
+        name = entry["function_name"] + (f" ({entry['simulation_name']})" if entry["simulation_name"] else "")
+        path_rows.append(
+            f"<tr><td>{escape(entry['stage'])}</td><td>{escape(name)}</td>"
+            f"<td>{_format_seconds(entry['critical_time'])}</td><td>{_format_seconds(entry['dependency_wait'])}</td>"
+            f"<td>{_format_seconds(entry['queue_wait'])}</td><td>{_format_seconds(entry['run_time'])}</td>"
+            f"<td class=\"timeline\"><div class=\"bar stage-{escape(entry['stage'])}\" "
+            f"style=\"margin-left:{left:.2f}%;width:{width:.2f}%\"></div></td></tr>"
+        )
+
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Profile of benchmark {escape(report['benchmark_name'])}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; margin-bottom: 2em; width: 100%; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; text-align: left; }}
+tr.bottleneck {{ background: #fde2e2; }}
+td.timeline {{ width: 40%; }}
+div.bar {{ height: 12px; background: #4c78a8; }}
+div.stage-simulation {{ background: #f58518; }}
+div.stage-reconstruction {{ background: #54a24b; }}
+div.stage-analysis {{ background: #b279a2; }}
+div.stage-build, div.stage-epic, div.stage-detector {{ background: #e45756; }}
+div.stage-material_map {{ background: #72b7b2; }}
+</style>
+</head>
+<body>
+<h1>Benchmark {escape(report['benchmark_name'])}</h1>
+<p>Wall time: {_format_seconds(wall_time)}. Critical path: {_format_seconds(report['critical_path_time'])}.
+Bottleneck stage: <b>{escape(str(report['bottleneck_stage']))}</b>.</p>
+<h2>Stages</h2>
+<table>
+<tr><th>Stage</th><th>Tasks</th><th>Memoized</th><th>Failed</th><th>Critical path time</th><th>Total run time</th>
+<th>Mean run time</th><th>Max run time</th><th>Mean queue wait</th><th>CPU time</th><th>Peak RSS</th><th>Utilization</th></tr>
+{"".join(stage_rows)}
+</table>
+<h2>Critical Path</h2>
+<table>
+<tr><th>Stage</th><th>Task</th><th>Critical time</th><th>Dependency wait</th><th>Queue wait</th><th>Run time</th><th>Timeline</th></tr>
+{"".join(path_rows)}
+</table>
+</body>
+</html>
+"""
+
+#Writes the json and html reports of a benchmark and returns the path of the json report
+def write_benchmark_report(report : Dict[str, Any], output_dir_path : PathType) -> Path:
+
+    output_dir_path = Path(output_dir_path)
+    output_dir_path.mkdir(parents=True, exist_ok=True)
+    json_path = output_dir_path.joinpath(f"{report['benchmark_name']}.json")
+    with open(json_path, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    with open(output_dir_path.joinpath(f"{report['benchmark_name']}.html"), "w") as f:
+        f.write(render_html(report))
+    return json_path
+
+#Reads the task profiles of every benchmark report in a directory.
+#Tasks shared by several benchmarks, such as those of a shared ePIC build, are only returned once
+def read_profile_tasks(output_dir_path : PathType) -> List[TaskProfile]:
+
+    field_names = {task_field.name for task_field in fields(TaskProfile)}
+    tasks : Dict[int, TaskProfile] = {}
+    for report_path in sorted(Path(output_dir_path).glob("*.json")):
+        with open(report_path, "r") as f:
+            report = json.load(f)
+        if not isinstance(report, dict) or "tasks" not in report:
+            continue
+        for task_dict in report["tasks"]:
+            task = TaskProfile(**{name : value for name, value in task_dict.items() if name in field_names})
+            tasks.setdefault(task.task_id, task)
+    return list(tasks.values())
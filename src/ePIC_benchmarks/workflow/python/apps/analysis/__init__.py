@@ -1,3 +1,3 @@
-from .apps import generate_performance_plots_app
+from .apps import generate_performance_plots_app, estimate_simulation_precision_app
 
-__all__ = ['generate_performance_plots_app']
\ No newline at end of file
+__all__ = ['generate_performance_plots_app', 'estimate_simulation_precision_app']
\ No newline at end of file
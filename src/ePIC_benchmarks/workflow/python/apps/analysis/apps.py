@@ -1,4 +1,5 @@
 from ePIC_benchmarks.workflow.python import python_app
-from ePIC_benchmarks.workflow.python.methods.analysis import (generate_performance_plots)
+from ePIC_benchmarks.workflow.python.methods.analysis import (generate_performance_plots, estimate_simulation_precision)
 
-generate_performance_plots_app = python_app(generate_performance_plots)
\ No newline at end of file
+generate_performance_plots_app = python_app(generate_performance_plots)
+estimate_simulation_precision_app = python_app(estimate_simulation_precision)
\ No newline at end of file
@@ -1,3 +1,3 @@
-from .methods import generate_performance_plots
+from .methods import generate_performance_plots, estimate_simulation_precision
 
-__all__ = ['generate_performance_plots']
\ No newline at end of file
+__all__ = ['generate_performance_plots', 'estimate_simulation_precision']
\ No newline at end of file
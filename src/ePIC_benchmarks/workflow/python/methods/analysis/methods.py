@@ -1,23 +1,32 @@
 from numpy import arange
-from typing import Optional
+from pathlib import Path
+from typing import Dict, Optional, Sequence
 from parsl import AUTO_LOGNAME
 
-from ePIC_benchmarks.workflow.config import WorkflowConfig
-from ePIC_benchmarks.analysis.performance import performance_plot
+from ePIC_benchmarks.workflow.context import WorkflowContext, resolve_task_context
+from ePIC_benchmarks.analysis.performance import performance_plot, simulation_precision
 
 #Generates momentum resolution and track efficiency plots for a given benchmark + simulation configuration
 def generate_performance_plots(
-        workflow_config : WorkflowConfig, benchmark_name : str, simulation_name : str,
+        workflow_config : WorkflowContext, benchmark_name : str, simulation_name : str,
         analysis_dir_path : Optional[str] = None, plot_z_scores : bool = False,
         efficiency_eta_bins=arange(-4, 4.1, 0.5), resolution_eta_bins=arange(-4, 4.1, 0.5),
         kchain : int = 0, output_name : str = None,
+        reconstruction_file_paths : Optional[Sequence[str]] = None,
         stdout=AUTO_LOGNAME, stderr=AUTO_LOGNAME,
         **kwargs
         ) -> str:
 
-    analysis_dir = workflow_config.paths.analysis_out_dir_path(benchmark_name)
-    recon_out_path = workflow_config.paths.reconstruction_out_file_path(benchmark_name, simulation_name)
-    simulation_config = workflow_config.simulation_config(benchmark_name, simulation_name)
+    context = resolve_task_context(workflow_config, benchmark_name, simulation_name)
+    analysis_dir = context.analysis_out_dir_path
+    recon_out_path = context.reconstruction_out_file_path
+    simulation_config = context.simulation_config
+
+    #Adaptive simulations are analyzed from the reconstructions of all of their shards
+    if reconstruction_file_paths is not None:
+        recon_out_path = list(reconstruction_file_paths)
+        if output_name is None:
+            output_name = Path(context.reconstruction_out_file_path).stem
     performance_plot(
         file_path=recon_out_path,
         output_dir=analysis_dir,
@@ -30,6 +39,23 @@ def generate_performance_plots(
         simulation_config=simulation_config
     )
 
+#Estimates the momentum resolution and tracking efficiency uncertainties of the reconstructed shards of an adaptive simulation
+def estimate_simulation_precision(
+        workflow_config : WorkflowContext, benchmark_name : str, simulation_name : str,
+        reconstruction_file_paths : Sequence[str] = (), analysis_dir_path : Optional[str] = None,
+        efficiency_eta_bins=arange(-4, 4.1, 0.5),
+        min_efficiency_bin_events : int = 100,
+        stdout=AUTO_LOGNAME, stderr=AUTO_LOGNAME,
+        **kwargs
+        ) -> Dict[str, Optional[float]]:
+
+    return simulation_precision(
+        list(reconstruction_file_paths),
+        dir_path=analysis_dir_path,
+        eff_eta_bins=efficiency_eta_bins,
+        min_bin_events=min_efficiency_bin_events
+    )
+
 def momentum_resolution() -> str:
 
     pass
@@ -1,14 +1,23 @@
+from dataclasses import asdict
 from pathlib import Path
+from typing import Any, Dict, Optional
 from parsl import AUTO_LOGNAME
 
-from ePIC_benchmarks.workflow.config import WorkflowConfig
+from ePIC_benchmarks.detector.edits import apply_detector_edits
+from ePIC_benchmarks.workflow.context import WorkflowContext, resolve_task_context
 
 #Applies the updates defined by the list 'DetectorConfig's for a BenchmarkConfig
+#and returns the edit statistics of each edited file
 def apply_detector_configs(
-        benchmark_suite_config : WorkflowConfig,
+        workflow_config : WorkflowContext,
         benchmark_name : str,
+        max_workers : Optional[int] = None,
         stdout=AUTO_LOGNAME, stderr=AUTO_LOGNAME,
-        **kwargs) -> None:
+        **kwargs) -> Dict[str, Dict[str, Any]]:
 
-
-    benchmark_suite_config.executor.apply_detector_configs(benchmark_name=benchmark_name)
+    context = resolve_task_context(workflow_config, benchmark_name)
+    #Edits are grouped by file, so every edited file is parsed and written once
+    file_statistics = apply_detector_edits(
+        context.detector_configs, directory_path=context.epic_compact_dir_path, max_workers=max_workers
+    )
+    return {str(file_path) : asdict(statistics) for file_path, statistics in file_statistics.items()}
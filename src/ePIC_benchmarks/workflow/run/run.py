@@ -5,7 +5,6 @@ import os
 import sys
 from pathlib import Path
 from typing import Callable, Optional
-from parsl.configs.local_threads import config
 from parsl.utils import get_all_checkpoints
 from ePIC_benchmarks._file.types import PathType
 from ePIC_benchmarks.workflow.config import WorkflowConfig
@@ -52,11 +51,12 @@ def execute_workflow(
         exec_script_func = script_func if script_func is not None else workflow.workflow_script
         exec_script_path = script_path if script_path is not None else workflow.script_path
 
+        #Prioritize script function over script file as the workflow executor.
+        #Falls back to the built-in workflow DAG if neither is provided
         if exec_script_func is None and exec_script_path is None:
-            raise ValueError("Must provide a workflow script function or workflow script path")
-        
-        #Prioritize script function over script file as the workflow executor
-        if script_func_name:
+            from ePIC_benchmarks.workflow._inner.dag import submit_workflow_dag
+            exec_func = submit_workflow_dag
+        elif script_func_name:
             exec_func = exec_script_func if exec_script_func is not None else get_workflow_script_func(exec_script_path, func_name=script_func_name)
         else:
             exec_func = exec_script_func if exec_script_func is not None else get_workflow_script_func(exec_script_path)
@@ -65,49 +65,55 @@ def execute_workflow(
         #Initialize any uninitialized directories
         workflow.executor.init_directories()
 
-        #Set checkpointing mode to checkpoint on task exit.
-        config.checkpoint_mode = "task_exit"
-
         parsl.clear()
 
-        #If workflow is not being redone, start from the last recorded checkpoints
+        #If workflow is not being redone, start from the checkpoints recorded in the workflow's run directory.
+        #Stage tasks are memoized by the content of their inputs, so only tasks whose inputs changed are rerun
         if not workflow.redo_all_benchmarks:
             # logging.info("Loading last task checkpoints")
-            config.checkpoint_files = get_all_checkpoints()
+            workflow.parsl_config.checkpoint_mode = "task_exit"
+            workflow.parsl_config.checkpoint_files = get_all_checkpoints(workflow.parsl_config.run_dir)
         
         # logging.info("Starting the workflow")
-        #Load Provided Parsl Config
-        with parsl.load(workflow.parsl_config.to_parsl_config()):
+        profiler = workflow.profiler if workflow.profile else None
+        try:
+            #Load Provided Parsl Config. The data flow kernel is cleaned up when the block exits
+            with parsl.load(workflow.parsl_config.to_parsl_config()) as dfk:
 
-            try:
-                #Execute provided workflow script to add tasks to parsl dependency graph
+                if profiler is not None:
+                    profiler.start(dfk)
                 try:
-                    parsl_wrapped_script_func = join_app(exec_func)
-                    workflow_future : WorkflowFuture = parsl_wrapped_script_func(workflow)
-
-                    #Wait for every task to complete
-                    if isinstance(workflow_future, (list, set)):
-                        for future in workflow_future:
-                            future.result()
-                    else:
-                        workflow_future.result()
-                except Exception as e:
-                    raise e
+                    #Execute provided workflow script to add tasks to parsl dependency graph
+                    try:
+                        parsl_wrapped_script_func = join_app(exec_func)
+                        workflow_future : WorkflowFuture = parsl_wrapped_script_func(workflow)
 
+                        #Wait for every task to complete
+                        if isinstance(workflow_future, (list, set)):
+                            for future in workflow_future:
+                                future.result()
+                        else:
+                            workflow_future.result()
+                    except Exception as e:
+                        raise e
 
-            except Exception as e:
-                #Ensure cleanup keeps all files regardless of config settings if workflow terminates early.
-                #Guarantees checkpointing will work as intended.
-                workflow.keep_epic_repos = True
-                workflow.keep_simulation_outputs = True
-                workflow.keep_reconstruction_outputs= True
-                raise e
 
-            finally:
-                #Cleanup routine
-                try:
+                except Exception as e:
+                    #Ensure cleanup keeps all files regardless of config settings if workflow terminates early.
+                    #Guarantees checkpointing will work as intended.
+                    workflow.keep_epic_repos = True
+                    workflow.keep_simulation_outputs = True
+                    workflow.keep_reconstruction_outputs= True
+                    raise e
+
+                finally:
+                    #Task records are read before the data flow kernel is cleaned up
+                    if profiler is not None:
+                        profiler.collect()
+                    #Cleanup routine
                     # logging.info("Cleaning up directories")
                     workflow.executor.cleanup_directories()
-                finally:
-                    parsl.dfk().cleanup()
-
+        finally:
+            #Reports are written once monitoring has flushed every task's resource usage
+            if profiler is not None:
+                profiler.write_reports()
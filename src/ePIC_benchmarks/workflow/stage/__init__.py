@@ -0,0 +1,3 @@
+from .config import StageConfig, WorkflowStageName, WORKFLOW_STAGE_NAMES, PYTHON_APP_STAGES, SIMULATION_THREAD_STAGES
+
+__all__ = ['StageConfig', 'WorkflowStageName', 'WORKFLOW_STAGE_NAMES', 'PYTHON_APP_STAGES', 'SIMULATION_THREAD_STAGES']
@@ -0,0 +1,79 @@
+from typing import Any, Dict, List, Literal, Optional, Self, get_args
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+#Names of the stages of an ePIC benchmark workflow
+WorkflowStageName = Literal[
+    'container', 'epic', 'detector', 'build',
+    'material_map', 'simulation', 'reconstruction', 'analysis'
+]
+WORKFLOW_STAGE_NAMES = get_args(WorkflowStageName)
+
+#Stages whose tasks are run as parsl python apps. All other stages are run as bash apps.
+PYTHON_APP_STAGES = ('detector', 'analysis')
+
+#Stages whose tasks run npsim or eicrecon, and the SimulationConfig field with the number of threads each task uses.
+#Tasks of these stages request the threads of their simulation instead of the stage's cores
+SIMULATION_THREAD_STAGES = {'simulation' : 'npsim_num_threads', 'reconstruction' : 'eicrecon_num_threads'}
+
+#Configuration for routing the tasks of a workflow stage to parsl executors
+class StageConfig(BaseModel):
+
+    model_config = ConfigDict(validate_assignment=True, validate_default=True)
+
+    executors : Optional[List[str]] = Field(
+        default=None,
+        description="Labels of the parsl executors that run the stage's tasks. Tasks may run on any executor if not provided."
+    )
+    cores : Optional[int] = Field(
+        default=None,
+        description="Number of cores used by each of the stage's tasks"
+    )
+    memory : Optional[float] = Field(
+        default=None,
+        description="Memory in GB used by each of the stage's tasks"
+    )
+    disk : Optional[float] = Field(
+        default=None,
+        description="Disk space in GB used by each of the stage's tasks"
+    )
+    walltime : Optional[int] = Field(
+        default=None,
+        description="Maximum run time in seconds (or 'HH:MM:SS') of each of the stage's tasks"
+    )
+
+    #Converts a walltime string with the format 'HH:MM:SS' to seconds
+    @field_validator('walltime', mode='before')
+    def parse_walltime(cls, walltime : Any) -> Any:
+
+        if not isinstance(walltime, str) or ':' not in walltime:
+            return walltime
+        try:
+            hours, minutes, seconds = (int(part) for part in walltime.split(':'))
+        except ValueError:
+            err = f"Walltime '{walltime}' must be a number of seconds or have the format 'HH:MM:SS'"
+            raise ValueError(err)
+        return hours * 3600 + minutes * 60 + seconds
+
+    #Checks that every provided resource is greater than 0
+    @model_validator(mode='after')
+    def check_positive_resources(self) -> Self:
+
+        for resource_name in ['cores', 'memory', 'disk', 'walltime']:
+            resource_value = getattr(self, resource_name)
+            if resource_value is not None and resource_value <= 0:
+                err = f"Stage resource '{resource_name}' must be greater than 0. Got '{resource_value}'"
+                raise ValueError(err)
+        return self
+
+    #Returns the parsl resource specification for the stage's tasks
+    #NOTE: Only the WorkQueueExecutor accepts cores, memory and disk resource specifications
+    def resource_specification(self) -> Dict[str, Any]:
+
+        resource_spec = {}
+        if self.cores is not None:
+            resource_spec['cores'] = self.cores
+        if self.memory is not None:
+            resource_spec['memory'] = int(self.memory * 1024)
+        if self.disk is not None:
+            resource_spec['disk'] = int(self.disk * 1024)
+        return resource_spec
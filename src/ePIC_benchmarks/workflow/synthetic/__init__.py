@@ -0,0 +1,10 @@
+from .executables import SyntheticOutputFormat, create_synthetic_epic_directory
+from .dag import SyntheticWorkflowDag, analyze_synthetic_output
+from .harness import (
+    SyntheticBenchmarkConfig, SyntheticBenchmarkResult, run_synthetic_benchmarks, write_synthetic_results
+)
+
+__all__ = [
+    'SyntheticOutputFormat', 'create_synthetic_epic_directory', 'SyntheticWorkflowDag', 'analyze_synthetic_output',
+    'SyntheticBenchmarkConfig', 'SyntheticBenchmarkResult', 'run_synthetic_benchmarks', 'write_synthetic_results'
+]
\ No newline at end of file
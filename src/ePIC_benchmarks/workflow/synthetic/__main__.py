@@ -0,0 +1,42 @@
+import argparse
+import os
+from .harness import SyntheticBenchmarkConfig, run_synthetic_benchmarks, write_synthetic_results
+
+if __name__ == "__main__":
+
+    CWD = os.getcwd()
+
+    parser = argparse.ArgumentParser("ePIC Workflow synthetic throughput benchmarks")
+    parser.add_argument("--numSimulations", "-n", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--executors", "-e", nargs="+", choices=['thread_pool', 'htex'], default=['thread_pool'])
+    parser.add_argument("--maxWorkers", "-w", type=int, default=4)
+    parser.add_argument("--numEvents", type=int, default=100)
+    parser.add_argument("--eventBytes", type=int, default=1024)
+    parser.add_argument("--taskSeconds", type=float, default=0.0)
+    parser.add_argument("--buildSeconds", type=float, default=0.0)
+    parser.add_argument("--outputFormat", choices=['root', 'npy'], default='npy')
+    parser.add_argument("--skipCheckpoints", action="store_true")
+    parser.add_argument("--workingDirectory", "-d", default=os.path.join(CWD, "synthetic_benchmarks"))
+    parser.add_argument("--output", "-o", default=os.path.join(CWD, "synthetic_benchmarks.json"))
+
+    args = parser.parse_args()
+    config = SyntheticBenchmarkConfig(
+        num_simulations=args.numSimulations,
+        executors=args.executors,
+        max_workers=args.maxWorkers,
+        num_events=args.numEvents,
+        event_bytes=args.eventBytes,
+        task_seconds=args.taskSeconds,
+        build_seconds=args.buildSeconds,
+        output_format=args.outputFormat,
+        measure_checkpoints=not args.skipCheckpoints,
+        working_directory=args.workingDirectory,
+    )
+    results = run_synthetic_benchmarks(config)
+    for result in results:
+        print(
+            f"{result.executor} {result.num_simulations} simulations: {result.num_tasks} tasks, "
+            f"dag {result.dag_time:.3f}s, wall {result.wall_time:.3f}s, checkpoint overhead {result.checkpoint_overhead}"
+        )
+    output_path = write_synthetic_results(results, args.output, config=config)
+    print(f"Results written to {output_path}")
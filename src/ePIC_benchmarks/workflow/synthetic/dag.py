@@ -0,0 +1,54 @@
+import time
+from concurrent.futures import Future
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from parsl import AUTO_LOGNAME
+
+from ePIC_benchmarks.workflow.config import WorkflowConfig
+from ePIC_benchmarks.workflow.context import WorkflowContext, resolve_task_context
+from ePIC_benchmarks.workflow._inner.dag import WorkflowDag
+from ePIC_benchmarks.workflow.synthetic.executables import SyntheticOutputFormat, read_synthetic_output
+
+#Number of bins of the histogram that the synthetic analysis fills
+SYNTHETIC_HISTOGRAM_BINS = 100
+
+#Reads the synthetic reconstruction outputs of a simulation and histograms their payload.
+#Returns the number of events and bytes that were analyzed, and the time spent analyzing them
+def analyze_synthetic_output(
+        workflow_config : WorkflowContext, benchmark_name : str, simulation_name : str,
+        output_format : SyntheticOutputFormat = 'npy',
+        reconstruction_file_paths : Optional[Sequence[str]] = None,
+        stdout=AUTO_LOGNAME, stderr=AUTO_LOGNAME,
+        **kwargs) -> Dict[str, float]:
+
+    context = resolve_task_context(workflow_config, benchmark_name, simulation_name)
+    file_paths = reconstruction_file_paths or [context.reconstruction_out_file_path]
+
+    start_time = time.perf_counter()
+    num_events, num_bytes = 0, 0
+    for file_path in file_paths:
+        payload = read_synthetic_output(file_path, output_format)
+        np.histogram(payload, bins=SYNTHETIC_HISTOGRAM_BINS)
+        num_events += payload.shape[0]
+        num_bytes += payload.nbytes
+    return {"num_events": num_events, "num_bytes": num_bytes, "run_time": time.perf_counter() - start_time}
+
+#Built-in workflow graph whose analysis tasks histogram synthetic outputs instead of making performance plots
+class SyntheticWorkflowDag(WorkflowDag):
+
+    def __init__(self, parent, output_format : SyntheticOutputFormat = 'npy'):
+        super().__init__(parent)
+        self.output_format = output_format
+
+    @property
+    def num_tasks(self) -> int:
+
+        return len(self._nodes)
+
+    def _submit_analysis(self, benchmark_name : str, simulation_name : str, **kwargs) -> Future:
+
+        return self._node(
+            'analysis', (benchmark_name, simulation_name), analyze_synthetic_output,
+            self.parent, benchmark_name, simulation_name, output_format=self.output_format, **kwargs
+        )
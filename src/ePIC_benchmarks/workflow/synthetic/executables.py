@@ -0,0 +1,117 @@
+import os
+import stat
+import sys
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+import uproot as up
+
+from ePIC_benchmarks._file.types import PathType
+from ePIC_benchmarks._file.root import EVENTS_TREE_NAME
+
+SyntheticOutputFormat = Literal['root', 'npy']
+
+#Name of the branch that holds the fixed size payload of every event
+PAYLOAD_BRANCH_NAME = "payload"
+#Directory of a synthetic ePIC directory that holds the fake executables
+SYNTHETIC_BIN_DIR_NAME = "synthetic_bin"
+
+#Number of float32 values in the payload of an event
+def _payload_width(event_bytes : int) -> int:
+
+    return max(1, event_bytes // 4)
+
+#Reads the payload written by the fake npsim and eicrecon executables
+def read_synthetic_output(file_path : PathType, output_format : SyntheticOutputFormat = 'npy') -> np.ndarray:
+
+    if output_format == 'root':
+        with up.open(file_path) as root_file:
+            return root_file[EVENTS_TREE_NAME][PAYLOAD_BRANCH_NAME].array(library="np")
+    with open(file_path, "rb") as f:
+        return np.load(f)
+
+#Source of the fake npsim and eicrecon executables. Both sleep for a fixed time and write a fixed size payload
+#for the number of events of their command line, and eicrecon also reads the npsim output it reconstructs.
+#The executables only import numpy (and uproot for ROOT outputs), so their start up time stays negligible
+_SIMULATION_EXECUTABLE_TEMPLATE = """#!{python}
+import sys
+import time
+import numpy as np
+
+OUTPUT_FLAG = {output_flag!r}
+NUM_EVENTS_FLAG = {num_events_flag!r}
+OUTPUT_FORMAT = {output_format!r}
+
+output_path, num_events, input_paths = None, 0, []
+for arg in sys.argv[1:]:
+    if arg.startswith(OUTPUT_FLAG + "="):
+        output_path = arg.split("=", 1)[1]
+    elif arg.startswith(NUM_EVENTS_FLAG + "="):
+        num_events = int(arg.split("=", 1)[1])
+    elif not arg.startswith("-"):
+        input_paths.append(arg)
+
+if OUTPUT_FORMAT == "root":
+    import uproot as up
+    for input_path in input_paths:
+        with up.open(input_path) as root_file:
+            root_file[{tree_name!r}][{branch_name!r}].array(library="np")
+else:
+    for input_path in input_paths:
+        with open(input_path, "rb") as f:
+            np.load(f)
+
+time.sleep({task_seconds!r})
+
+payload = np.zeros((num_events, {payload_width!r}), dtype=np.float32)
+if OUTPUT_FORMAT == "root":
+    with up.recreate(output_path) as root_file:
+        root_file[{tree_name!r}] = {{{branch_name!r}: payload}}
+else:
+    with open(output_path, "wb") as f:
+        np.save(f, payload)
+"""
+
+#Source of the fake cmake executable, which only sleeps for the configured build time
+_BUILD_EXECUTABLE_TEMPLATE = """#!{python}
+import time
+time.sleep({build_seconds!r})
+"""
+
+def _write_executable(file_path : Path, source : str) -> None:
+
+    file_path.write_text(source)
+    file_path.chmod(file_path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+#Creates an ePIC directory whose environment script puts fake npsim, eicrecon and cmake executables on the PATH.
+#Returns the directory of the fake executables, which must also be on the PATH of the workers that compile ePIC
+def create_synthetic_epic_directory(
+        directory_path : PathType, task_seconds : float = 0.0, build_seconds : float = 0.0,
+        event_bytes : int = 1024, output_format : SyntheticOutputFormat = 'npy') -> Path:
+
+    directory_path = Path(directory_path).resolve()
+    bin_dir_path = directory_path.joinpath(SYNTHETIC_BIN_DIR_NAME)
+    install_bin_dir_path = directory_path.joinpath('install', 'bin')
+    for path in (bin_dir_path, install_bin_dir_path, directory_path.joinpath('install', 'share', 'epic'), directory_path.joinpath('compact')):
+        path.mkdir(parents=True, exist_ok=True)
+
+    format_kwargs = dict(
+        python=sys.executable,
+        task_seconds=task_seconds,
+        payload_width=_payload_width(event_bytes),
+        output_format=output_format,
+        tree_name=EVENTS_TREE_NAME,
+        branch_name=PAYLOAD_BRANCH_NAME,
+    )
+    _write_executable(bin_dir_path.joinpath('npsim'), _SIMULATION_EXECUTABLE_TEMPLATE.format(
+        output_flag="--outputFile", num_events_flag="--numberOfEvents", **format_kwargs
+    ))
+    _write_executable(bin_dir_path.joinpath('eicrecon'), _SIMULATION_EXECUTABLE_TEMPLATE.format(
+        output_flag="-Ppodio:output_file", num_events_flag="-Pjana:nevents", **format_kwargs
+    ))
+    _write_executable(bin_dir_path.joinpath('cmake'), _BUILD_EXECUTABLE_TEMPLATE.format(
+        python=sys.executable, build_seconds=build_seconds
+    ))
+    install_bin_dir_path.joinpath('thisepic.sh').write_text(f'export PATH="{bin_dir_path}{os.pathsep}$PATH"\n')
+    return bin_dir_path
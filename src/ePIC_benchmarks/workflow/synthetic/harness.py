@@ -0,0 +1,242 @@
+import json
+import os
+import shutil
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Literal, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from ePIC_benchmarks._file.types import PathType
+from ePIC_benchmarks.benchmark.config import BenchmarkConfig
+from ePIC_benchmarks.parsl.config.config import ParslConfig
+from ePIC_benchmarks.parsl.executors.executors import HighThroughputExecutorConfig, ThreadPoolExecutorConfig
+from ePIC_benchmarks.parsl.launchers.launchers import SimpleLauncherConfig
+from ePIC_benchmarks.parsl.providers.providers import LocalProviderConfig
+from ePIC_benchmarks.workflow.config import WorkflowConfig
+from ePIC_benchmarks.workflow.run.run import execute_workflow
+from ePIC_benchmarks.workflow.synthetic.dag import SyntheticWorkflowDag
+from ePIC_benchmarks.workflow.synthetic.executables import SyntheticOutputFormat, create_synthetic_epic_directory
+
+SyntheticExecutorType = Literal['thread_pool', 'htex']
+
+SYNTHETIC_EPIC_DIR_NAME = "synthetic_epic"
+SYNTHETIC_BENCHMARK_NAME = "synthetic"
+SYNTHETIC_EXECUTOR_LABEL = "synthetic"
+#Detector description passed to the fake npsim and eicrecon executables, which ignore it
+SYNTHETIC_DETECTOR_XML = "synthetic.xml"
+
+#Measurements of a synthetic workflow run at a single scale. Times are in seconds
+@dataclass
+class SyntheticBenchmarkResult:
+
+    executor : str
+    num_simulations : int
+    num_tasks : int
+    config_time : float
+    dag_time : float
+    submission_rate : Optional[float]
+    wall_time : float
+    analysis_events : int
+    analysis_bytes : int
+    analysis_events_per_second : Optional[float]
+    analysis_bytes_per_second : Optional[float]
+    checkpointed_wall_time : Optional[float] = None
+    checkpoint_overhead : Optional[float] = None
+    resume_time : Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+
+        return asdict(self)
+
+#Configuration of the synthetic throughput benchmarks of the workflow orchestration layer.
+#The built-in workflow DAG is run with fake npsim, eicrecon and cmake executables that sleep and write
+#fixed size outputs, so that the measured times only depend on the workflow's orchestration
+class SyntheticBenchmarkConfig(BaseModel):
+
+    model_config = ConfigDict(validate_assignment=True, validate_default=True)
+
+    num_simulations : List[int] = Field(
+        default=[10, 100, 1000],
+        description="Numbers of simulations of the synthetic workflows that are run"
+    )
+    executors : List[SyntheticExecutorType] = Field(
+        default=['thread_pool'],
+        description="Parsl executors that run the synthetic workflows"
+    )
+    max_workers : int = Field(default=4, gt=0, description="Number of threads or workers of each executor")
+    num_events : int = Field(default=100, gt=0, description="Number of events of each simulation")
+    event_bytes : int = Field(default=1024, gt=0, description="Size of the payload written for each event")
+    task_seconds : float = Field(default=0.0, ge=0, description="Time that each fake npsim and eicrecon execution sleeps")
+    build_seconds : float = Field(default=0.0, ge=0, description="Time that each fake cmake execution sleeps")
+    output_format : SyntheticOutputFormat = Field(
+        default='npy',
+        description="Format of the fake outputs, either a ROOT tree or a numpy array"
+    )
+    measure_checkpoints : bool = Field(
+        default=True,
+        description="Also runs every workflow with checkpointing, and resumes it from its checkpoints"
+    )
+    working_directory : PathType = Field(
+        default_factory=lambda: os.path.join(os.getcwd(), "synthetic_benchmarks"),
+        description="Directory of the synthetic ePIC directory and workflow directories"
+    )
+
+    @property
+    def epic_dir_path(self) -> Path:
+
+        return Path(self.working_directory).resolve().joinpath(SYNTHETIC_EPIC_DIR_NAME)
+
+    def parsl_config(self, executor : SyntheticExecutorType, run_dir : PathType) -> ParslConfig:
+
+        if executor == 'htex':
+            executor_config = HighThroughputExecutorConfig(
+                label=SYNTHETIC_EXECUTOR_LABEL, max_workers_per_node=self.max_workers,
+                address="127.0.0.1", provider=LocalProviderConfig(launcher=SimpleLauncherConfig())
+            )
+        else:
+            executor_config = ThreadPoolExecutorConfig(label=SYNTHETIC_EXECUTOR_LABEL, max_threads=self.max_workers)
+        return ParslConfig(executors=[executor_config], run_dir=str(run_dir))
+
+    #Creates the configuration of a synthetic workflow with a single benchmark
+    def workflow_config(
+            self, name : str, executor : SyntheticExecutorType, num_simulations : int,
+            checkpointing : bool = False) -> WorkflowConfig:
+
+        working_dir_path = Path(self.working_directory).resolve()
+        simulation_configs = [
+            dict(
+                name=f"synthetic_{index:05d}", num_events=self.num_events, momentum="1GeV",
+                distribution_type="eta", eta_min=-1, eta_max=1, detector_xml=SYNTHETIC_DETECTOR_XML
+            )
+            for index in range(num_simulations)
+        ]
+        benchmark_config = BenchmarkConfig(
+            name=SYNTHETIC_BENCHMARK_NAME,
+            existing_epic_directory_path=str(self.epic_dir_path),
+            simulation_configs=simulation_configs,
+            generate_material_map=False,
+        )
+        return WorkflowConfig(
+            name=name,
+            working_directory=str(working_dir_path),
+            benchmarks=[benchmark_config],
+            parsl_config=self.parsl_config(executor, working_dir_path.joinpath(name, "runinfo")),
+            redo_all_benchmarks=not checkpointing,
+            background_cleanup=False,
+        )
+
+#Temporarily prepends the directory of the fake executables to the PATH that workers inherit
+@contextmanager
+def _synthetic_executables_path(bin_dir_path : Path) -> Iterator[None]:
+
+    original_path = os.environ.get("PATH", "")
+    os.environ["PATH"] = f"{bin_dir_path}{os.pathsep}{original_path}"
+    try:
+        yield
+    finally:
+        os.environ["PATH"] = original_path
+
+#Runs a synthetic workflow, returning its wall time, the time and number of tasks of its DAG submission,
+#and the results of its analysis tasks
+def _run_synthetic_workflow(workflow : WorkflowConfig, output_format : SyntheticOutputFormat) -> Dict[str, Any]:
+
+    measurements : Dict[str, Any] = {}
+    final_futures : List[Future] = []
+
+    def submit_synthetic_dag(workflow_config : WorkflowConfig) -> List[Future]:
+
+        dag = SyntheticWorkflowDag(workflow_config, output_format=output_format)
+        start_time = time.perf_counter()
+        futures = dag.submit()
+        measurements["dag_time"] = time.perf_counter() - start_time
+        measurements["num_tasks"] = dag.num_tasks
+        final_futures.extend(futures)
+        return futures
+
+    start_time = time.perf_counter()
+    execute_workflow(workflow, script_func=submit_synthetic_dag)
+    measurements["wall_time"] = time.perf_counter() - start_time
+    measurements["analysis_results"] = [future.result() for future in final_futures]
+    return measurements
+
+def _timed_workflow_config(config : SyntheticBenchmarkConfig, *args, **kwargs) -> Tuple[WorkflowConfig, float]:
+
+    start_time = time.perf_counter()
+    workflow = config.workflow_config(*args, **kwargs)
+    return workflow, time.perf_counter() - start_time
+
+def _remove_workflow_directory(workflow : WorkflowConfig) -> None:
+
+    shutil.rmtree(workflow.paths.workflow_dir_path, ignore_errors=True)
+
+#Runs the synthetic workflow of every executor and number of simulations.
+#Every scale is first run without checkpointing, which measures the DAG construction time, task submission rate and
+#analysis throughput. With measure_checkpoints, it is then run with checkpointing, whose extra wall time is the
+#checkpoint overhead, and resumed from its checkpoints, which only runs memoized tasks
+def run_synthetic_benchmarks(config : SyntheticBenchmarkConfig) -> List[SyntheticBenchmarkResult]:
+
+    bin_dir_path = create_synthetic_epic_directory(
+        config.epic_dir_path, task_seconds=config.task_seconds, build_seconds=config.build_seconds,
+        event_bytes=config.event_bytes, output_format=config.output_format
+    )
+
+    results = []
+    with _synthetic_executables_path(bin_dir_path):
+        for executor in config.executors:
+            for num_simulations in config.num_simulations:
+
+                name = f"synthetic_{executor}_{num_simulations}"
+                workflow, config_time = _timed_workflow_config(config, name, executor, num_simulations)
+                _remove_workflow_directory(workflow)
+                measurements = _run_synthetic_workflow(workflow, config.output_format)
+
+                analysis_events = sum(result["num_events"] for result in measurements["analysis_results"])
+                analysis_bytes = sum(result["num_bytes"] for result in measurements["analysis_results"])
+                analysis_time = sum(result["run_time"] for result in measurements["analysis_results"])
+                result = SyntheticBenchmarkResult(
+                    executor=executor,
+                    num_simulations=num_simulations,
+                    num_tasks=measurements["num_tasks"],
+                    config_time=config_time,
+                    dag_time=measurements["dag_time"],
+                    submission_rate=measurements["num_tasks"] / measurements["dag_time"] if measurements["dag_time"] > 0 else None,
+                    wall_time=measurements["wall_time"],
+                    analysis_events=analysis_events,
+                    analysis_bytes=analysis_bytes,
+                    analysis_events_per_second=analysis_events / analysis_time if analysis_time > 0 else None,
+                    analysis_bytes_per_second=analysis_bytes / analysis_time if analysis_time > 0 else None,
+                )
+                _remove_workflow_directory(workflow)
+
+                if config.measure_checkpoints:
+                    checkpointed_name = f"{name}_checkpointed"
+                    workflow, _ = _timed_workflow_config(config, checkpointed_name, executor, num_simulations, checkpointing=True)
+                    _remove_workflow_directory(workflow)
+                    result.checkpointed_wall_time = _run_synthetic_workflow(workflow, config.output_format)["wall_time"]
+                    result.checkpoint_overhead = result.checkpointed_wall_time - result.wall_time
+
+                    workflow, _ = _timed_workflow_config(config, checkpointed_name, executor, num_simulations, checkpointing=True)
+                    result.resume_time = _run_synthetic_workflow(workflow, config.output_format)["wall_time"]
+                    _remove_workflow_directory(workflow)
+
+                results.append(result)
+    return results
+
+#Writes the results of the synthetic benchmarks, and the configuration that produced them, as json
+def write_synthetic_results(
+        results : List[SyntheticBenchmarkResult], output_path : PathType,
+        config : Optional[SyntheticBenchmarkConfig] = None) -> Path:
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output = {
+        "config": config.model_dump(mode='json') if config is not None else None,
+        "results": [result.to_dict() for result in results],
+    }
+    with open(output_path, "w") as f:
+        json.dump(output, f, indent=2)
+    return output_path